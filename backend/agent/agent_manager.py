@@ -4,11 +4,11 @@ Axon by NeuroVexon - Agent Manager
 Verwaltet Multi-Agent Profile mit unterschiedlichen Rollen, Modellen und Berechtigungen.
 """
 
-from typing import Optional
+from typing import NamedTuple, Optional
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, select
 
 from db.models import Agent
 
@@ -58,6 +58,72 @@ DEFAULT_AGENTS = [
 ]
 
 
+# Risiko-Stufen als Zahl — hoeher = gefaehrlicher
+RISK_LEVELS = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Wird bei update_agent/delete_agent erhoeht und macht damit gecachte Caps
+# und Permission-Entscheidungen aller Agent-Objekte ungueltig
+_caps_version = 0
+
+
+def bump_agent_caps_version() -> None:
+    global _caps_version
+    _caps_version += 1
+
+
+class AgentCaps(NamedTuple):
+    """Vorberechnete Berechtigungen eines Agents fuer O(1)-Lookups"""
+
+    allowed_tools: Optional[frozenset[str]]  # None = alle erlaubt
+    auto_approve_tools: frozenset[str]
+    risk_max: int
+    # Quellwerte, aus denen die Caps gebaut wurden (Aenderungserkennung)
+    source: tuple
+    version: int
+
+
+def get_agent_caps(agent: Agent) -> AgentCaps:
+    """
+    Caps eines Agents, einmal berechnet und am Objekt zwischengespeichert.
+    Werden neu gebaut sobald allowed_tools, auto_approve_tools oder
+    risk_level_max neu zugewiesen wurden.
+    """
+    allowed, auto, risk = (
+        agent.allowed_tools,
+        agent.auto_approve_tools,
+        agent.risk_level_max,
+    )
+    caps = getattr(agent, "_caps", None)
+    if (
+        caps is not None
+        and caps.version == _caps_version
+        and caps.source[0] is allowed
+        and caps.source[1] is auto
+        and caps.source[2] == risk
+    ):
+        return caps
+
+    caps = AgentCaps(
+        allowed_tools=frozenset(allowed) if allowed is not None else None,
+        auto_approve_tools=frozenset(auto or ()),
+        risk_max=RISK_LEVELS.get(risk, 2),
+        source=(allowed, auto, risk),
+        version=_caps_version,
+    )
+    agent._caps = caps
+    return caps
+
+
+def _memoized(cache: Optional[dict], key: tuple, decide) -> bool:
+    """Permission-Entscheidung aus dem Request-Cache oder neu berechnen"""
+    if cache is None:
+        return decide()
+    key = (_caps_version, *key)
+    if key not in cache:
+        cache[key] = decide()
+    return cache[key]
+
+
 class AgentManager:
     """Verwaltet Agent-Profile"""
 
@@ -66,8 +132,7 @@ class AgentManager:
 
     async def ensure_defaults(self) -> None:
         """Erstelle Default-Agents falls noch keine existieren"""
-        result = await self.db.execute(select(Agent).limit(1))
-        if result.scalar_one_or_none() is not None:
+        if await self.db.scalar(select(exists().select_from(Agent))):
             return  # Agents existieren bereits
 
         logger.info("Erstelle Default-Agents...")
@@ -136,6 +201,7 @@ class AgentManager:
 
         await self.db.commit()
         await self.db.refresh(agent)
+        bump_agent_caps_version()
         return agent
 
     async def delete_agent(self, agent_id: str) -> bool:
@@ -148,26 +214,42 @@ class AgentManager:
 
         await self.db.delete(agent)
         await self.db.commit()
+        bump_agent_caps_version()
         return True
 
     @staticmethod
-    def is_tool_allowed(agent: Agent, tool_name: str) -> bool:
+    def is_tool_allowed(
+        agent: Agent, tool_name: str, cache: Optional[dict] = None
+    ) -> bool:
         """Prueft ob ein Tool fuer diesen Agent erlaubt ist"""
-        if agent.allowed_tools is None:
-            return True  # None = alle erlaubt
-        return tool_name in agent.allowed_tools
+
+        def decide() -> bool:
+            allowed = get_agent_caps(agent).allowed_tools
+            if allowed is None:
+                return True  # None = alle erlaubt
+            return tool_name in allowed
+
+        return _memoized(cache, (agent.id, "allowed", tool_name), decide)
 
     @staticmethod
-    def is_auto_approved(agent: Agent, tool_name: str) -> bool:
+    def is_auto_approved(
+        agent: Agent, tool_name: str, cache: Optional[dict] = None
+    ) -> bool:
         """Prueft ob ein Tool fuer diesen Agent auto-approved ist"""
-        if agent.auto_approve_tools is None:
-            return False  # None = nichts auto-approved
-        return tool_name in agent.auto_approve_tools
+        # None = nichts auto-approved (leeres Set)
+        return _memoized(
+            cache,
+            (agent.id, "auto", tool_name),
+            lambda: tool_name in get_agent_caps(agent).auto_approve_tools,
+        )
 
     @staticmethod
-    def check_risk_level(agent: Agent, tool_risk: str) -> bool:
+    def check_risk_level(
+        agent: Agent, tool_risk: str, cache: Optional[dict] = None
+    ) -> bool:
         """Prueft ob das Risiko-Level innerhalb des Agent-Limits liegt"""
-        levels = {"low": 0, "medium": 1, "high": 2, "critical": 3}
-        agent_max = levels.get(agent.risk_level_max, 2)
-        tool_level = levels.get(tool_risk, 1)
-        return tool_level <= agent_max
+        return _memoized(
+            cache,
+            (agent.id, "risk", tool_risk),
+            lambda: RISK_LEVELS.get(tool_risk, 1) <= get_agent_caps(agent).risk_max,
+        )
@@ -2,17 +2,20 @@
 Axon by NeuroVexon - Audit Logger
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional, Dict, Any
 from enum import Enum
 import logging
-import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.models import AuditLog
 
 logger = logging.getLogger(__name__)
 
+# Laengere Tool-Ergebnisse werden im Audit-Log abgeschnitten
+MAX_AUDIT_RESULT_LENGTH = 1000
+
 
 class AuditEventType(str, Enum):
     TOOL_REQUESTED = "tool_requested"
@@ -29,6 +32,39 @@ class AuditLogger:
 
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
+        self._buffer: Optional[list[AuditLog]] = None
+
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Buffer all entries logged inside the block and write them in one commit.
+
+        A tool call emits request/approval/execution events — batched they cost
+        one transaction instead of three. Nested batches join the outer one.
+        """
+        if self._buffer is not None:
+            yield self
+            return
+
+        self._buffer = []
+        try:
+            yield self
+        finally:
+            await self.flush()
+            self._buffer = None
+
+    async def flush(self):
+        """
+        Write the entries buffered so far in one commit; the batch stays open.
+
+        Used at sync points inside a batch, e.g. before waiting for a user
+        decision, so finished events are not held back for the whole round.
+        """
+        if not self._buffer:
+            return
+        buffered, self._buffer = self._buffer, []
+        self.db.add_all(buffered)
+        await self.db.commit()
 
     async def log(
         self,
@@ -44,21 +80,22 @@ class AuditLogger:
         """Create an audit log entry"""
 
         entry = AuditLog(
-            id=str(uuid.uuid4()),
             conversation_id=session_id,
             timestamp=datetime.utcnow(),
             event_type=event_type.value,
             tool_name=tool_name,
             tool_params=tool_params,
-            result=result[:1000] if result else None,  # Truncate long results
+            result=result[:MAX_AUDIT_RESULT_LENGTH] if result else None,
             error=error,
             user_decision=user_decision,
             execution_time_ms=execution_time_ms,
         )
 
-        self.db.add(entry)
-        await self.db.flush()
-        await self.db.commit()
+        if self._buffer is not None:
+            self._buffer.append(entry)
+        else:
+            self.db.add(entry)
+            await self.db.commit()
 
         logger.info(
             f"Audit: {event_type.value} - {tool_name or 'N/A'} "
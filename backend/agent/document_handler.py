@@ -5,59 +5,65 @@ Extrahiert Text aus hochgeladenen Dateien fuer den Chat-Kontext.
 Unterstuetzte Formate: PDF, Text, Code, CSV, JSON, YAML, HTML, XML
 """
 
+import asyncio
 import csv
 import json
 import logging
 import os
-from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
 # Erlaubte MIME-Types
-ALLOWED_EXTENSIONS = {
-    ".pdf",
-    ".txt",
-    ".md",
-    ".csv",
-    ".json",
-    ".py",
-    ".js",
-    ".ts",
-    ".html",
-    ".xml",
-    ".yaml",
-    ".yml",
-    ".png",
-    ".jpg",
-    ".jpeg",
-}
-
-ALLOWED_MIME_TYPES = {
-    "application/pdf",
-    "text/plain",
-    "text/markdown",
-    "text/csv",
-    "text/html",
-    "text/xml",
-    "application/json",
-    "application/xml",
-    "text/x-python",
-    "text/javascript",
-    "text/typescript",
-    "application/x-yaml",
-    "text/yaml",
-    "image/png",
-    "image/jpeg",
-}
+ALLOWED_EXTENSIONS = frozenset(
+    {
+        ".pdf",
+        ".txt",
+        ".md",
+        ".csv",
+        ".json",
+        ".py",
+        ".js",
+        ".ts",
+        ".html",
+        ".xml",
+        ".yaml",
+        ".yml",
+        ".png",
+        ".jpg",
+        ".jpeg",
+    }
+)
+
+ALLOWED_MIME_TYPES = frozenset(
+    {
+        "application/pdf",
+        "text/plain",
+        "text/markdown",
+        "text/csv",
+        "text/html",
+        "text/xml",
+        "application/json",
+        "application/xml",
+        "text/x-python",
+        "text/javascript",
+        "text/typescript",
+        "application/x-yaml",
+        "text/yaml",
+        "image/png",
+        "image/jpeg",
+    }
+)
+
+_IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg"})
 
 MAX_TEXT_LENGTH = 8000  # Zeichen fuer Context
+MAX_JSON_SIZE = 2 * 1024 * 1024  # Groessere JSON-Dateien nicht komplett parsen
 
 
 def is_allowed_file(filename: str) -> bool:
     """Prueft ob der Dateityp erlaubt ist"""
-    ext = Path(filename).suffix.lower()
-    return ext in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
 
 def extract_text(file_path: str, mime_type: Optional[str] = None) -> str:
@@ -65,46 +71,46 @@ def extract_text(file_path: str, mime_type: Optional[str] = None) -> str:
     Extrahiert Text aus einer Datei.
     Gibt den extrahierten Text zurueck.
     """
-    ext = Path(file_path).suffix.lower()
+    ext = os.path.splitext(file_path)[1].lower()
 
     try:
-        # PDF
-        if ext == ".pdf":
-            return _extract_pdf(file_path)
-
         # Bilder — kein Text, nur Hinweis
-        if ext in (".png", ".jpg", ".jpeg"):
+        if ext in _IMAGE_EXTENSIONS:
             return f"[Bild: {os.path.basename(file_path)}]"
 
-        # CSV
-        if ext == ".csv":
-            return _extract_csv(file_path)
-
-        # JSON
-        if ext == ".json":
-            return _extract_json(file_path)
-
-        # Alle anderen: als UTF-8 Text lesen
-        return _extract_text(file_path)
+        # PDF, CSV, JSON — alle anderen als UTF-8 Text lesen
+        return _EXTRACTORS.get(ext, _extract_text)(file_path)
 
     except Exception as e:
         logger.error(f"Text-Extraktion fehlgeschlagen fuer {file_path}: {e}")
         return f"[Konnte Text nicht extrahieren: {str(e)[:200]}]"
 
 
+async def extract_text_async(file_path: str, mime_type: Optional[str] = None) -> str:
+    """
+    extract_text() in einem Worker-Thread.
+    Blockierendes Datei-I/O und PDF-Decoding halten so den Event-Loop nicht auf.
+    """
+    return await asyncio.to_thread(extract_text, file_path, mime_type)
+
+
 def _extract_pdf(file_path: str) -> str:
     """PDF Text extrahieren"""
     try:
         import fitz  # pymupdf
 
-        doc = fitz.open(file_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-            if len(text) > MAX_TEXT_LENGTH:
-                break
-        doc.close()
-        return text[:MAX_TEXT_LENGTH]
+        parts = []
+        total = 0
+        with fitz.open(file_path) as doc:
+            for page in doc:
+                page_text = page.get_text("text")
+                if not page_text:
+                    continue  # z.B. reine Bild-Seiten
+                parts.append(page_text)
+                total += len(page_text)
+                if total >= MAX_TEXT_LENGTH:
+                    break
+        return "".join(parts)[:MAX_TEXT_LENGTH]
     except ImportError:
         # Fallback wenn pymupdf nicht installiert
         return "[PDF-Extraktion benoetigt pymupdf. Bitte installieren: pip install pymupdf]"
@@ -115,16 +121,31 @@ def _extract_csv(file_path: str) -> str:
     with open(file_path, "r", encoding="utf-8", errors="replace") as f:
         reader = csv.reader(f)
         lines = []
+        total = 0
         for i, row in enumerate(reader):
             if i >= 100:
                 lines.append(f"... ({i}+ Zeilen insgesamt)")
                 break
-            lines.append(" | ".join(row))
+            line = " | ".join(row)
+            lines.append(line)
+            total += len(line) + 1
+            # Budget erreicht — restliche Zeilen nicht mehr lesen
+            if total > MAX_TEXT_LENGTH:
+                break
     return "\n".join(lines)[:MAX_TEXT_LENGTH]
 
 
 def _extract_json(file_path: str) -> str:
     """JSON formatiert ausgeben"""
+    size = os.path.getsize(file_path)
+    if size > MAX_JSON_SIZE:
+        # Zu gross zum Parsen — nur den Anfang als Rohtext liefern
+        head = _extract_text(file_path)
+        return (
+            f"[JSON zu gross fuer Formatierung ({size // 1024} KB), "
+            f"nur Anfang als Rohtext]\n{head}"
+        )[:MAX_TEXT_LENGTH]
+
     with open(file_path, "r", encoding="utf-8") as f:
         data = json.load(f)
     return json.dumps(data, indent=2, ensure_ascii=False)[:MAX_TEXT_LENGTH]
@@ -133,7 +154,16 @@ def _extract_json(file_path: str) -> str:
 def _extract_text(file_path: str) -> str:
     """Plaintext/Code lesen"""
     with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()[:MAX_TEXT_LENGTH]
+        # Textmodus: read(n) liest n Zeichen, nicht die ganze Datei
+        return f.read(MAX_TEXT_LENGTH)
+
+
+# Dateiendung → Extraktor (Default: _extract_text)
+_EXTRACTORS: dict[str, Callable[[str], str]] = {
+    ".pdf": _extract_pdf,
+    ".csv": _extract_csv,
+    ".json": _extract_json,
+}
 
 
 def truncate_text(text: str, max_chars: int = MAX_TEXT_LENGTH) -> str:
@@ -7,10 +7,15 @@ Generiert Embeddings ueber Ollama (nomic-embed-text) fuer semantische Memory-Suc
 Fallback: Kein Embedding verfuegbar → ILIKE-Suche wie bisher.
 """
 
+import asyncio
+import hashlib
 import logging
 import time
+from collections import OrderedDict
 from typing import Optional
 import httpx
+import numpy as np
+import orjson
 
 from core.config import settings
 
@@ -20,6 +25,17 @@ logger = logging.getLogger(__name__)
 _CACHE_TTL_UNAVAILABLE = 300  # seconds
 _CACHE_TTL_AVAILABLE = 3600  # 1 hour for positive results
 
+# Embedding cache for repeated texts (e.g. the same memory_search query)
+_EMBED_CACHE_SIZE = 1024
+_EMBED_CACHE_TTL = 300  # seconds
+
+_EMBED_PATH = "/api/embed"  # relativ zur base_url des geteilten Clients
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# embed_batch: split large inputs into sub-batches, a few requests in flight
+_EMBED_BATCH_SIZE = 16
+_EMBED_BATCH_CONCURRENCY = 4
+
 
 class EmbeddingProvider:
     """Generates text embeddings via Ollama"""
@@ -29,6 +45,24 @@ class EmbeddingProvider:
         self.base_url = settings.ollama_base_url
         self._available: Optional[bool] = None
         self._checked_at: float = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._embed_cache: OrderedDict[bytes, tuple[float, list[float]]] = OrderedDict()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client — keeps the connection to Ollama alive between calls"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(60.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client (on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def is_available(self) -> bool:
         """Check if the embedding model is available in Ollama"""
@@ -38,14 +72,14 @@ class EmbeddingProvider:
                 return self._available
 
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.base_url}/api/tags")
-                if resp.status_code == 200:
-                    models = resp.json().get("models", [])
-                    model_names = [m.get("name", "").split(":")[0] for m in models]
-                    self._available = self.model.split(":")[0] in model_names
-                else:
-                    self._available = False
+            client = self._get_client()
+            resp = await client.get("/api/tags", timeout=5.0)
+            if resp.status_code == 200:
+                models = resp.json().get("models", [])
+                model_names = [m.get("name", "").split(":")[0] for m in models]
+                self._available = self.model.split(":")[0] in model_names
+            else:
+                self._available = False
         except Exception as e:
             logger.debug(f"Embedding model check failed: {e}")
             self._available = False
@@ -62,83 +96,160 @@ class EmbeddingProvider:
         return self._available
 
     def reset_cache(self):
-        """Reset availability cache (z.B. nach Model-Pull)"""
+        """Reset availability and embedding cache (z.B. nach Model-Pull)"""
         self._available = None
         self._checked_at = 0
+        self._embed_cache.clear()
+
+    def _cache_key(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.model}\0{text}".encode(), digest_size=16
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[list[float]]:
+        """Cached embedding for key, or None if missing/expired (LRU + TTL)"""
+        entry = self._embed_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, embedding = entry
+        if time.monotonic() - stored_at > _EMBED_CACHE_TTL:
+            del self._embed_cache[key]
+            return None
+        self._embed_cache.move_to_end(key)
+        return embedding
+
+    def _cache_put(self, key: bytes, embedding: list[float]):
+        self._embed_cache[key] = (time.monotonic(), embedding)
+        self._embed_cache.move_to_end(key)
+        while len(self._embed_cache) > _EMBED_CACHE_SIZE:
+            self._embed_cache.popitem(last=False)
 
     async def embed(self, text: str) -> Optional[list[float]]:
         """Generate embedding for a single text. Returns None if unavailable."""
         if not await self.is_available():
             return None
 
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                resp = await client.post(
-                    f"{self.base_url}/api/embed",
-                    json={"model": self.model, "input": text},
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-                # Ollama /api/embed returns {"embeddings": [[...]]}
-                embeddings = data.get("embeddings", [])
-                if embeddings and len(embeddings) > 0:
-                    return embeddings[0]
-
-                return None
+            client = self._get_client()
+            resp = await client.post(
+                _EMBED_PATH,
+                content=orjson.dumps({"model": self.model, "input": text}),
+                headers=_JSON_HEADERS,
+                timeout=30.0,
+            )
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+
+            # Ollama /api/embed returns {"embeddings": [[...]]}
+            embeddings = data.get("embeddings", [])
+            if embeddings and len(embeddings) > 0:
+                self._cache_put(key, embeddings[0])
+                return embeddings[0]
+
+            return None
         except Exception as e:
             logger.warning(f"Embedding generation failed: {e}")
             return None
 
     async def embed_batch(self, texts: list[str]) -> list[Optional[list[float]]]:
-        """Generate embeddings for multiple texts"""
+        """
+        Generate embeddings for multiple texts.
+
+        Inputs larger than _EMBED_BATCH_SIZE are split into sub-batches that run
+        concurrently (at most _EMBED_BATCH_CONCURRENCY requests at once). A failed
+        sub-batch only yields None for its own texts.
+        """
         if not await self.is_available():
             return [None] * len(texts)
 
+        semaphore = asyncio.Semaphore(_EMBED_BATCH_CONCURRENCY)
+
+        async def run(chunk: list[str]) -> list[Optional[list[float]]]:
+            async with semaphore:
+                return await self._embed_chunk(chunk)
+
+        chunks = [
+            texts[i : i + _EMBED_BATCH_SIZE]
+            for i in range(0, len(texts), _EMBED_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return [embedding for chunk in results for embedding in chunk]
+
+    async def _embed_chunk(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """One /api/embed request for a list of texts"""
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                resp = await client.post(
-                    f"{self.base_url}/api/embed",
-                    json={"model": self.model, "input": texts},
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-                embeddings = data.get("embeddings", [])
-                # Pad with None if some embeddings are missing
-                result = []
-                for i in range(len(texts)):
-                    if i < len(embeddings):
-                        result.append(embeddings[i])
-                    else:
-                        result.append(None)
-                return result
+            client = self._get_client()
+            resp = await client.post(
+                _EMBED_PATH,
+                content=orjson.dumps({"model": self.model, "input": texts}),
+                headers=_JSON_HEADERS,
+                timeout=60.0,
+            )
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+
+            embeddings = data.get("embeddings", [])
+            # Pad with None if some embeddings are missing
+            result = []
+            for i in range(len(texts)):
+                if i < len(embeddings):
+                    result.append(embeddings[i])
+                else:
+                    result.append(None)
+            return result
         except Exception as e:
             logger.warning(f"Batch embedding failed: {e}")
             return [None] * len(texts)
 
 
-def cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Cosine similarity between two vectors using numpy"""
-    try:
-        import numpy as np
-
-        a_arr = np.array(a, dtype=np.float32)
-        b_arr = np.array(b, dtype=np.float32)
-        dot = np.dot(a_arr, b_arr)
-        norm_a = np.linalg.norm(a_arr)
-        norm_b = np.linalg.norm(b_arr)
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return float(dot / (norm_a * norm_b))
-    except ImportError:
-        # Fallback ohne numpy
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = sum(x * x for x in a) ** 0.5
-        norm_b = sum(x * x for x in b) ** 0.5
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
+def cosine_similarity(
+    a: np.ndarray | list[float],
+    b: np.ndarray | list[float],
+    normalized: bool = False,
+) -> float:
+    """
+    Cosine similarity between two vectors.
+
+    float32 arrays are used as-is (no copy). With normalized=True both vectors
+    are expected to have unit length and the result is a single dot product.
+    """
+    a_arr = np.asarray(a, dtype=np.float32)
+    b_arr = np.asarray(b, dtype=np.float32)
+    dot = a_arr @ b_arr
+    if normalized:
+        return float(dot)
+    norm_a = np.linalg.norm(a_arr)
+    norm_b = np.linalg.norm(b_arr)
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return float(dot / (norm_a * norm_b))
+
+
+def cosine_similarities(
+    query: list[float], matrix: np.ndarray, normalized: bool = False
+) -> np.ndarray:
+    """Cosine similarity of one query vector against every row of an (N, D) matrix.
+
+    The query is normalized once and all rows are scored with a single
+    matrix-vector product instead of one cosine_similarity() call per row.
+    Zero rows score 0.0. With normalized=True the rows are expected to have
+    unit length (or be zero) and their norms are not recomputed.
+    """
+    q = np.asarray(query, dtype=np.float32)
+    q_norm = np.linalg.norm(q)
+    if q_norm == 0 or matrix.size == 0:
+        return np.zeros(len(matrix), dtype=np.float32)
+    if normalized:
+        return matrix @ (q / q_norm)
+
+    row_norms = np.linalg.norm(matrix, axis=1)
+    row_norms[row_norms == 0] = np.inf
+    return (matrix @ (q / q_norm)) / row_norms
 
 
 # Global singleton
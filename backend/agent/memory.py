@@ -10,30 +10,153 @@ Fallback auf ILIKE wenn Embeddings nicht verfuegbar.
 """
 
 import logging
-import struct
+from datetime import datetime
 from typing import Optional
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import defer
+from sqlalchemy import Integer, column, delete, literal_column, or_, select, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from db.models import Memory
-from agent.embeddings import embedding_provider, cosine_similarity
+from agent.embeddings import embedding_provider, cosine_similarities
 
 logger = logging.getLogger(__name__)
 
 # Maximale Anzahl Memories im System-Prompt (Token-Budget)
 MAX_MEMORIES_IN_PROMPT = 30
 MAX_MEMORY_CONTENT_LENGTH = 500
-
-
-def _serialize_embedding(embedding: list[float]) -> bytes:
-    """Serialize embedding list to bytes (float32)"""
-    return struct.pack(f"{len(embedding)}f", *embedding)
-
-
-def _deserialize_embedding(data: bytes) -> list[float]:
-    """Deserialize bytes back to embedding list"""
-    count = len(data) // 4  # float32 = 4 bytes
-    return list(struct.unpack(f"{count}f", data))
+# Gesamtbudget des Memory-Blocks im Prompt (geschaetzte Tokens)
+MAX_MEMORY_PROMPT_TOKENS = 1024
+# Grobe Schaetzung ohne Tokenizer: ~4 Zeichen pro Token (DE/EN)
+_CHARS_PER_TOKEN = 4
+# Bei mehr Memories als ins Budget passen: so viele Plaetze gehen an die
+# zur aktuellen Nachricht passenden, der Rest an die neuesten
+MAX_RELEVANT_MEMORIES_IN_PROMPT = 10
+# Minimale Cosine-Similarity fuer semantische Treffer
+MIN_SIMILARITY_SCORE = 0.3
+# add_many: Zeilen pro INSERT (bleibt unter SQLites Parameter-Limit)
+_ADD_MANY_CHUNK_SIZE = 500
+
+# Gerenderter Memory-Prompt je Format (plain/markdown):
+# (version, engine, stamp, text). Jede Schreiboperation in diesem Prozess
+# erhoeht die Version; der Stamp (max(updated_at), Anzahl) erkennt Aenderungen
+# aus anderen Prozessen (z.B. Discord-Bot).
+_memory_version = 0
+_prompt_cache: dict[bool, tuple[int, object, tuple, str]] = {}
+# Embedding-Matrix der semantischen Suche je Dimension, gleich invalidiert:
+# dim -> (version, engine, stamp, ids, zeilenweise normalisierte Matrix)
+_matrix_cache: dict[int, tuple[int, object, tuple, list[str], np.ndarray]] = {}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (no tokenizer dependency)"""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _clip_content(content: str) -> str:
+    """
+    Strip and cut content to MAX_MEMORY_CONTENT_LENGTH, at a word boundary if
+    one lies in the last fifth of the limit — no half words in the prompt.
+    """
+    content = content.strip()
+    if len(content) <= MAX_MEMORY_CONTENT_LENGTH:
+        return content
+    clipped = content[:MAX_MEMORY_CONTENT_LENGTH]
+    cut = clipped.rfind(" ")
+    if cut >= MAX_MEMORY_CONTENT_LENGTH * 4 // 5:
+        clipped = clipped[:cut]
+    return clipped.rstrip()
+
+
+def invalidate_memory_prompt() -> None:
+    """Mark the cached memory prompt and search matrix stale (after every write)"""
+    global _memory_version
+    _memory_version += 1
+    _prompt_cache.clear()
+    _matrix_cache.clear()
+
+
+# Embeddings werden als int8 mit float32-Skalierung gespeichert:
+# MAGIC (4 Byte) + scale (float32) + D x int8 — ein Viertel von float32.
+# Aeltere Zeilen ohne MAGIC sind reines float32 und bleiben lesbar.
+_QUANT_MAGIC = b"Q8v1"
+_QUANT_HEADER_SIZE = len(_QUANT_MAGIC) + 4
+
+
+def _serialize_embedding(embedding: list[float] | np.ndarray) -> bytes:
+    """Serialize embedding to bytes (int8, per-vector scale)"""
+    vec = np.asarray(embedding, dtype=np.float32)
+    max_abs = float(np.max(np.abs(vec))) if vec.size else 0.0
+    scale = max_abs / 127 if max_abs > 0 else 1.0
+    quantized = np.round(vec / scale).astype(np.int8)
+    return _QUANT_MAGIC + np.float32(scale).tobytes() + quantized.tobytes()
+
+
+def _is_quantized(data: bytes) -> bool:
+    return data[: len(_QUANT_MAGIC)] == _QUANT_MAGIC
+
+
+def _deserialize_embedding(data: bytes) -> np.ndarray:
+    """Deserialize bytes back to a float32 embedding vector (int8 or legacy float32)"""
+    if not _is_quantized(data):
+        return np.frombuffer(data, dtype=np.float32)
+    scale = np.frombuffer(data, dtype=np.float32, count=1, offset=len(_QUANT_MAGIC))
+    quantized = np.frombuffer(data, dtype=np.int8, offset=_QUANT_HEADER_SIZE)
+    return quantized.astype(np.float32) * scale[0]
+
+
+def _stack_embeddings(
+    rows: list[tuple[str, bytes]], dim: int
+) -> tuple[list[str], np.ndarray]:
+    """
+    Decode (memory_id, embedding) rows into ids and one (N, dim) float32 matrix
+    with unit-length rows (zero vectors stay zero).
+    """
+    # Zeilen anderer Dimension (alter Model-Stand) ueberspringen
+    ids, vectors = [], []
+    for mem_id, embedding in rows:
+        vec = _deserialize_embedding(embedding)
+        if len(vec) == dim:
+            ids.append(mem_id)
+            vectors.append(vec)
+    if not vectors:
+        return [], np.empty((0, dim), dtype=np.float32)
+
+    matrix = np.vstack(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = np.inf
+    return ids, matrix / norms
+
+
+def _rank_by_similarity(
+    query_embedding: list[float], rows: list[tuple[str, bytes]], limit: int
+) -> list[tuple[float, str]]:
+    """
+    Rank (memory_id, embedding) rows by cosine similarity to the query, best first.
+
+    Stacks all embeddings into one (N, D) float32 matrix and scores them with
+    a single matrix-vector product. Returns at most `limit` (score, id) pairs.
+    """
+    ids, matrix = _stack_embeddings(rows, len(query_embedding))
+    return _top_matches(query_embedding, ids, matrix, limit)
+
+
+def _top_matches(
+    query_embedding: list[float], ids: list[str], matrix: np.ndarray, limit: int
+) -> list[tuple[float, str]]:
+    """Best `limit` (score, id) pairs for a matrix from _stack_embeddings()"""
+    if limit <= 0 or not ids:
+        return []
+
+    scores = cosine_similarities(query_embedding, matrix, normalized=True)
+
+    k = min(limit, len(ids))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(float(scores[i]), ids[i]) for i in top]
 
 
 class MemoryManager:
@@ -51,39 +174,104 @@ class MemoryManager:
     ) -> Memory:
         """Add or update a memory entry (upsert by key)"""
         key = key.strip()[:255]
-        content = content.strip()[:MAX_MEMORY_CONTENT_LENGTH]
+        content = _clip_content(content)
 
         # Generate embedding for the combined key+content
         embed_text = f"{key}: {content}"
         embedding = await embedding_provider.embed(embed_text)
         embedding_bytes = _serialize_embedding(embedding) if embedding else None
 
-        # Check if key already exists — update if so
-        result = await self.db.execute(select(Memory).where(Memory.key == key))
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            existing.content = content
-            existing.source = source
-            existing.embedding = embedding_bytes
-            if category:
-                existing.category = category
-            await self.db.flush()
-            logger.info(f"Memory updated: {key}")
-            return existing
+        invalidate_memory_prompt()
 
-        memory = Memory(
+        # Upsert in one statement: INSERT ... ON CONFLICT (key) DO UPDATE
+        stmt = self._insert()(Memory).values(
             key=key,
             content=content,
             source=source,
             category=category,
             embedding=embedding_bytes,
         )
-        self.db.add(memory)
-        await self.db.flush()
-        logger.info(f"Memory created: {key}")
+        update = {
+            "content": stmt.excluded.content,
+            "source": stmt.excluded.source,
+            "embedding": stmt.excluded.embedding,
+            "updated_at": datetime.utcnow(),
+        }
+        if category:
+            update["category"] = stmt.excluded.category
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Memory.key], set_=update
+        ).returning(Memory)
+
+        result = await self.db.execute(
+            select(Memory)
+            .from_statement(stmt)
+            .execution_options(populate_existing=True)
+        )
+        memory = result.scalar_one()
+        logger.info(f"Memory saved: {key}")
         return memory
 
+    async def add_many(self, items: list[dict], source: str = "user") -> int:
+        """
+        Add or update many memories at once (upsert by key).
+
+        Each item needs "key" and "content", optionally "source" and
+        "category". Embeddings come from one embed_batch call and rows are
+        written with multi-row INSERT ... ON CONFLICT statements instead of one
+        round-trip per item. Items with an empty key or content are skipped; for
+        duplicate keys the last item wins. Returns the number of rows written.
+        """
+        rows: dict[str, dict] = {}
+        for item in items:
+            key = (item.get("key") or "").strip()[:255]
+            content = _clip_content(item.get("content") or "")
+            if not key or not content:
+                continue
+            rows.pop(key, None)  # Reihenfolge des letzten Vorkommens
+            rows[key] = {
+                "key": key,
+                "content": content,
+                "source": item.get("source") or source,
+                "category": item.get("category") or None,
+            }
+        if not rows:
+            return 0
+
+        values = list(rows.values())
+        embeddings = await embedding_provider.embed_batch(
+            [f"{row['key']}: {row['content']}" for row in values]
+        )
+        for row, embedding in zip(values, embeddings):
+            row["embedding"] = _serialize_embedding(embedding) if embedding else None
+
+        invalidate_memory_prompt()
+
+        insert = self._insert()
+        for start in range(0, len(values), _ADD_MANY_CHUNK_SIZE):
+            stmt = insert(Memory).values(values[start : start + _ADD_MANY_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Memory.key],
+                set_={
+                    "content": stmt.excluded.content,
+                    "source": stmt.excluded.source,
+                    "embedding": stmt.excluded.embedding,
+                    # wie add(): ohne Kategorie bleibt die bisherige erhalten
+                    "category": func.coalesce(stmt.excluded.category, Memory.category),
+                    "updated_at": datetime.utcnow(),
+                },
+            )
+            await self.db.execute(stmt)
+
+        logger.info(f"Memories saved: {len(values)}")
+        return len(values)
+
+    def _insert(self):
+        """Dialect-specific insert() with ON CONFLICT support"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return pg_insert
+        return sqlite_insert
+
     async def get(self, key: str) -> Optional[Memory]:
         """Get a single memory by key"""
         result = await self.db.execute(select(Memory).where(Memory.key == key))
@@ -97,12 +285,28 @@ class MemoryManager:
         self, category: Optional[str] = None, limit: int = 100
     ) -> list[Memory]:
         """List all memories, optionally filtered by category"""
-        query = select(Memory).order_by(Memory.updated_at.desc()).limit(limit)
+        query = (
+            select(Memory)
+            .options(defer(Memory.embedding))
+            .order_by(Memory.updated_at.desc())
+            .limit(limit)
+        )
         if category:
             query = query.where(Memory.category == category)
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def list_all_light(
+        self, limit: int = MAX_MEMORIES_IN_PROMPT
+    ) -> list[tuple[str, str, Optional[str]]]:
+        """Newest (key, content, category) tuples — no ORM objects, no embedding BLOB"""
+        result = await self.db.execute(
+            select(Memory.key, Memory.content, Memory.category)
+            .order_by(Memory.updated_at.desc())
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
     async def remove(self, memory_id: str) -> bool:
         """Delete a memory by ID"""
         memory = await self.db.get(Memory, memory_id)
@@ -110,93 +314,187 @@ class MemoryManager:
             return False
         await self.db.delete(memory)
         await self.db.flush()
+        invalidate_memory_prompt()
         logger.info(f"Memory deleted: {memory.key}")
         return True
 
     async def remove_by_key(self, key: str) -> bool:
         """Delete a memory by key"""
-        result = await self.db.execute(select(Memory).where(Memory.key == key))
-        memory = result.scalar_one_or_none()
-        if not memory:
+        result = await self.db.execute(delete(Memory).where(Memory.key == key))
+        if not result.rowcount:
             return False
-        await self.db.delete(memory)
-        await self.db.flush()
+        invalidate_memory_prompt()
         logger.info(f"Memory deleted by key: {key}")
         return True
 
-    async def search(self, query: str, limit: int = 10) -> list[Memory]:
+    async def search(
+        self, query: str, limit: int = 10, lazy_embed: bool = True
+    ) -> list[Memory]:
         """
         Semantic search via embeddings with ILIKE fallback.
 
         1. Embed the query
-        2. Load all memories with embeddings
-        3. Rank by cosine similarity
+        2. Load only (id, embedding) of memories with a matching dimension
+        3. Rank by cosine similarity, then load the top hits as full rows
         4. Fallback to ILIKE if no embeddings available
+
+        lazy_embed=False keeps the search read-only: memories without an
+        embedding are not embedded on the fly (for callers that never commit).
         """
         # Try semantic search first
         query_embedding = await embedding_provider.embed(query)
 
         if query_embedding:
-            # Load all memories (bei <1000 kein Performance-Problem)
-            result = await self.db.execute(select(Memory))
-            all_memories = list(result.scalars().all())
-
-            # Score memories with embeddings
-            scored = []
-            unscored = []
-            for mem in all_memories:
-                if mem.embedding:
-                    mem_embedding = _deserialize_embedding(mem.embedding)
-                    score = cosine_similarity(query_embedding, mem_embedding)
-                    scored.append((score, mem))
-                else:
-                    unscored.append(mem)
-
-            if scored:
-                # Sort by similarity (highest first)
-                scored.sort(key=lambda x: x[0], reverse=True)
-                # Filter by minimum threshold
-                results = [mem for score, mem in scored if score > 0.3][:limit]
-
-                if results:
-                    logger.info(
-                        f"Semantic search for '{query}': {len(results)} results (best score: {scored[0][0]:.3f})"
-                    )
-                    return results
+            results = await self._semantic_search(query_embedding, limit)
+            if results:
+                return results
 
             # If no scored results, try to embed unscored memories lazily
+            unscored = []
+            if lazy_embed:
+                result = await self.db.execute(
+                    select(Memory).where(Memory.embedding.is_(None)).limit(50)
+                )  # Max 50 auf einmal
+                unscored = list(result.scalars().all())
             if unscored:
                 logger.info(
                     f"{len(unscored)} memories without embeddings — generating lazily"
                 )
-                for mem in unscored[:50]:  # Max 50 auf einmal
-                    embed_text = f"{mem.key}: {mem.content}"
-                    emb = await embedding_provider.embed(embed_text)
+                embeddings = await embedding_provider.embed_batch(
+                    [f"{mem.key}: {mem.content}" for mem in unscored]
+                )
+                for mem, emb in zip(unscored, embeddings):
                     if emb:
                         mem.embedding = _serialize_embedding(emb)
                 await self.db.flush()
+                invalidate_memory_prompt()
 
                 # Retry search after embedding
-                return await self._semantic_search(query_embedding, all_memories, limit)
+                return await self._semantic_search(query_embedding, limit)
 
-        # Fallback: ILIKE text search
-        logger.info(f"Fallback to ILIKE search for: {query}")
+        # Fallback: substring search via trigram index, ILIKE if unavailable
+        results = await self._fulltext_search(query, limit)
+        if results is not None:
+            return results
+        logger.debug("Fallback to ILIKE search")
         return await self._ilike_search(query, limit)
 
     async def _semantic_search(
-        self, query_embedding: list[float], memories: list[Memory], limit: int
+        self, query_embedding: list[float], limit: int
     ) -> list[Memory]:
-        """Perform semantic search on a list of memories"""
-        scored = []
-        for mem in memories:
-            if mem.embedding:
-                mem_embedding = _deserialize_embedding(mem.embedding)
-                score = cosine_similarity(query_embedding, mem_embedding)
-                scored.append((score, mem))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        results = [mem for score, mem in scored if score > 0.3][:limit]
-        return results
+        """
+        Rank stored embeddings against the query.
+
+        Ranks against the cached embedding matrix (see _embedding_matrix) and
+        loads full rows for the top hits only.
+        """
+        ids, matrix = await self._embedding_matrix(len(query_embedding))
+        scored = _top_matches(query_embedding, ids, matrix, limit)
+        hits = [mem_id for score, mem_id in scored if score > MIN_SIMILARITY_SCORE]
+        if not hits:
+            return []
+
+        result = await self.db.execute(select(Memory).where(Memory.id.in_(hits)))
+        by_id = {mem.id: mem for mem in result.scalars().all()}
+        logger.info(
+            f"Semantic search: {len(hits)} results (best score: {scored[0][0]:.3f})"
+        )
+        return [by_id[mem_id] for mem_id in hits if mem_id in by_id]
+
+    async def _embedding_matrix(self, dim: int) -> tuple[list[str], np.ndarray]:
+        """
+        Ids and normalized matrix of all embeddings with dimension `dim`.
+
+        Only the id and embedding columns are fetched, and only embeddings of
+        the query's dimension (a model switch leaves stale vectors behind).
+        The decoded matrix is cached process-wide like the memory prompt, so
+        repeated searches skip fetching and decoding every vector.
+        """
+        bind = self.db.get_bind()
+        version = _memory_version
+        stamp = await self._stamp()
+
+        cached = _matrix_cache.get(dim)
+        if (
+            cached is not None
+            and cached[0] == version
+            and cached[1] is bind
+            and cached[2] == stamp
+        ):
+            return cached[3], cached[4]
+
+        result = await self.db.execute(
+            select(Memory.id, Memory.embedding).where(
+                Memory.embedding.isnot(None),
+                # int8 (aktuell) oder float32 (Altbestand)
+                func.length(Memory.embedding).in_([dim + _QUANT_HEADER_SIZE, dim * 4]),
+            )
+        )
+        ids, matrix = _stack_embeddings(result.all(), dim)
+        if version == _memory_version:
+            _matrix_cache[dim] = (version, bind, stamp, ids, matrix)
+        return ids, matrix
+
+    async def _stamp(self) -> tuple:
+        """(max updated_at, count) — changes with every write, also from other processes"""
+        result = await self.db.execute(
+            select(func.max(Memory.updated_at), func.count()).select_from(Memory)
+        )
+        return tuple(result.one())
+
+    async def quantize_legacy_embeddings(self) -> int:
+        """
+        Convert float32 embeddings of older versions to the int8 format.
+        Re-quantizes the stored vectors — no new embedding call needed.
+        Returns the number of converted rows.
+        """
+        result = await self.db.execute(
+            select(Memory).where(
+                Memory.embedding.isnot(None),
+                or_(
+                    func.length(Memory.embedding) < _QUANT_HEADER_SIZE,
+                    func.substr(Memory.embedding, 1, len(_QUANT_MAGIC)) != _QUANT_MAGIC,
+                ),
+            )
+        )
+        count = 0
+        for mem in result.scalars().all():
+            mem.embedding = _serialize_embedding(_deserialize_embedding(mem.embedding))
+            count += 1
+        if count:
+            await self.db.flush()
+            invalidate_memory_prompt()
+            logger.info(f"{count} embeddings auf int8 umgestellt")
+        return count
+
+    async def _fulltext_search(self, query: str, limit: int) -> Optional[list[Memory]]:
+        """
+        Substring search via the SQLite FTS5 trigram table memories_fts.
+
+        Matches the same rows as the ILIKE search (case-insensitive substring
+        in key or content), but index-backed. Returns None if the index cannot
+        answer: queries under 3 characters, other dialects, or no FTS5.
+        """
+        if len(query) < 3 or self.db.get_bind().dialect.name != "sqlite":
+            return None
+
+        match = '"' + query.replace('"', '""') + '"'
+        fts_rowids = (
+            text("SELECT rowid FROM memories_fts WHERE memories_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(column("rowid", Integer))
+        )
+        try:
+            result = await self.db.execute(
+                select(Memory)
+                .where(literal_column("memories.rowid").in_(fts_rowids))
+                .order_by(Memory.updated_at.desc())
+                .limit(limit)
+            )
+        except OperationalError as e:
+            logger.debug(f"Full-text search unavailable: {e}")
+            return None
+        return list(result.scalars().all())
 
     async def _ilike_search(self, query: str, limit: int) -> list[Memory]:
         """Traditional ILIKE text search"""
@@ -211,29 +509,90 @@ class MemoryManager:
         )
         return list(result.scalars().all())
 
-    async def build_memory_prompt(self, plain: bool = False) -> str:
+    async def build_memory_prompt(
+        self, plain: bool = False, query: Optional[str] = None
+    ) -> str:
         """
         Build a memory block for injection into the system prompt.
         Returns an empty string if no memories exist.
 
         Args:
             plain: If True, returns plain text without markdown (for tool-calling models).
+            query: The current user message. Once there are more memories than
+                fit into the prompt, the ones matching it (search()) are
+                included first instead of only the newest.
+
+        The rendered text is cached process-wide. A hit costs one aggregate
+        query (max updated_at + count) instead of loading and joining rows.
         """
-        memories = await self.list_all(limit=MAX_MEMORIES_IN_PROMPT)
+        bind = self.db.get_bind()
+        version = _memory_version
+        stamp = await self._stamp()
+
+        # Auswahl haengt von der Nachricht ab — nicht cachebar
+        if query and stamp[1] > MAX_MEMORIES_IN_PROMPT:
+            return await self._render_memory_prompt(plain, query)
+
+        cached = _prompt_cache.get(plain)
+        if (
+            cached is not None
+            and cached[0] == version
+            and cached[1] is bind
+            and cached[2] == stamp
+        ):
+            return cached[3]
+
+        prompt = await self._render_memory_prompt(plain)
+        if version == _memory_version:
+            _prompt_cache[plain] = (version, bind, stamp, prompt)
+        return prompt
+
+    async def _render_memory_prompt(
+        self, plain: bool, query: Optional[str] = None
+    ) -> str:
+        memories = await self.list_all_light(limit=MAX_MEMORIES_IN_PROMPT)
+        if query:
+            # Relevant memories first, then fill the budget with the newest.
+            # Read-only search: the chat session is closed without a commit.
+            picked = {
+                mem.key: (mem.key, mem.content, mem.category)
+                for mem in await self.search(
+                    query, limit=MAX_RELEVANT_MEMORIES_IN_PROMPT, lazy_embed=False
+                )
+            }
+            for row in memories:
+                if len(picked) >= MAX_MEMORIES_IN_PROMPT:
+                    break
+                picked.setdefault(row[0], row)
+            memories = list(picked.values())
+
+        # Token budget: in priority order (relevant, then newest) until full
+        budget = MAX_MEMORY_PROMPT_TOKENS
+        selected = []
+        for key, content, category in memories:
+            budget -= _estimate_tokens(f"{key} [{category or ''}]: {content}")
+            if budget < 0:
+                break
+            selected.append((key, content, category))
+        memories = selected
+
+        # Rendered in key order: the block stays byte-identical until its
+        # content changes (keeps LLM prompt-prefix caches warm)
+        memories = sorted(memories)
         if not memories:
             return ""
 
         if plain:
             # Plain text format — preserves tool calling in smaller models
             facts = []
-            for mem in memories:
-                facts.append(f"{mem.key}: {mem.content}")
+            for key, content, _ in memories:
+                facts.append(f"{key}: {content}")
             return "Bekannte Fakten: " + ". ".join(facts) + "."
 
         lines = ["", "## Dein Gedaechtnis (persistente Fakten)", ""]
-        for mem in memories:
-            category_tag = f" [{mem.category}]" if mem.category else ""
-            lines.append(f"- **{mem.key}**{category_tag}: {mem.content}")
+        for key, content, category in memories:
+            category_tag = f" [{category}]" if category else ""
+            lines.append(f"- **{key}**{category_tag}: {content}")
 
         lines.append("")
         lines.append("Nutze dieses Wissen in deinen Antworten, wenn es relevant ist.")
@@ -241,11 +600,8 @@ class MemoryManager:
 
     async def clear_all(self) -> int:
         """Delete all memories. Returns count of deleted entries."""
-        result = await self.db.execute(select(Memory))
-        memories = result.scalars().all()
-        count = len(memories)
-        for mem in memories:
-            await self.db.delete(mem)
-        await self.db.flush()
+        result = await self.db.execute(delete(Memory))
+        count = result.rowcount or 0
+        invalidate_memory_prompt()
         logger.info(f"All memories cleared: {count} entries")
         return count
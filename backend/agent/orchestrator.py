@@ -4,7 +4,9 @@ Axon by NeuroVexon - Agent Orchestrator
 Koordiniert LLM, Tools und Permissions.
 """
 
-from typing import AsyncGenerator, Optional, Callable, Awaitable
+from typing import Any, AsyncGenerator, Optional, Callable, Awaitable
+import asyncio
+import contextlib
 import time
 import logging
 
@@ -12,15 +14,54 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from .tool_registry import ToolRegistry, tool_registry
 from .permission_manager import PermissionManager, permission_manager, PermissionScope
-from .audit_logger import AuditLogger
+from .audit_logger import AuditLogger, MAX_AUDIT_RESULT_LENGTH
 from .tool_handlers import execute_tool, ToolExecutionError
 from .agent_manager import AgentManager
-from llm.provider import BaseLLMProvider, ChatMessage
+from llm.provider import BaseLLMProvider, ChatMessage, ToolCall
 from db.models import Agent
 from core.i18n import t
 
 logger = logging.getLogger(__name__)
 
+# Auto-approved tool calls of one LLM response that may run at the same time
+MAX_TOOL_CONCURRENCY = 4
+
+
+def _preview(result: Any, limit: int = 500) -> str:
+    """
+    First `limit` characters of str(result), without stringifying all of it.
+
+    Tool results can be large (web pages, search result lists). Lists and dicts
+    are rendered item by item until the limit is reached — the text is the same
+    prefix str() would produce.
+    """
+    if isinstance(result, str):
+        return result[:limit]
+    if isinstance(result, (bytes, bytearray)):
+        head = repr(bytes(memoryview(result)[:limit]))
+        if isinstance(result, bytearray):
+            head = f"bytearray({head})"
+        return head[:limit]
+    if type(result) in (list, dict):
+        if type(result) is list:
+            parts, open_, close = (repr(item) for item in result), "[", "]"
+        else:
+            parts = (f"{k!r}: {v!r}" for k, v in result.items())
+            open_, close = "{", "}"
+        out = [open_]
+        length = 1
+        for i, part in enumerate(parts):
+            if i:
+                out.append(", ")
+                length += 2
+            out.append(part)
+            length += len(part)
+            if length >= limit:
+                return "".join(out)[:limit]
+        out.append(close)
+        return "".join(out)[:limit]
+    return str(result)[:limit]
+
 
 class AgentOrchestrator:
     """
@@ -39,12 +80,18 @@ class AgentOrchestrator:
         tools: Optional[ToolRegistry] = None,
         permissions: Optional[PermissionManager] = None,
         agent: Optional[Agent] = None,
+        max_concurrency: int = MAX_TOOL_CONCURRENCY,
     ):
         self.llm = llm_provider
         self.tools = tools or tool_registry
         self.permissions = permissions or permission_manager
         self.audit = AuditLogger(db_session)
         self.agent = agent  # Agent-Profil mit Permissions
+        # Permission-Entscheidungen dieses Requests (siehe AgentManager)
+        self._permission_cache: dict = {}
+        self._tool_semaphore = asyncio.Semaphore(max_concurrency)
+        # Memory-Tools nutzen die gemeinsame Session → nie parallel
+        self._db_lock = asyncio.Lock()
 
     async def process_message(
         self,
@@ -58,7 +105,7 @@ class AgentOrchestrator:
 
         Args:
             session_id: The conversation session ID
-            messages: Chat history including the new user message
+            messages: Chat history including the new user message (not modified)
             on_approval_needed: Async callback when tool approval is needed.
                                 Returns PermissionScope or None for rejection.
             max_tool_iterations: Maximum number of tool call iterations
@@ -67,14 +114,31 @@ class AgentOrchestrator:
             Dicts with type: 'text', 'tool_request', 'tool_result', 'done'
         """
 
+        # Own copy: tool results of this run don't leak into the caller's list.
+        # Appends only happen in this generator, never from the gathered tasks.
+        messages = list(messages)
         iteration = 0
+        # Tool definitions don't change during a message
+        tools_for_llm = self.tools.get_tools_for_llm()
+        if self.agent is not None:
+            # Only offer tools this agent may use — fewer prompt tokens and no
+            # iterations wasted on calls that would be rejected anyway
+            tools_for_llm = [
+                tool
+                for tool in tools_for_llm
+                if AgentManager.is_tool_allowed(
+                    self.agent, tool["function"]["name"], cache=self._permission_cache
+                )
+            ]
 
         while iteration < max_tool_iterations:
             iteration += 1
 
-            # Call LLM with tools
+            # Call LLM with tools — except in the last round: tool results from
+            # there would never be interpreted, so ask for the final answer
             response = await self.llm.chat(
-                messages=messages, tools=self.tools.get_tools_for_llm()
+                messages=messages,
+                tools=tools_for_llm if iteration < max_tool_iterations else None,
             )
 
             # If no tool calls, we're done
@@ -84,106 +148,99 @@ class AgentOrchestrator:
                 yield {"type": "done"}
                 return
 
-            # Process each tool call
-            for tool_call in response.tool_calls:
-                tool_name = tool_call.name
-                tool_params = tool_call.parameters
-
-                # Get tool definition
-                tool_def = self.tools.get(tool_name)
-                if not tool_def:
-                    yield {
-                        "type": "tool_error",
-                        "tool": tool_name,
-                        "error": f"Unknown tool: {tool_name}",
-                    }
-                    continue
-
-                # Agent-level permission check: is this tool allowed for this agent?
-                if self.agent and not AgentManager.is_tool_allowed(
-                    self.agent, tool_name
-                ):
-                    logger.info(
-                        f"Agent '{self.agent.name}' darf {tool_name} nicht nutzen"
-                    )
-                    yield {
-                        "type": "tool_error",
-                        "tool": tool_name,
-                        "error": t(
-                            "orch.agent_no_access",
-                            agent=self.agent.name,
-                            tool=tool_name,
-                        ),
-                    }
-                    messages.append(
-                        ChatMessage(
-                            role="assistant",
-                            content=t("orch.tool_not_allowed", tool=tool_name),
-                        )
-                    )
-                    continue
-
-                # Log the request
-                await self.audit.log_tool_request(session_id, tool_name, tool_params)
-
-                # Check auto-approve: agent-level OR tool-level
-                agent_auto_approved = (
-                    self.agent is not None
-                    and AgentManager.is_auto_approved(self.agent, tool_name)
-                )
+            # Process each tool call (audit events of this round in one commit)
+            async with self.audit.batch():
+                # Phase 1: classify — unknown/forbidden tools are answered right
+                # away, auto-approved ones are collected for concurrent execution
+                auto_calls = []
+                approval_calls = []
+                for tool_call in response.tool_calls:
+                    tool_name = tool_call.name
+                    tool_params = tool_call.parameters
+
+                    # Get tool definition
+                    tool_def = self.tools.get(tool_name)
+                    if not tool_def:
+                        yield {
+                            "type": "tool_error",
+                            "tool": tool_name,
+                            "error": f"Unknown tool: {tool_name}",
+                        }
+                        continue
 
-                if not tool_def.requires_approval or agent_auto_approved:
-                    logger.info(f"Auto-approving {tool_name} (requires_approval=False)")
-                    # Skip approval flow, go straight to execution
-                    start_time = time.time()
-                    try:
-                        result = await execute_tool(
-                            tool_name, tool_params, db_session=self.audit.db
-                        )
-                        execution_time_ms = int((time.time() - start_time) * 1000)
-
-                        await self.audit.log_tool_execution(
-                            session_id,
-                            tool_name,
-                            tool_params,
-                            str(result),
-                            execution_time_ms,
+                    # Agent-level permission check (defense in depth — the LLM
+                    # only sees allowed tools but may still name others)
+                    if self.agent and not AgentManager.is_tool_allowed(
+                        self.agent, tool_name, cache=self._permission_cache
+                    ):
+                        logger.info(
+                            f"Agent '{self.agent.name}' darf {tool_name} nicht nutzen"
                         )
-
                         yield {
-                            "type": "tool_result",
+                            "type": "tool_error",
                             "tool": tool_name,
-                            "result": result,
-                            "execution_time_ms": execution_time_ms,
+                            "error": t(
+                                "orch.agent_no_access",
+                                agent=self.agent.name,
+                                tool=tool_name,
+                            ),
                         }
-
                         messages.append(
                             ChatMessage(
                                 role="assistant",
-                                content=f"Tool {tool_name} executed. Result: {str(result)[:500]}",
+                                content=t("orch.tool_not_allowed", tool=tool_name),
                             )
                         )
+                        continue
 
-                    except Exception as e:
-                        logger.exception(f"Error executing auto-approved {tool_name}")
-                        await self.audit.log_tool_failure(
-                            session_id, tool_name, tool_params, str(e)
-                        )
-                        yield {"type": "tool_error", "tool": tool_name, "error": str(e)}
-                        messages.append(
-                            ChatMessage(
-                                role="assistant",
-                                content=f"Tool {tool_name} failed: {str(e)}",
-                            )
+                    # Log the request
+                    await self.audit.log_tool_request(
+                        session_id, tool_name, tool_params
+                    )
+
+                    # Check auto-approve: agent-level OR tool-level
+                    agent_auto_approved = (
+                        self.agent is not None
+                        and AgentManager.is_auto_approved(
+                            self.agent, tool_name, cache=self._permission_cache
                         )
-                    continue
+                    )
 
-                # Check existing permission
-                has_permission = self.permissions.check_permission(
-                    session_id, tool_name, tool_params
+                    if not tool_def.requires_approval or agent_auto_approved:
+                        logger.info(
+                            f"Auto-approving {tool_name} (requires_approval=False)"
+                        )
+                        auto_calls.append(tool_call)
+                    else:
+                        approval_calls.append((tool_call, tool_def))
+
+                # Phase 2: auto-approved tools run concurrently; results are
+                # reported in call order so the follow-up prompt stays stable
+                outcomes = await asyncio.gather(
+                    *(self._execute_tool(tc.name, tc.parameters) for tc in auto_calls)
                 )
+                for tool_call, outcome in zip(auto_calls, outcomes):
+                    async for event in self._report_outcome(
+                        session_id, tool_call, outcome, messages
+                    ):
+                        yield event
+
+                # Phase 3: tools that need approval — all approval requests of
+                # this response go out at once and are awaited together
+                ready = []  # (position, tool_call, approval_id) cleared to run
+                pending = []  # (position, tool_call, approval request)
+                granted = self.permissions.check_permissions_bulk(
+                    session_id, [(tc.name, tc.parameters) for tc, _ in approval_calls]
+                )
+                for position, (tool_call, tool_def) in enumerate(approval_calls):
+                    tool_name = tool_call.name
+                    tool_params = tool_call.parameters
+
+                    # Check existing permission
+                    if granted[position]:
+                        ready.append((position, tool_call, None))
+                        continue
 
-                if not has_permission:
                     # Check if blocked
                     if self.permissions.is_blocked(tool_name, tool_params):
                         await self.audit.log_tool_rejection(
@@ -210,10 +267,7 @@ class AgentOrchestrator:
                         description=tool_def.get_description(),
                         risk_level=tool_def.risk_level.value,
                     )
-
-                    # Yield tool request with approval_id to UI
-                    yield {
-                        "type": "tool_request",
+                    request = {
                         "tool": tool_name,
                         "params": tool_params,
                         "description": tool_def.description_de,
@@ -221,91 +275,69 @@ class AgentOrchestrator:
                         "approval_id": approval_id,
                     }
 
-                    # Wait for approval decision
-                    decision = await on_approval_needed(
-                        {
-                            "tool": tool_name,
-                            "params": tool_params,
-                            "description": tool_def.description_de,
-                            "risk_level": tool_def.risk_level.value,
-                            "approval_id": approval_id,
-                        }
-                    )
+                    # Yield tool request with approval_id to UI
+                    yield {"type": "tool_request", **request}
+                    pending.append((position, tool_call, request))
 
-                    if decision is None:
-                        await self.audit.log_tool_rejection(
-                            session_id, tool_name, tool_params, "rejected"
+                if pending:
+                    # Persist this round's audit events before blocking
+                    # on the user — the decisions can take minutes
+                    await self.audit.flush()
+
+                    # Wait for all approval decisions concurrently
+                    try:
+                        decisions = await asyncio.gather(
+                            *(on_approval_needed(request) for _, _, request in pending)
                         )
-                        yield {"type": "tool_rejected", "tool": tool_name}
-                        messages.append(
-                            ChatMessage(
-                                role="assistant",
-                                content=t("orch.user_rejected", tool=tool_name),
+                    finally:
+                        for _, _, request in pending:
+                            self.permissions.resolve_approval(request["approval_id"])
+
+                    for (position, tool_call, request), decision in zip(
+                        pending, decisions
+                    ):
+                        tool_name = tool_call.name
+                        tool_params = tool_call.parameters
+
+                        if decision is None:
+                            await self.audit.log_tool_rejection(
+                                session_id, tool_name, tool_params, "rejected"
                             )
-                        )
-                        continue
-
-                    # Grant permission
-                    self.permissions.grant_permission(
-                        session_id, tool_name, tool_params, decision
-                    )
-                    await self.audit.log_tool_approval(
-                        session_id, tool_name, tool_params, decision.value
-                    )
-
-                # Execute the tool (pass db_session for memory tools)
-                start_time = time.time()
-                try:
-                    result = await execute_tool(
-                        tool_name, tool_params, db_session=self.audit.db
-                    )
-                    execution_time_ms = int((time.time() - start_time) * 1000)
-
-                    await self.audit.log_tool_execution(
-                        session_id,
-                        tool_name,
-                        tool_params,
-                        str(result),
-                        execution_time_ms,
-                    )
-
-                    yield {
-                        "type": "tool_result",
-                        "tool": tool_name,
-                        "result": result,
-                        "execution_time_ms": execution_time_ms,
-                    }
+                            yield {
+                                "type": "tool_rejected",
+                                "tool": tool_name,
+                                "approval_id": request["approval_id"],
+                            }
+                            messages.append(
+                                ChatMessage(
+                                    role="assistant",
+                                    content=t("orch.user_rejected", tool=tool_name),
+                                )
+                            )
+                            continue
 
-                    # Add result to messages for next LLM call
-                    messages.append(
-                        ChatMessage(
-                            role="assistant",
-                            content=f"Tool {tool_name} executed. Result: {str(result)[:500]}",
+                        # Grant permission
+                        self.permissions.grant_permission(
+                            session_id, tool_name, tool_params, decision
                         )
-                    )
-
-                except ToolExecutionError as e:
-                    await self.audit.log_tool_failure(
-                        session_id, tool_name, tool_params, str(e)
-                    )
-                    yield {"type": "tool_error", "tool": tool_name, "error": str(e)}
-                    messages.append(
-                        ChatMessage(
-                            role="assistant",
-                            content=f"Tool {tool_name} failed: {str(e)}",
+                        await self.audit.log_tool_approval(
+                            session_id, tool_name, tool_params, decision.value
                         )
-                    )
+                        ready.append((position, tool_call, request["approval_id"]))
 
-                except Exception as e:
-                    logger.exception(f"Unexpected error executing {tool_name}")
-                    await self.audit.log_tool_failure(
-                        session_id, tool_name, tool_params, str(e)
+                # Approved tools run one after another, in call order
+                ready.sort(key=lambda item: item[0])
+                for _, tool_call, approval_id in ready:
+                    outcome = await self._execute_tool(
+                        tool_call.name, tool_call.parameters
                     )
-                    yield {
-                        "type": "tool_error",
-                        "tool": tool_name,
-                        "error": f"Unexpected error: {str(e)}",
-                    }
+                    async for event in self._report_outcome(
+                        session_id, tool_call, outcome, messages
+                    ):
+                        # approval_id lets the UI update the matching request
+                        if approval_id:
+                            event["approval_id"] = approval_id
+                        yield event
 
             # If we had partial text response, yield it
             if response.content:
@@ -314,3 +346,88 @@ class AgentOrchestrator:
         # Max iterations reached
         yield {"type": "warning", "message": "Maximum tool iterations reached"}
         yield {"type": "done"}
+
+    async def _execute_tool(
+        self, tool_name: str, tool_params: dict
+    ) -> tuple[Any, int, Optional[Exception]]:
+        """
+        Execute one tool call (pass db_session for memory tools).
+
+        Returns (result, execution_time_ms, error). At most max_concurrency tools
+        run at once; memory tools share the DB session and run one at a time.
+        """
+        async with self._tool_semaphore:
+            lock = (
+                self._db_lock
+                if tool_name.startswith("memory_")
+                else contextlib.nullcontext()
+            )
+            async with lock:
+                start_time = time.time()
+                try:
+                    # Memory writes are committed with the round's audit batch
+                    result = await execute_tool(
+                        tool_name, tool_params, db_session=self.audit.db, commit=False
+                    )
+                except ToolExecutionError as e:
+                    return None, int((time.time() - start_time) * 1000), e
+                except Exception as e:
+                    logger.exception(f"Unexpected error executing {tool_name}")
+                    return None, int((time.time() - start_time) * 1000), e
+                return result, int((time.time() - start_time) * 1000), None
+
+    async def _report_outcome(
+        self,
+        session_id: str,
+        tool_call: ToolCall,
+        outcome: tuple[Any, int, Optional[Exception]],
+        messages: list[ChatMessage],
+    ) -> AsyncGenerator[dict, None]:
+        """Audit an executed tool call, yield its event and add it to the history"""
+        tool_name = tool_call.name
+        tool_params = tool_call.parameters
+        result, execution_time_ms, error = outcome
+
+        if error is not None:
+            await self.audit.log_tool_failure(
+                session_id, tool_name, tool_params, str(error)
+            )
+            yield {
+                "type": "tool_error",
+                "tool": tool_name,
+                "error": (
+                    str(error)
+                    if isinstance(error, ToolExecutionError)
+                    else f"Unexpected error: {str(error)}"
+                ),
+            }
+            messages.append(
+                ChatMessage(
+                    role="assistant",
+                    content=f"Tool {tool_name} failed: {str(error)}",
+                )
+            )
+            return
+
+        await self.audit.log_tool_execution(
+            session_id,
+            tool_name,
+            tool_params,
+            _preview(result, MAX_AUDIT_RESULT_LENGTH),
+            execution_time_ms,
+        )
+
+        yield {
+            "type": "tool_result",
+            "tool": tool_name,
+            "result": result,
+            "execution_time_ms": execution_time_ms,
+        }
+
+        # Add result to messages for next LLM call
+        messages.append(
+            ChatMessage(
+                role="assistant",
+                content=f"Tool {tool_name} executed. Result: {_preview(result)}",
+            )
+        )
@@ -2,13 +2,20 @@
 Axon by NeuroVexon - Permission Manager
 """
 
+from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Set, Optional
-import hashlib
+from typing import Dict, List, Set, Optional, Tuple
+import json
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 
+# Permission keys are plain tuples — sets hash them natively:
+#   (tool,)          tool-level (session grant)
+#   (tool, params)   exact call, params as sort_keys JSON string
+PermissionKey = Tuple
+
 
 class PermissionScope(str, Enum):
     ONCE = "once"  # One-time permission
@@ -16,49 +23,59 @@ class PermissionScope(str, Enum):
     NEVER = "never"  # Block permanently
 
 
+@dataclass(slots=True, frozen=True)
+class ApprovalRequest:
+    """A tool call waiting for the user's decision"""
+
+    id: str
+    session_id: str
+    tool: str
+    params: dict
+    description: str
+    risk_level: str
+
+
 class PermissionManager:
     """Manages tool execution permissions"""
 
     def __init__(self):
         # Session-based permissions: session_id -> set of permission keys
-        self._session_permissions: Dict[str, Set[str]] = {}
+        self._session_permissions: Dict[str, Set[PermissionKey]] = {}
         # Blocked patterns: set of permission keys that are permanently blocked
-        self._blocked: Set[str] = set()
+        self._blocked: Set[PermissionKey] = set()
         # Pending approvals: approval_id -> approval request
-        self._pending: Dict[str, dict] = {}
+        self._pending: Dict[str, ApprovalRequest] = {}
 
-    def _create_permission_key(self, tool: str, params: dict) -> str:
+    def _create_permission_key(self, tool: str, params: dict) -> PermissionKey:
         """Create a unique key for a tool+params combination"""
-        # Sort params for consistent hashing
-        param_str = str(sorted(params.items()))
-        return hashlib.sha256(f"{tool}:{param_str}".encode()).hexdigest()[:16]
+        # JSON keeps True, 1 and 1.0 apart (as tuple items they compare equal)
+        return (tool, json.dumps(params, sort_keys=True, default=str))
 
-    def _create_tool_key(self, tool: str) -> str:
+    def _create_tool_key(self, tool: str) -> PermissionKey:
         """Create a key for tool-level permission"""
-        return hashlib.sha256(f"tool:{tool}".encode()).hexdigest()[:16]
+        return (tool,)
 
     def check_permission(self, session_id: str, tool: str, params: dict) -> bool:
         """Check if permission exists for this tool call"""
-        # Check if blocked
-        exact_key = self._create_permission_key(tool, params)
-        tool_key = self._create_tool_key(tool)
-
-        if exact_key in self._blocked or tool_key in self._blocked:
-            logger.info(f"Tool {tool} is blocked")
-            return False
-
-        # Check session permissions
-        session_perms = self._session_permissions.get(session_id, set())
-
-        # Check exact match first
-        if exact_key in session_perms:
-            return True
-
-        # Check tool-level permission
-        if tool_key in session_perms:
-            return True
-
-        return False
+        return self.check_permissions_bulk(session_id, [(tool, params)])[0]
+
+    def check_permissions_bulk(
+        self, session_id: str, calls: List[Tuple[str, dict]]
+    ) -> List[bool]:
+        """Check permissions for several (tool, params) calls of one session"""
+        # Session lookup once per batch; blocked keys always win
+        session_perms = self._session_permissions.get(session_id, ())
+        blocked = self._blocked
+        results = []
+        for tool, params in calls:
+            exact_key = self._create_permission_key(tool, params)
+            tool_key = self._create_tool_key(tool)
+            if exact_key in blocked or tool_key in blocked:
+                logger.info(f"Tool {tool} is blocked")
+                results.append(False)
+            else:
+                results.append(exact_key in session_perms or tool_key in session_perms)
+        return results
 
     def grant_permission(
         self, session_id: str, tool: str, params: dict, scope: PermissionScope
@@ -126,32 +143,35 @@ class PermissionManager:
         risk_level: str,
     ) -> str:
         """Create a pending approval request"""
-        import uuid
-
-        approval_id = str(uuid.uuid4())[:8]
-
-        self._pending[approval_id] = {
-            "id": approval_id,
-            "session_id": session_id,
-            "tool": tool,
-            "params": params,
-            "description": description,
-            "risk_level": risk_level,
-        }
+        approval_id = secrets.token_hex(4)
+        while approval_id in self._pending:
+            approval_id = secrets.token_hex(4)
+
+        self._pending[approval_id] = ApprovalRequest(
+            id=approval_id,
+            session_id=session_id,
+            tool=tool,
+            params=params,
+            description=description,
+            risk_level=risk_level,
+        )
 
         return approval_id
 
-    def get_pending_approval(self, approval_id: str) -> Optional[dict]:
+    def get_pending_approval(self, approval_id: str) -> Optional[ApprovalRequest]:
         """Get a pending approval request"""
         return self._pending.get(approval_id)
 
-    def resolve_approval(self, approval_id: str) -> Optional[dict]:
+    def resolve_approval(self, approval_id: str) -> Optional[ApprovalRequest]:
         """Remove and return a pending approval"""
         return self._pending.pop(approval_id, None)
 
     def get_session_permissions(self, session_id: str) -> list[str]:
         """Get all permissions for a session (for debugging)"""
-        return list(self._session_permissions.get(session_id, set()))
+        return sorted(
+            key[0] if len(key) == 1 else f"{key[0]}({key[1]})"
+            for key in self._session_permissions.get(session_id, set())
+        )
 
 
 # Global instance
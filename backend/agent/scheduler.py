@@ -7,8 +7,12 @@ Sicherheit: Max 10 aktive Tasks, Timeout 5 Min, max 1/min pro Task.
 
 import asyncio
 import logging
+import time
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional
 
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy import select
@@ -26,12 +30,49 @@ MAX_ACTIVE_TASKS = 10
 TASK_TIMEOUT_SECONDS = 300  # 5 Minuten
 MAX_RESULT_LENGTH = 5000
 
+# Geplante Tasks liegen in einem eigenen Jobstore
+TASK_JOBSTORE = "tasks"
+
+
+# Settings-Snapshot statt einer Settings-Query pro Task-Ausfuehrung
+SETTINGS_CACHE_TTL = 30  # Sekunden
+_settings_cache: Optional[tuple[float, dict]] = None
+
+
+def invalidate_settings_cache():
+    """Settings-Snapshot verwerfen (nach Aenderungen an den Settings)"""
+    global _settings_cache
+    _settings_cache = None
+
+
+async def _load_settings(db) -> dict:
+    """Alle DB-Settings als dict — gecacht fuer SETTINGS_CACHE_TTL Sekunden"""
+    global _settings_cache
+    if _settings_cache is not None:
+        loaded_at, db_settings = _settings_cache
+        if time.monotonic() - loaded_at < SETTINGS_CACHE_TTL:
+            return db_settings
+
+    from db.models import Settings as SettingsModel
+
+    result = await db.execute(select(SettingsModel))
+    db_settings = {s.key: s.value for s in result.scalars().all()}
+    _settings_cache = (time.monotonic(), db_settings)
+    return db_settings
+
+
+@lru_cache(maxsize=64)
+def cron_trigger(expression: str) -> CronTrigger:
+    """CronTrigger fuer einen Cron-Ausdruck — einmal geparst, danach wiederverwendet"""
+    return CronTrigger.from_crontab(expression)
+
 
 class TaskScheduler:
     """Verwaltet und fuehrt geplante Tasks aus"""
 
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_jobstore(MemoryJobStore(), TASK_JOBSTORE)
         self._running = False
 
     def start(self):
@@ -58,11 +99,8 @@ class TaskScheduler:
             )
             tasks = result.scalars().all()
 
-            # Alle bestehenden Jobs entfernen
-            existing_jobs = {job.id for job in self.scheduler.get_jobs()}
-            for job_id in existing_jobs:
-                if job_id.startswith("task_"):
-                    self.scheduler.remove_job(job_id)
+            # Alle bestehenden Task-Jobs entfernen (eigener Jobstore → ein Aufruf)
+            self.scheduler.remove_all_jobs(jobstore=TASK_JOBSTORE)
 
             # Safety: Max 10 Tasks
             active_tasks = tasks[:MAX_ACTIVE_TASKS]
@@ -73,12 +111,13 @@ class TaskScheduler:
 
             for task in active_tasks:
                 try:
-                    trigger = CronTrigger.from_crontab(task.cron_expression)
+                    trigger = cron_trigger(task.cron_expression)
                     self.scheduler.add_job(
                         self._execute_task,
                         trigger=trigger,
                         id=f"task_{task.id}",
                         args=[task.id],
+                        jobstore=TASK_JOBSTORE,
                         replace_existing=True,
                         misfire_grace_time=60,
                     )
@@ -86,23 +125,21 @@ class TaskScheduler:
                 except Exception as e:
                     logger.error(f"Fehler beim Planen von Task '{task.name}': {e}")
 
-    async def _execute_task(self, task_id: str):
-        """Task ausfuehren (wird vom Scheduler aufgerufen)"""
+    async def _execute_task(self, task_id: str) -> Optional[ScheduledTask]:
+        """
+        Task ausfuehren (wird vom Scheduler aufgerufen).
+        Eine Session pro Ausfuehrung; gibt den Task zurueck (None falls unbekannt).
+        """
         from db.database import async_session
 
         async with async_session() as db:
             task = await db.get(ScheduledTask, task_id)
             if not task or not task.enabled:
-                return
+                return task
 
             # Load language from settings for scheduled context
-            from db.models import Settings as SettingsModel
-
-            lang_result = await db.execute(
-                select(SettingsModel).where(SettingsModel.key == "language")
-            )
-            lang_setting = lang_result.scalar_one_or_none()
-            set_language(lang_setting.value if lang_setting else "de")
+            db_settings = await _load_settings(db)
+            set_language(db_settings.get("language", "de"))
 
             logger.info(f"Fuehre Task '{task.name}' aus...")
             task.last_run = datetime.utcnow()
@@ -123,14 +160,12 @@ class TaskScheduler:
                 logger.error(f"Task '{task.name}' Fehler: {e}")
 
             await db.commit()
+            return task
 
     async def _run_prompt(self, task: ScheduledTask, db) -> str:
         """Prompt an LLM senden und Antwort holen"""
         # Load settings for LLM provider
-        from db.models import Settings as SettingsModel
-
-        result = await db.execute(select(SettingsModel))
-        db_settings = {s.key: s.value for s in result.scalars().all()}
+        db_settings = await _load_settings(db)
 
         current_provider = db_settings.get("llm_provider", "ollama")
         llm_router.update_settings(db_settings)
@@ -150,13 +185,9 @@ class TaskScheduler:
 
     async def run_task_now(self, task_id: str) -> str:
         """Task sofort manuell ausfuehren"""
-        await self._execute_task(task_id)
-
-        from db.database import async_session
-
-        async with async_session() as db:
-            task = await db.get(ScheduledTask, task_id)
-            return task.last_result if task else t("scheduler.not_found")
+        # Ergebnis direkt aus dem ausgefuehrten Task — keine zweite Session
+        task = await self._execute_task(task_id)
+        return task.last_result if task else t("scheduler.not_found")
 
 
 # Global instance
@@ -10,6 +10,8 @@ Sicherheit:
 - Änderungen am Skill-Code → automatische Revocation
 """
 
+import ast
+import asyncio
 import hashlib
 import importlib.util
 import logging
@@ -31,19 +33,68 @@ SKILLS_DIR = os.path.join(
 )
 
 
+# Caches: path -> (stat signature, Ergebnis). Unveränderte Dateien werden
+# nicht erneut gelesen; jede Änderung (mtime, ctime, Größe, Inode) → neu prüfen.
+_hash_cache: dict[str, tuple[tuple[int, int, int, int], str]] = {}
+_metadata_cache: dict[
+    str, tuple[tuple[int, int, int, int], tuple[bool, str, Optional[dict]]]
+] = {}
+
+
+def _stat_signature(file_path: str) -> tuple[int, int, int, int]:
+    st = os.stat(file_path)
+    return (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+
+
 def compute_file_hash(file_path: str) -> str:
-    """Berechnet SHA-256 Hash einer Datei"""
-    sha256 = hashlib.sha256()
+    """Berechnet SHA-256 Hash einer Datei (gecacht bis sich die Datei ändert)"""
+    signature = _stat_signature(file_path)
+    cached = _hash_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(file_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    _hash_cache[file_path] = (signature, digest)
+    return digest
+
+
+def _read_module_constants(file_path: str) -> tuple[dict[str, Any], set[str]]:
+    """
+    Liest Top-Level-Konstanten (SKILL_*) und Funktionsnamen per AST,
+    ohne den Modul-Code auszuführen.
+    """
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+        tree = ast.parse(f.read(), filename=file_path)
+
+    constants: dict[str, Any] = {}
+    functions: set[str] = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.add(node.name)
+            continue
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id.startswith("SKILL_"):
+                try:
+                    constants[target.id] = ast.literal_eval(value)
+                except (ValueError, TypeError):
+                    constants.pop(target.id, None)
+    return constants, functions
 
 
 def validate_skill_module(file_path: str) -> tuple[bool, str, Optional[dict]]:
     """
     Validiert ob eine Datei ein gültiges Skill-Modul ist.
     Gibt (valid, error_msg, metadata) zurück.
+
+    Die Datei wird nur geparst, nicht ausgeführt — SKILL_* Attribute müssen
+    daher Literale sein. Ausgeführt wird ein Skill erst in load_skill().
     """
     if not os.path.isfile(file_path):
         return False, f"Datei nicht gefunden: {file_path}", None
@@ -51,30 +102,43 @@ def validate_skill_module(file_path: str) -> tuple[bool, str, Optional[dict]]:
     if not file_path.endswith(".py"):
         return False, "Skill muss eine .py Datei sein", None
 
+    signature = _stat_signature(file_path)
+    cached = _metadata_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    result = _validate_skill_source(file_path)
+    _metadata_cache[file_path] = (signature, result)
+    return result
+
+
+def _validate_skill_source(file_path: str) -> tuple[bool, str, Optional[dict]]:
     try:
-        spec = importlib.util.spec_from_file_location("skill_check", file_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        constants, functions = _read_module_constants(file_path)
     except Exception as e:
         return False, f"Fehler beim Laden: {e}", None
 
-    missing = [attr for attr in REQUIRED_ATTRIBUTES if not hasattr(module, attr)]
+    missing = [
+        attr
+        for attr in REQUIRED_ATTRIBUTES
+        if attr not in constants and attr not in functions
+    ]
     if missing:
         return False, f"Fehlende Attribute: {', '.join(missing)}", None
 
-    if not callable(getattr(module, "execute", None)):
+    if "execute" not in functions:
         return False, "execute muss eine Funktion sein", None
 
     metadata = {
-        "name": getattr(module, "SKILL_NAME", ""),
-        "description": getattr(module, "SKILL_DESCRIPTION", ""),
-        "version": getattr(module, "SKILL_VERSION", "1.0.0"),
-        "author": getattr(module, "SKILL_AUTHOR", None),
-        "risk_level": getattr(module, "SKILL_RISK_LEVEL", "medium"),
-        "display_name": getattr(
-            module, "SKILL_DISPLAY_NAME", getattr(module, "SKILL_NAME", "")
+        "name": constants.get("SKILL_NAME", ""),
+        "description": constants.get("SKILL_DESCRIPTION", ""),
+        "version": constants.get("SKILL_VERSION", "1.0.0"),
+        "author": constants.get("SKILL_AUTHOR"),
+        "risk_level": constants.get("SKILL_RISK_LEVEL", "medium"),
+        "display_name": constants.get(
+            "SKILL_DISPLAY_NAME", constants.get("SKILL_NAME", "")
         ),
-        "parameters": getattr(module, "SKILL_PARAMETERS", {}),
+        "parameters": constants.get("SKILL_PARAMETERS", {}),
     }
 
     return True, "", metadata
@@ -97,7 +161,8 @@ class SkillLoader:
             skills_path.mkdir(parents=True, exist_ok=True)
             return []
 
-        found_skills = []
+        # Erster Durchlauf: validieren (seriell), dann parallel hashen
+        valid_files: list[tuple[Path, dict]] = []
         for py_file in skills_path.glob("*.py"):
             if py_file.name.startswith("_"):
                 continue
@@ -107,13 +172,29 @@ class SkillLoader:
                 logger.warning(f"Skill ungültig: {py_file.name} — {error}")
                 continue
 
-            file_hash = compute_file_hash(str(py_file))
+            valid_files.append((py_file, metadata))
 
-            # Prüfen ob der Skill in der DB ist
-            result = await self.db.execute(
-                select(Skill).where(Skill.name == metadata["name"])
-            )
-            db_skill = result.scalar_one_or_none()
+        if not valid_files:
+            return []
+
+        # SHA-256 gibt den GIL frei → echte Parallelität, Event-Loop blockiert nicht
+        hashes = await asyncio.gather(
+            *(asyncio.to_thread(compute_file_hash, str(f)) for f, _ in valid_files)
+        )
+        entries = [
+            (py_file, metadata, file_hash)
+            for (py_file, metadata), file_hash in zip(valid_files, hashes)
+        ]
+
+        # Alle bekannten Skills mit einer Query laden (statt einer pro Datei)
+        names = {metadata["name"] for _, metadata, _ in entries}
+        result = await self.db.execute(select(Skill).where(Skill.name.in_(names)))
+        existing = {skill.name: skill for skill in result.scalars()}
+
+        # Zweiter Durchlauf: abgleichen im Speicher, ein Flush am Ende
+        scanned: list[tuple[Skill, str, bool]] = []
+        for py_file, metadata, file_hash in entries:
+            db_skill = existing.get(metadata["name"])
 
             if db_skill:
                 # Hash-Check — hat sich die Datei geändert?
@@ -124,21 +205,7 @@ class SkillLoader:
                     db_skill.file_hash = file_hash
                     db_skill.approved = False
                     db_skill.enabled = False
-                    await self.db.flush()
-
-                found_skills.append(
-                    {
-                        "id": db_skill.id,
-                        "name": db_skill.name,
-                        "display_name": db_skill.display_name,
-                        "description": db_skill.description,
-                        "version": db_skill.version,
-                        "enabled": db_skill.enabled,
-                        "approved": db_skill.approved,
-                        "risk_level": db_skill.risk_level,
-                        "file_changed": db_skill.file_hash != file_hash,
-                    }
-                )
+                scanned.append((db_skill, file_hash, False))
             else:
                 # Neuer Skill — in DB registrieren (nicht approved)
                 new_skill = Skill(
@@ -154,21 +221,26 @@ class SkillLoader:
                     approved=False,
                 )
                 self.db.add(new_skill)
-                await self.db.flush()
-
-                found_skills.append(
-                    {
-                        "id": new_skill.id,
-                        "name": new_skill.name,
-                        "display_name": new_skill.display_name,
-                        "description": new_skill.description,
-                        "version": new_skill.version,
-                        "enabled": False,
-                        "approved": False,
-                        "risk_level": new_skill.risk_level,
-                        "file_changed": False,
-                    }
-                )
+                existing[new_skill.name] = new_skill
+                scanned.append((new_skill, file_hash, True))
+
+        await self.db.flush()
+
+        found_skills = []
+        for skill, file_hash, is_new in scanned:
+            found_skills.append(
+                {
+                    "id": skill.id,
+                    "name": skill.name,
+                    "display_name": skill.display_name,
+                    "description": skill.description,
+                    "version": skill.version,
+                    "enabled": False if is_new else skill.enabled,
+                    "approved": False if is_new else skill.approved,
+                    "risk_level": skill.risk_level,
+                    "file_changed": not is_new and skill.file_hash != file_hash,
+                }
+            )
 
         return found_skills
 
@@ -223,8 +295,6 @@ class SkillLoader:
             raise RuntimeError(f"Skill '{skill_name}' hat keine execute-Funktion")
 
         # Async oder sync ausführen
-        import asyncio
-
         if asyncio.iscoroutinefunction(execute_fn):
             return await execute_fn(params)
         return execute_fn(params)
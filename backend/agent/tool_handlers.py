@@ -4,9 +4,18 @@ Axon by NeuroVexon - Tool Handlers
 
 import os
 import asyncio
+import glob
+import http.cookiejar
+import importlib.util
+import re
+import shlex
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
 import httpx
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 import logging
 
 from core.config import settings
@@ -17,9 +26,88 @@ from core.security import (
     sanitize_filename,
 )
 from core.i18n import t
+from agent.memory import MemoryManager
+
+try:
+    from duckduckgo_search import DDGS
+except ImportError:  # optional — web_search faellt dann auf DuckDuckGo lite zurueck
+    DDGS = None
 
 logger = logging.getLogger(__name__)
 
+WEB_FETCH_MAX_CHARS = 10000
+FILE_LIST_MAX_ENTRIES = 100  # Limit für rekursive Listings
+SHELL_OUTPUT_MAX_CHARS = 5000
+
+# HTTP/2 nur wenn das optionale h2-Paket installiert ist (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Geteilter HTTP-Client für web_fetch/web_search — hält Verbindungen (TLS) offen
+_http_client: httpx.AsyncClient | None = None
+
+
+class _RejectAllCookies(http.cookiejar.DefaultCookiePolicy):
+    """Cookie policy that never stores a cookie"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            # Der Client wird von allen Sessions/Usern geteilt — Cookies aus einer
+            # Antwort duerfen nie bei der naechsten Anfrage mitgeschickt werden
+            cookies=http.cookiejar.CookieJar(policy=_RejectAllCookies()),
+            timeout=30.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=_HTTP2_AVAILABLE,
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Kurzlebiger Cache für web_fetch (nur GET) — Agenten holen dieselbe URL oft
+# mehrmals innerhalb eines Plans
+WEB_FETCH_CACHE_TTL = 60.0  # Sekunden
+WEB_FETCH_CACHE_SIZE = 128
+_fetch_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def _fetch_cache_get(url: str) -> str | None:
+    """Cached response text for url, or None if missing/expired (LRU + TTL)"""
+    entry = _fetch_cache.get(url)
+    if entry is None:
+        return None
+    stored_at, text = entry
+    if time.monotonic() - stored_at > WEB_FETCH_CACHE_TTL:
+        del _fetch_cache[url]
+        return None
+    _fetch_cache.move_to_end(url)
+    return text
+
+
+def _fetch_cache_put(url: str, text: str):
+    _fetch_cache[url] = (time.monotonic(), text)
+    _fetch_cache.move_to_end(url)
+    while len(_fetch_cache) > WEB_FETCH_CACHE_SIZE:
+        _fetch_cache.popitem(last=False)
+
+
+# DuckDuckGo-Clients für web_search
+# DDGS (HTML parser, rate-limit state) is not thread-safe → one instance per
+# worker thread, created lazily; searches in different threads run in parallel
+_ddgs_local = threading.local()
+
 
 class ToolExecutionError(Exception):
     """Error during tool execution"""
@@ -27,34 +115,38 @@ class ToolExecutionError(Exception):
     pass
 
 
-async def execute_tool(tool_name: str, params: dict, db_session=None) -> Any:
-    """Execute a tool and return the result"""
-    handlers = {
-        "file_read": handle_file_read,
-        "file_write": handle_file_write,
-        "file_list": handle_file_list,
-        "web_fetch": handle_web_fetch,
-        "web_search": handle_web_search,
-        "shell_execute": handle_shell_execute,
-        "memory_save": handle_memory_save,
-        "memory_search": handle_memory_search,
-        "memory_delete": handle_memory_delete,
-        "email_inbox": handle_email_inbox,
-        "email_send": handle_email_send,
-        "code_execute": handle_code_execute,
-    }
+async def execute_tool(
+    tool_name: str, params: dict, db_session=None, commit: bool = True
+) -> Any:
+    """
+    Execute a tool and return the result.
 
+    With commit=False memory tools leave their changes uncommitted — the caller
+    commits once for all tool calls of a round (see AgentOrchestrator).
+    """
     # Memory tools need db_session
-    if tool_name.startswith("memory_") and db_session:
+    if tool_name in _MEMORY_TOOLS and db_session:
         params["_db_session"] = db_session
+        params["_commit"] = commit
 
-    handler = handlers.get(tool_name)
+    handler = _HANDLERS.get(tool_name)
     if not handler:
         raise ToolExecutionError(f"Unknown tool: {tool_name}")
 
     return await handler(params)
 
 
+def _read_text_file(path: str, encoding: str, max_size: int) -> str:
+    """Read a text file, checking its size on the already opened handle"""
+    with open(path, "r", encoding=encoding) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size > max_size:
+            raise ToolExecutionError(
+                f"File too large: {file_size / 1024 / 1024:.2f}MB (max: {settings.max_file_size_mb}MB)"
+            )
+        return f.read()
+
+
 async def handle_file_read(params: dict) -> str:
     """Read a file"""
     path = params.get("path")
@@ -68,16 +160,12 @@ async def handle_file_read(params: dict) -> str:
         raise ToolExecutionError(f"Access denied: {path}")
 
     try:
-        # Check file size
-        file_size = os.path.getsize(path)
-        max_size = settings.max_file_size_mb * 1024 * 1024
-        if file_size > max_size:
-            raise ToolExecutionError(
-                f"File too large: {file_size / 1024 / 1024:.2f}MB (max: {settings.max_file_size_mb}MB)"
-            )
-
-        with open(path, "r", encoding=encoding) as f:
-            return f.read()
+        # Lesen + Decodieren im Thread — blockiert den Event-Loop nicht
+        return await asyncio.to_thread(
+            _read_text_file, path, encoding, settings.max_file_size_mb * 1024 * 1024
+        )
+    except ToolExecutionError:
+        raise
     except FileNotFoundError:
         raise ToolExecutionError(f"File not found: {path}")
     except PermissionError:
@@ -86,6 +174,25 @@ async def handle_file_read(params: dict) -> str:
         raise ToolExecutionError(f"Error reading file: {e}")
 
 
+@lru_cache(maxsize=4)
+def _outputs_dir(configured: str) -> Path:
+    """Resolved outputs directory, created once per configured path"""
+    outputs_dir = Path(configured).resolve()
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+    return outputs_dir
+
+
+def _write_text_file(path: Path, content: str) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    except FileNotFoundError:
+        # Verzeichnis wurde seit dem Caching geloescht
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
 async def handle_file_write(params: dict) -> str:
     """Write to a file (only in outputs directory)"""
     filename = params.get("filename")
@@ -95,21 +202,58 @@ async def handle_file_write(params: dict) -> str:
         raise ToolExecutionError("Missing 'filename' or 'content' parameter")
 
     # Security: Only allow writing to outputs directory
-    outputs_dir = Path(settings.outputs_dir).resolve()
-    outputs_dir.mkdir(parents=True, exist_ok=True)
-
     # Sanitize filename using central security module
     safe_filename = sanitize_filename(filename)
-    output_path = outputs_dir / safe_filename
+    output_path = _outputs_dir(settings.outputs_dir) / safe_filename
 
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        await asyncio.to_thread(_write_text_file, output_path, content)
         return f"File written: {output_path}"
     except Exception as e:
         raise ToolExecutionError(f"Error writing file: {e}")
 
 
+def _scan_dir(root: str, recursive: bool, limit: int | None = None):
+    """
+    Yield (relative name, DirEntry) pairs via os.scandir — breadth-first and
+    lazily, so a recursive listing stops after `limit` entries instead of
+    walking the whole subtree. DirEntry caches type/stat information.
+    Symlinked directories are listed but not descended into.
+    """
+    count = 0
+    pending = deque([(root, "")])
+    while pending:
+        directory, prefix = pending.popleft()
+        try:
+            it = os.scandir(directory)
+        except PermissionError:
+            if directory is root:
+                raise
+            continue  # Unterverzeichnis ohne Rechte überspringen
+        with it:
+            for entry in it:
+                name = os.path.join(prefix, entry.name) if prefix else entry.name
+                yield name, entry
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, name))
+
+
+def _list_dir(path: str, recursive: bool) -> list[dict]:
+    return [
+        {
+            "name": name,
+            "type": "dir" if entry.is_dir() else "file",
+            "size": entry.stat().st_size if entry.is_file() else 0,
+        }
+        for name, entry in _scan_dir(
+            path, recursive, limit=FILE_LIST_MAX_ENTRIES if recursive else None
+        )
+    ]
+
+
 async def handle_file_list(params: dict) -> list[dict]:
     """List files in a directory"""
     path = params.get("path", ".")
@@ -126,29 +270,8 @@ async def handle_file_list(params: dict) -> list[dict]:
         if not path_obj.is_dir():
             raise ToolExecutionError(f"Not a directory: {path}")
 
-        files = []
-        if recursive:
-            for item in path_obj.rglob("*"):
-                if len(files) >= 100:  # Limit
-                    break
-                files.append(
-                    {
-                        "name": str(item.relative_to(path_obj)),
-                        "type": "dir" if item.is_dir() else "file",
-                        "size": item.stat().st_size if item.is_file() else 0,
-                    }
-                )
-        else:
-            for item in path_obj.iterdir():
-                files.append(
-                    {
-                        "name": item.name,
-                        "type": "dir" if item.is_dir() else "file",
-                        "size": item.stat().st_size if item.is_file() else 0,
-                    }
-                )
-
-        return files
+        # scandir/stat blockieren (v.a. auf Netzlaufwerken) → Worker-Thread
+        return await asyncio.to_thread(_list_dir, path, recursive)
     except Exception as e:
         raise ToolExecutionError(f"Error listing directory: {e}")
 
@@ -165,82 +288,110 @@ async def handle_web_fetch(params: dict) -> str:
     if not validate_url(url):
         raise ToolExecutionError(f"Access denied: {url}")
 
+    if method == "GET":
+        cached = _fetch_cache_get(url)
+        if cached is not None:
+            return cached
+
     try:
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            response = await client.request(method, url)
-            return response.text[:10000]  # Truncate large responses
+        # Nur so viel lesen wie nach dem Kürzen übrig bleibt (max. 4 Bytes/Zeichen)
+        max_bytes = WEB_FETCH_MAX_CHARS * 4
+        body = bytearray()
+        async with _get_http_client().stream(method, url) as response:
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+            encoding = response.encoding or "utf-8"
+        text = body[:max_bytes].decode(encoding, errors="replace")
+        text = text[:WEB_FETCH_MAX_CHARS]  # Truncate large responses
     except Exception as e:
         raise ToolExecutionError(f"Error fetching URL: {e}")
 
+    cacheable = (
+        method == "GET"
+        and response.is_success
+        and "no-store" not in response.headers.get("cache-control", "").lower()
+    )
+    if cacheable:
+        _fetch_cache_put(url, text)
+    return text
+
+
+def _ddgs_text(query: str, max_results: int) -> list[dict]:
+    """DuckDuckGo text search with one DDGS client per thread (keeps its connections)"""
+    if DDGS is None:
+        raise RuntimeError("duckduckgo_search is not installed")
+
+    ddgs = getattr(_ddgs_local, "client", None)
+    if ddgs is None:
+        ddgs = _ddgs_local.client = DDGS()
+    return list(ddgs.text(query, max_results=max_results))
+
 
 async def handle_web_search(params: dict) -> list[dict]:
     """Search the web using DuckDuckGo (with lite fallback for rate limits)"""
-    import re as _re
-
     query = params.get("query")
     max_results = params.get("max_results", 5)
 
     if not query:
         raise ToolExecutionError("Missing 'query' parameter")
 
-    # Try DDGS library first
+    # Try DDGS library first (sync → worker thread)
     try:
-        from duckduckgo_search import DDGS
-
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            if results:
-                return [
-                    {
-                        "title": r.get("title", ""),
-                        "url": r.get("href", ""),
-                        "snippet": r.get("body", ""),
-                    }
-                    for r in results
-                ]
+        results = await asyncio.to_thread(_ddgs_text, query, max_results)
+        if results:
+            return [
+                {
+                    "title": r.get("title", ""),
+                    "url": r.get("href", ""),
+                    "snippet": r.get("body", ""),
+                }
+                for r in results
+            ]
     except Exception as e:
         logger.warning(f"DDGS library failed: {e}, falling back to lite")
 
     # Fallback: DuckDuckGo HTML lite endpoint (bypasses API rate limits)
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            resp = await client.get(
-                "https://lite.duckduckgo.com/lite/",
-                params={"q": query},
-                headers={"User-Agent": "Mozilla/5.0 (compatible; Axon/1.1)"},
-            )
-            resp.raise_for_status()
-
-            results = []
-            # Find all result links — href may appear before or after class
-            links = _re.findall(
-                r"""<a[^>]*href=["']([^"']+)["'][^>]*class=.result-link[^>]*>(.+?)</a>""",
+        resp = await _get_http_client().get(
+            "https://lite.duckduckgo.com/lite/",
+            params={"q": query},
+            headers={"User-Agent": "Mozilla/5.0 (compatible; Axon/1.1)"},
+            timeout=15.0,
+        )
+        resp.raise_for_status()
+
+        results = []
+        # Find all result links — href may appear before or after class
+        links = re.findall(
+            r"""<a[^>]*href=["']([^"']+)["'][^>]*class=.result-link[^>]*>(.+?)</a>""",
+            resp.text,
+            re.DOTALL,
+        )
+        if not links:
+            # Try reverse order (class before href)
+            links = re.findall(
+                r"""<a[^>]*class=.result-link[^>]*href=["']([^"']+)["'][^>]*>(.+?)</a>""",
                 resp.text,
-                _re.DOTALL,
-            )
-            if not links:
-                # Try reverse order (class before href)
-                links = _re.findall(
-                    r"""<a[^>]*class=.result-link[^>]*href=["']([^"']+)["'][^>]*>(.+?)</a>""",
-                    resp.text,
-                    _re.DOTALL,
-                )
-            # Find all snippets
-            snippets = _re.findall(
-                r"""class=.result-snippet.[^>]*>(.+?)</td>""", resp.text, _re.DOTALL
+                re.DOTALL,
             )
+        # Find all snippets
+        snippets = re.findall(
+            r"""class=.result-snippet.[^>]*>(.+?)</td>""", resp.text, re.DOTALL
+        )
 
-            for i, (url, title) in enumerate(links[:max_results]):
-                title = _re.sub(r"<[^>]+>", "", title).strip()
-                title = title.replace("&quot;", '"').replace("&amp;", "&")
-                snippet = ""
-                if i < len(snippets):
-                    snippet = _re.sub(r"<[^>]+>", "", snippets[i]).strip()
-                if title:
-                    results.append({"title": title, "url": url, "snippet": snippet})
+        for i, (url, title) in enumerate(links[:max_results]):
+            title = re.sub(r"<[^>]+>", "", title).strip()
+            title = title.replace("&quot;", '"').replace("&amp;", "&")
+            snippet = ""
+            if i < len(snippets):
+                snippet = re.sub(r"<[^>]+>", "", snippets[i]).strip()
+            if title:
+                results.append({"title": title, "url": url, "snippet": snippet})
 
-            if results:
-                return results
+        if results:
+            return results
 
         raise ToolExecutionError("No search results found")
     except ToolExecutionError:
@@ -249,6 +400,52 @@ async def handle_web_search(params: dict) -> list[dict]:
         raise ToolExecutionError(f"Search failed: {e}")
 
 
+# Gequotete Glob-Zeichen werden vor shlex.split durch Platzhalter (Private Use
+# Area) ersetzt — nach dem Split ist sonst nicht mehr erkennbar, was gequotet war
+_GLOB_CHARS = "*?["
+_QUOTED_GLOB = {c: chr(0xE000 + i) for i, c in enumerate(_GLOB_CHARS)}
+_UNQUOTE_GLOB = str.maketrans({v: k for k, v in _QUOTED_GLOB.items()})
+_ESCAPE_GLOB = str.maketrans({v: f"[{k}]" for k, v in _QUOTED_GLOB.items()})
+
+
+def _mark_quoted_globs(command: str) -> str:
+    """Replace glob characters inside quotes or after a backslash by placeholders"""
+    out = []
+    quote = None
+    escaped = False
+    for c in command:
+        if escaped:
+            escaped = False
+        elif c == "\\" and quote != "'":
+            escaped = True
+        elif c in "'\"" and quote in (None, c):
+            quote = None if quote else c
+        elif quote is None:
+            out.append(c)
+            continue
+        out.append(_QUOTED_GLOB.get(c, c))
+    return "".join(out)
+
+
+def _split_command(command: str) -> list[str]:
+    """
+    Split a whitelisted command into argv like /bin/sh would: quotes are
+    honoured and unquoted glob patterns in arguments are expanded (kept
+    literal if nothing matches). Variables and redirects are not interpreted.
+    """
+    try:
+        argv = shlex.split(_mark_quoted_globs(command))
+    except ValueError as e:
+        raise ToolExecutionError(f"Invalid command: {e}")
+
+    expanded = [arg.translate(_UNQUOTE_GLOB) for arg in argv[:1]]
+    for arg in argv[1:]:
+        has_pattern = any(c in arg for c in _GLOB_CHARS)
+        matches = sorted(glob.glob(arg.translate(_ESCAPE_GLOB))) if has_pattern else []
+        expanded.extend(matches or [arg.translate(_UNQUOTE_GLOB)])
+    return expanded
+
+
 async def handle_shell_execute(params: dict) -> str:
     """Execute a shell command (whitelist only)"""
     command = params.get("command")
@@ -261,17 +458,32 @@ async def handle_shell_execute(params: dict) -> str:
     if not is_valid:
         raise ToolExecutionError(error_msg)
 
+    # dir/type sind cmd.exe-Builtins → unter Windows bleibt es bei der Shell
+    argv = None if os.name == "nt" else _split_command(command)
+
     try:
-        process = await asyncio.create_subprocess_shell(
-            command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
+        if argv is None:
+            process = await asyncio.create_subprocess_shell(
+                command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            # Direkt ausführen, ohne /bin/sh dazwischen
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
         stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30.0)
 
-        output = stdout.decode("utf-8", errors="replace")
+        # Nur den Anfang decodieren — mehr als 4 Bytes/Zeichen gibt es nicht
+        max_bytes = SHELL_OUTPUT_MAX_CHARS * 4
+        output = stdout[:max_bytes].decode("utf-8", errors="replace")
         if stderr:
-            output += "\n[stderr]\n" + stderr.decode("utf-8", errors="replace")
+            output += "\n[stderr]\n" + stderr[:max_bytes].decode(
+                "utf-8", errors="replace"
+            )
 
-        return output[:5000]  # Truncate
+        return output[:SHELL_OUTPUT_MAX_CHARS]  # Truncate
     except asyncio.TimeoutError:
         raise ToolExecutionError("Command timed out after 30 seconds")
     except Exception as e:
@@ -280,12 +492,11 @@ async def handle_shell_execute(params: dict) -> str:
 
 async def handle_memory_save(params: dict) -> str:
     """Save a fact to persistent memory"""
-    from agent.memory import MemoryManager
-
     key = params.get("key")
     content = params.get("content")
     category = params.get("category")
     db_session = params.pop("_db_session", None)
+    commit = params.pop("_commit", True)
 
     if not key:
         raise ToolExecutionError("Missing 'key' parameter")
@@ -298,16 +509,16 @@ async def handle_memory_save(params: dict) -> str:
 
     manager = MemoryManager(db_session)
     await manager.add(key=key, content=content, source="agent", category=category)
-    await db_session.commit()
+    if commit:
+        await db_session.commit()
     return t("tool.memory_saved", key=key, content=content[:100])
 
 
 async def handle_memory_search(params: dict) -> str:
     """Search persistent memory"""
-    from agent.memory import MemoryManager
-
     query = params.get("query")
     db_session = params.pop("_db_session", None)
+    params.pop("_commit", None)
 
     if not query:
         raise ToolExecutionError("Missing 'query' parameter")
@@ -321,19 +532,21 @@ async def handle_memory_search(params: dict) -> str:
     if not results:
         return t("tool.memory_not_found")
 
-    lines = []
-    for mem in results:
-        cat = f" [{mem.category}]" if mem.category else ""
-        lines.append(f"- {mem.key}{cat}: {mem.content}")
-    return "\n".join(lines)
+    return "\n".join(
+        (
+            f"- {mem.key} [{mem.category}]: {mem.content}"
+            if mem.category
+            else f"- {mem.key}: {mem.content}"
+        )
+        for mem in results
+    )
 
 
 async def handle_memory_delete(params: dict) -> str:
     """Delete a memory entry by key"""
-    from agent.memory import MemoryManager
-
     key = params.get("key")
     db_session = params.pop("_db_session", None)
+    commit = params.pop("_commit", True)
 
     if not key:
         raise ToolExecutionError("Missing 'key' parameter")
@@ -343,7 +556,8 @@ async def handle_memory_delete(params: dict) -> str:
 
     manager = MemoryManager(db_session)
     deleted = await manager.remove_by_key(key)
-    await db_session.commit()
+    if commit:
+        await db_session.commit()
 
     if deleted:
         return t("tool.memory_deleted", key=key)
@@ -376,3 +590,21 @@ async def handle_code_execute(params: dict) -> str:
 
     result = await execute_code(code, timeout=timeout)
     return str(result)
+
+
+# Dispatch table for execute_tool (built once, after all handlers are defined)
+_HANDLERS: dict[str, Callable[[dict], Awaitable[Any]]] = {
+    "file_read": handle_file_read,
+    "file_write": handle_file_write,
+    "file_list": handle_file_list,
+    "web_fetch": handle_web_fetch,
+    "web_search": handle_web_search,
+    "shell_execute": handle_shell_execute,
+    "memory_save": handle_memory_save,
+    "memory_search": handle_memory_search,
+    "memory_delete": handle_memory_delete,
+    "email_inbox": handle_email_inbox,
+    "email_send": handle_email_send,
+    "code_execute": handle_code_execute,
+}
+_MEMORY_TOOLS = frozenset(name for name in _HANDLERS if name.startswith("memory_"))
@@ -2,9 +2,9 @@
 Axon by NeuroVexon - Tool Registry
 """
 
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, Any, Optional
-from pydantic import BaseModel
 from core.i18n import get_language
 
 
@@ -15,16 +15,36 @@ class RiskLevel(str, Enum):
     CRITICAL = "critical"  # Never auto-approve
 
 
-class ToolDefinition(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ToolDefinition:
+    """Static tool metadata — built in code, so no validation needed"""
+
     name: str
     description: str
     description_de: str  # German description for UI
     parameters: Dict[str, Any]
     risk_level: RiskLevel
     requires_approval: bool = True
+    # JSON-Schema der Parameter fuer das LLM, einmal bei Erstellung berechnet
+    llm_schema: Dict[str, Any] = field(init=False, repr=False, compare=False)
 
-    class Config:
-        arbitrary_types_allowed = True
+    def __post_init__(self):
+        params = self.parameters
+        object.__setattr__(
+            self,
+            "llm_schema",
+            {
+                "type": "object",
+                "properties": {
+                    k: {
+                        "type": v.get("type", "string"),
+                        "description": v.get("description", ""),
+                    }
+                    for k, v in params.items()
+                },
+                "required": [k for k, v in params.items() if v.get("required", False)],
+            },
+        )
 
     def get_description(self, lang: str = None) -> str:
         """Return description in the given language"""
@@ -36,6 +56,9 @@ class ToolDefinition(BaseModel):
 class ToolRegistry:
     """Registry for all available tools"""
 
+    # LLM-Schema aller Tools, wird bei register() verworfen
+    _llm_tools: Optional[list[dict]] = None
+
     def __init__(self):
         self._tools: Dict[str, ToolDefinition] = {}
         self._register_builtin_tools()
@@ -310,6 +333,7 @@ class ToolRegistry:
     def register(self, tool: ToolDefinition):
         """Register a tool"""
         self._tools[tool.name] = tool
+        self._llm_tools = None
 
     def get(self, name: str) -> Optional[ToolDefinition]:
         """Get a tool by name"""
@@ -320,31 +344,27 @@ class ToolRegistry:
         return list(self._tools.values())
 
     def get_tools_for_llm(self) -> list[dict]:
-        """Format tools for LLM function calling (OpenAI format)"""
+        """
+        Format tools for LLM function calling (OpenAI format), sorted by name.
+
+        The list is built once and shared until the next register() — callers
+        must not modify it.
+        """
+        if self._llm_tools is None:
+            self._llm_tools = self._build_tools_for_llm()
+        return self._llm_tools
+
+    def _build_tools_for_llm(self) -> list[dict]:
         return [
             {
                 "type": "function",
                 "function": {
                     "name": tool.name,
                     "description": tool.description,
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            k: {
-                                "type": v.get("type", "string"),
-                                "description": v.get("description", ""),
-                            }
-                            for k, v in tool.parameters.items()
-                        },
-                        "required": [
-                            k
-                            for k, v in tool.parameters.items()
-                            if v.get("required", False)
-                        ],
-                    },
+                    "parameters": tool.llm_schema,
                 },
             }
-            for tool in self._tools.values()
+            for tool in sorted(self._tools.values(), key=lambda t: t.name)
         ]
 
 
@@ -25,6 +25,19 @@ MAX_STEPS = 20
 STEP_TIMEOUT_SECONDS = 120
 MAX_CONTEXT_SIZE = 50000  # Zeichen
 
+# Template-Variablen: {{variable}}
+_VARIABLE_PATTERN = re.compile(r"\{\{(.+?)\}\}")
+
+# (trigger_phrase.lower(), workflow_id) aller aktiven Workflows mit Trigger —
+# wird bei Aenderungen an Workflows verworfen (siehe api/workflows.py)
+_trigger_cache: Optional[list[tuple[str, str]]] = None
+
+
+def invalidate_trigger_cache():
+    """Trigger-Liste verwerfen (nach Anlegen/Aendern/Loeschen eines Workflows)"""
+    global _trigger_cache
+    _trigger_cache = None
+
 
 class WorkflowEngine:
     """Fuehrt Workflows mit Variablen-Kontext aus"""
@@ -34,17 +47,30 @@ class WorkflowEngine:
 
     async def detect_trigger(self, message: str) -> Optional[Workflow]:
         """Pruefen ob eine Nachricht einen Workflow-Trigger enthaelt"""
-        result = await self.db.execute(
-            select(Workflow).where(
-                Workflow.enabled, Workflow.trigger_phrase.isnot(None)
+        global _trigger_cache
+        if _trigger_cache is None:
+            # Nur (id, trigger_phrase) laden — Steps-JSON erst fuer den Treffer.
+            # Der Vergleich bleibt in Python: SQLite lower() kennt keine Umlaute
+            result = await self.db.execute(
+                select(Workflow.id, Workflow.trigger_phrase).where(
+                    Workflow.enabled,
+                    Workflow.trigger_phrase.isnot(None),
+                    Workflow.trigger_phrase != "",
+                )
             )
-        )
-        workflows = result.scalars().all()
+            _trigger_cache = [
+                (trigger_phrase.lower(), workflow_id)
+                for workflow_id, trigger_phrase in result
+            ]
 
         message_lower = message.lower().strip()
-        for wf in workflows:
-            if wf.trigger_phrase and wf.trigger_phrase.lower() in message_lower:
-                return wf
+        for trigger, workflow_id in _trigger_cache:
+            if trigger in message_lower:
+                workflow = await self.db.get(Workflow, workflow_id)
+                if workflow is None:
+                    # Ausserhalb der API geloescht — beim naechsten Mal neu laden
+                    invalidate_trigger_cache()
+                return workflow
         return None
 
     async def execute_workflow(
@@ -162,11 +188,17 @@ class WorkflowEngine:
     def _resolve_variables(self, template: str, context: dict) -> str:
         """Ersetzt {{variable}} mit Werten aus dem Kontext"""
 
+        if "{{" not in template:
+            return template
+
         def replace(match):
             var_name = match.group(1).strip()
-            return context.get(var_name, t("wf.var_missing", var=var_name))
+            value = context.get(var_name)
+            if value is None:
+                return t("wf.var_missing", var=var_name)
+            return value
 
-        return re.sub(r"\{\{(.+?)\}\}", replace, template)
+        return _VARIABLE_PATTERN.sub(replace, template)
 
 
 def workflow_to_dict(wf: Workflow) -> dict:
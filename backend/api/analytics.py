@@ -4,7 +4,7 @@ Axon by NeuroVexon - Dashboard & Analytics API
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import func, literal, select, union_all
 from datetime import datetime, timedelta
 
 from db.database import get_db
@@ -29,53 +29,68 @@ async def get_overview(
     db: AsyncSession = Depends(get_db),
 ):
     """Dashboard-Uebersicht: Kernmetriken"""
-    # Conversations
-    conv_count = await db.scalar(select(func.count(Conversation.id)))
-
-    # Messages
-    msg_count = await db.scalar(select(func.count(Message.id)))
-
-    # Agents
-    agent_count = await db.scalar(select(func.count(Agent.id)).where(Agent.enabled))
-
-    # Tool Calls (aus Audit)
-    tool_calls = await db.scalar(
-        select(func.count(AuditLog.id)).where(AuditLog.event_type == "tool_executed")
+    # Alle Zaehler in einem Roundtrip: Audit-Events in einem Scan (FILTER),
+    # die uebrigen Tabellen als skalare Subqueries
+    audit = (
+        select(
+            func.count()
+            .filter(AuditLog.event_type == "tool_executed")
+            .label("tool_calls"),
+            func.count()
+            .filter(AuditLog.event_type == "tool_requested")
+            .label("total_requests"),
+            func.count()
+            .filter(AuditLog.event_type == "tool_approved")
+            .label("approved"),
+        )
+        .where(
+            AuditLog.event_type.in_(
+                ["tool_executed", "tool_requested", "tool_approved"]
+            )
+        )
+        .subquery()
     )
+    row = (
+        await db.execute(
+            select(
+                select(func.count(Conversation.id)).scalar_subquery().label("conv"),
+                select(func.count(Message.id)).scalar_subquery().label("msg"),
+                select(func.count(Agent.id))
+                .where(Agent.enabled)
+                .scalar_subquery()
+                .label("agents"),
+                select(func.count(ScheduledTask.id))
+                .where(ScheduledTask.enabled)
+                .scalar_subquery()
+                .label("tasks"),
+                select(func.count(Workflow.id))
+                .where(Workflow.enabled)
+                .scalar_subquery()
+                .label("workflows"),
+                select(func.count(Skill.id))
+                .where(Skill.enabled, Skill.approved)
+                .scalar_subquery()
+                .label("skills"),
+                audit.c.tool_calls,
+                audit.c.total_requests,
+                audit.c.approved,
+            )
+        )
+    ).one()
 
     # Approval Rate
-    total_requests = await db.scalar(
-        select(func.count(AuditLog.id)).where(AuditLog.event_type == "tool_requested")
-    )
-    approved = await db.scalar(
-        select(func.count(AuditLog.id)).where(AuditLog.event_type == "tool_approved")
-    )
-    approval_rate = (approved / total_requests * 100) if total_requests > 0 else 0
-
-    # Scheduled Tasks
-    active_tasks = await db.scalar(
-        select(func.count(ScheduledTask.id)).where(ScheduledTask.enabled)
-    )
-
-    # Workflows
-    workflow_count = await db.scalar(
-        select(func.count(Workflow.id)).where(Workflow.enabled)
-    )
-
-    # Skills
-    active_skills = await db.scalar(
-        select(func.count(Skill.id)).where(Skill.enabled, Skill.approved)
-    )
+    total_requests = row.total_requests or 0
+    approval_rate = (row.approved / total_requests * 100) if total_requests > 0 else 0
 
     return {
-        "conversations": conv_count or 0,
-        "messages": msg_count or 0,
-        "agents": agent_count or 0,
-        "tool_calls": tool_calls or 0,
+        "conversations": row.conv or 0,
+        "messages": row.msg or 0,
+        "agents": row.agents or 0,
+        "tool_calls": row.tool_calls or 0,
         "approval_rate": round(approval_rate, 1),
-        "active_tasks": active_tasks or 0,
-        "workflows": workflow_count or 0,
-        "active_skills": active_skills or 0,
+        "active_tasks": row.tasks or 0,
+        "workflows": row.workflows or 0,
+        "active_skills": row.skills or 0,
     }
 
 
@@ -85,44 +100,36 @@ async def get_tool_stats(
     db: AsyncSession = Depends(get_db),
 ):
     """Tool-Statistiken: Nutzung, Fehlerrate, Ausfuehrungszeit"""
-    # Meistgenutzte Tools
+    # Nutzung und Fehler in einem Scan — meistgenutzte Tools zuerst
+    executed = AuditLog.event_type == "tool_executed"
+    executions = func.count().filter(executed)
     result = await db.execute(
         select(
             AuditLog.tool_name,
-            func.count(AuditLog.id).label("count"),
-            func.avg(AuditLog.execution_time_ms).label("avg_time"),
+            executions.label("count"),
+            func.avg(AuditLog.execution_time_ms).filter(executed).label("avg_time"),
+            func.count().filter(AuditLog.event_type == "tool_failed").label("failures"),
         )
-        .where(AuditLog.event_type == "tool_executed", AuditLog.tool_name.isnot(None))
-        .group_by(AuditLog.tool_name)
-        .order_by(func.count(AuditLog.id).desc())
-        .limit(20)
-    )
-    tool_usage = [
-        {
-            "tool": row.tool_name,
-            "count": row.count,
-            "avg_time_ms": round(row.avg_time, 1) if row.avg_time else 0,
-        }
-        for row in result
-    ]
-
-    # Fehlerrate pro Tool
-    result = await db.execute(
-        select(
-            AuditLog.tool_name,
-            func.count(AuditLog.id).label("failures"),
+        .where(
+            AuditLog.event_type.in_(["tool_executed", "tool_failed"]),
+            AuditLog.tool_name.isnot(None),
         )
-        .where(AuditLog.event_type == "tool_failed", AuditLog.tool_name.isnot(None))
         .group_by(AuditLog.tool_name)
+        .having(executions > 0)
+        .order_by(executions.desc())
+        .limit(20)
     )
-    failures = {row.tool_name: row.failures for row in result}
-
-    # Merge
-    for tool in tool_usage:
-        tool["failures"] = failures.get(tool["tool"], 0)
-        total = tool["count"] + tool["failures"]
-        tool["error_rate"] = (
-            round(tool["failures"] / total * 100, 1) if total > 0 else 0
+    tool_usage = []
+    for row in result:
+        total = row.count + row.failures
+        tool_usage.append(
+            {
+                "tool": row.tool_name,
+                "count": row.count,
+                "avg_time_ms": round(row.avg_time, 1) if row.avg_time else 0,
+                "failures": row.failures,
+                "error_rate": round(row.failures / total * 100, 1) if total > 0 else 0,
+            }
         )
 
     return {"tools": tool_usage}
@@ -135,43 +142,45 @@ async def get_timeline(
     db: AsyncSession = Depends(get_db),
 ):
     """30-Tage Verlauf: Conversations und Tool-Calls pro Tag"""
-    cutoff = datetime.utcnow() - timedelta(days=days)
-
-    # Conversations pro Tag
-    result = await db.execute(
-        select(
-            func.date(Conversation.created_at).label("day"),
-            func.count(Conversation.id).label("count"),
-        )
-        .where(Conversation.created_at >= cutoff)
-        .group_by(func.date(Conversation.created_at))
-        .order_by(func.date(Conversation.created_at))
-    )
-    conv_by_day = {str(row.day): row.count for row in result}
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=days)
 
-    # Tool-Calls pro Tag
+    # Conversations und Tool-Calls pro Tag in einem Roundtrip (UNION ALL)
+    conv_day = func.date(Conversation.created_at)
+    tool_day = func.date(AuditLog.timestamp)
     result = await db.execute(
-        select(
-            func.date(AuditLog.timestamp).label("day"),
-            func.count(AuditLog.id).label("count"),
+        union_all(
+            select(
+                literal("conversations").label("kind"),
+                conv_day.label("day"),
+                func.count(Conversation.id).label("count"),
+            )
+            .where(Conversation.created_at >= cutoff)
+            .group_by(conv_day),
+            select(
+                literal("tool_calls").label("kind"),
+                tool_day.label("day"),
+                func.count(AuditLog.id).label("count"),
+            )
+            .where(AuditLog.timestamp >= cutoff, AuditLog.event_type == "tool_executed")
+            .group_by(tool_day),
         )
-        .where(AuditLog.timestamp >= cutoff, AuditLog.event_type == "tool_executed")
-        .group_by(func.date(AuditLog.timestamp))
-        .order_by(func.date(AuditLog.timestamp))
     )
-    tools_by_day = {str(row.day): row.count for row in result}
-
-    # Alle Tage im Zeitraum
-    timeline = []
-    for i in range(days):
-        day = (datetime.utcnow() - timedelta(days=days - 1 - i)).strftime("%Y-%m-%d")
-        timeline.append(
-            {
-                "date": day,
-                "conversations": conv_by_day.get(day, 0),
-                "tool_calls": tools_by_day.get(day, 0),
-            }
-        )
+    # Alle Tage im Zeitraum vorbelegen, dann die Zaehler einsortieren
+    today = now.date()
+    timeline = [
+        {
+            "date": (today - timedelta(days=days - 1 - i)).isoformat(),
+            "conversations": 0,
+            "tool_calls": 0,
+        }
+        for i in range(days)
+    ]
+    by_date = {entry["date"]: entry for entry in timeline}
+    for row in result:
+        entry = by_date.get(str(row.day))
+        if entry is not None:
+            entry[row.kind] = row.count
 
     return {"timeline": timeline}
 
@@ -5,12 +5,13 @@ Axon by NeuroVexon - Audit API Endpoints
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, literal, null, select, tuple_, union_all
 from typing import Optional
+from datetime import datetime
 import csv
 import io
 
-from db.database import get_db
+from db.database import async_session, get_db
 from db.models import AuditLog
 from db.models import User
 from core.dependencies import get_current_active_user
@@ -25,11 +26,19 @@ async def list_audit_logs(
     tool_name: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
+    before_ts: Optional[datetime] = None,
+    before_id: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List audit logs with optional filters"""
-    query = select(AuditLog).order_by(AuditLog.timestamp.desc())
+    """
+    List audit logs with optional filters.
+
+    For deep pages pass timestamp and id of the last entry seen as
+    before_ts/before_id (keyset pagination) instead of a growing offset.
+    before_ts alone returns only entries strictly older than that time.
+    """
+    query = select(AuditLog).order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
 
     if session_id:
         query = query.where(AuditLog.conversation_id == session_id)
@@ -37,6 +46,13 @@ async def list_audit_logs(
         query = query.where(AuditLog.event_type == event_type)
     if tool_name:
         query = query.where(AuditLog.tool_name == tool_name)
+    if before_ts and before_id:
+        # Eintraege eines Batches teilen sich den Timestamp — id als Tiebreaker
+        query = query.where(
+            tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(before_ts, before_id)
+        )
+    elif before_ts:
+        query = query.where(AuditLog.timestamp < before_ts)
 
     query = query.offset(offset).limit(limit)
     result = await db.execute(query)
@@ -66,41 +82,42 @@ async def get_audit_stats(
     db: AsyncSession = Depends(get_db),
 ):
     """Get audit statistics"""
-    from sqlalchemy import func
-
-    base_query = select(AuditLog)
-    if session_id:
-        base_query = base_query.where(AuditLog.conversation_id == session_id)
-
-    # Total count
-    total_result = await db.execute(
-        select(func.count(AuditLog.id)).select_from(AuditLog)
-    )
-    total = total_result.scalar()
-
-    # Count by event type
-    type_result = await db.execute(
-        select(AuditLog.event_type, func.count(AuditLog.id)).group_by(
-            AuditLog.event_type
-        )
-    )
-    by_type = {row[0]: row[1] for row in type_result}
-
-    # Count by tool
-    tool_result = await db.execute(
-        select(AuditLog.tool_name, func.count(AuditLog.id))
-        .where(AuditLog.tool_name.isnot(None))
-        .group_by(AuditLog.tool_name)
-    )
-    by_tool = {row[0]: row[1] for row in tool_result}
-
-    # Average execution time
-    time_result = await db.execute(
-        select(func.avg(AuditLog.execution_time_ms)).where(
-            AuditLog.execution_time_ms.isnot(None)
+    # Session-Filter gilt fuer jeden Zweig des UNION ALL
+    filters = [AuditLog.conversation_id == session_id] if session_id else []
+
+    # Alle Kennzahlen in einem Roundtrip (UNION ALL statt vier Queries)
+    result = await db.execute(
+        union_all(
+            select(
+                literal("total").label("kind"),
+                null().label("name"),
+                func.count(AuditLog.id).label("count"),
+                func.avg(AuditLog.execution_time_ms).label("avg_time"),
+            ).where(*filters),
+            select(
+                literal("event_type"),
+                AuditLog.event_type,
+                func.count(AuditLog.id),
+                null(),
+            )
+            .where(*filters)
+            .group_by(AuditLog.event_type),
+            select(literal("tool"), AuditLog.tool_name, func.count(AuditLog.id), null())
+            .where(AuditLog.tool_name.isnot(None), *filters)
+            .group_by(AuditLog.tool_name),
         )
     )
-    avg_time = time_result.scalar()
+    total = 0
+    avg_time = None
+    by_type = {}
+    by_tool = {}
+    for kind, name, count, avg in result:
+        if kind == "total":
+            total, avg_time = count, avg
+        elif kind == "event_type":
+            by_type[name] = count
+        else:
+            by_tool[name] = count
 
     return {
         "total": total,
@@ -110,6 +127,84 @@ async def get_audit_stats(
     }
 
 
+# CSV-Export: Zeilen blockweise aus der DB lesen und als Chunks senden
+EXPORT_CHUNK_ROWS = 500
+
+_CSV_HEADER = [
+    "id",
+    "session_id",
+    "timestamp",
+    "event_type",
+    "tool_name",
+    "tool_params",
+    "result",
+    "error",
+    "user_decision",
+    "execution_time_ms",
+]
+
+
+async def _stream_csv(session_id: Optional[str]):
+    """Yield the CSV export in chunks of EXPORT_CHUNK_ROWS rows"""
+    # Nur die exportierten Spalten, result schon in SQL gekuerzt
+    query = select(
+        AuditLog.id,
+        AuditLog.conversation_id,
+        AuditLog.timestamp,
+        AuditLog.event_type,
+        AuditLog.tool_name,
+        AuditLog.tool_params,
+        func.substr(AuditLog.result, 1, 500),
+        AuditLog.error,
+        AuditLog.user_decision,
+        AuditLog.execution_time_ms,
+    ).order_by(AuditLog.timestamp.desc())
+    if session_id:
+        query = query.where(AuditLog.conversation_id == session_id)
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(_CSV_HEADER)
+
+    # Eigene Session — die Request-Session ist beim Streamen evtl. schon zu
+    async with async_session() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        rows = 0
+        async for (
+            log_id,
+            conversation_id,
+            timestamp,
+            event_type,
+            tool_name,
+            tool_params,
+            log_result,
+            error,
+            user_decision,
+            execution_time_ms,
+        ) in result:
+            writer.writerow(
+                [
+                    log_id,
+                    conversation_id,
+                    timestamp.isoformat(),
+                    event_type,
+                    tool_name,
+                    str(tool_params) if tool_params else "",
+                    log_result or "",
+                    error or "",
+                    user_decision or "",
+                    execution_time_ms or "",
+                ]
+            )
+            rows += 1
+            if rows % EXPORT_CHUNK_ROWS == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+
+    yield output.getvalue()
+
+
 @router.get("/export")
 async def export_audit_logs(
     format: str = "csv",
@@ -118,6 +213,13 @@ async def export_audit_logs(
     db: AsyncSession = Depends(get_db),
 ):
     """Export audit logs as CSV or JSON"""
+    if format == "csv":
+        return StreamingResponse(
+            _stream_csv(session_id),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=axon_audit_log.csv"},
+        )
+
     query = select(AuditLog).order_by(AuditLog.timestamp.desc())
     if session_id:
         query = query.where(AuditLog.conversation_id == session_id)
@@ -125,58 +227,18 @@ async def export_audit_logs(
     result = await db.execute(query)
     logs = result.scalars().all()
 
-    if format == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(
-            [
-                "id",
-                "session_id",
-                "timestamp",
-                "event_type",
-                "tool_name",
-                "tool_params",
-                "result",
-                "error",
-                "user_decision",
-                "execution_time_ms",
-            ]
-        )
-        for log in logs:
-            writer.writerow(
-                [
-                    log.id,
-                    log.conversation_id,
-                    log.timestamp.isoformat(),
-                    log.event_type,
-                    log.tool_name,
-                    str(log.tool_params) if log.tool_params else "",
-                    log.result[:500] if log.result else "",
-                    log.error or "",
-                    log.user_decision or "",
-                    log.execution_time_ms or "",
-                ]
-            )
-
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=axon_audit_log.csv"},
-        )
-    else:
-        return [
-            {
-                "id": log.id,
-                "session_id": log.conversation_id,
-                "timestamp": log.timestamp.isoformat(),
-                "event_type": log.event_type,
-                "tool_name": log.tool_name,
-                "tool_params": log.tool_params,
-                "result": log.result,
-                "error": log.error,
-                "user_decision": log.user_decision,
-                "execution_time_ms": log.execution_time_ms,
-            }
-            for log in logs
-        ]
+    return [
+        {
+            "id": log.id,
+            "session_id": log.conversation_id,
+            "timestamp": log.timestamp.isoformat(),
+            "event_type": log.event_type,
+            "tool_name": log.tool_name,
+            "tool_params": log.tool_params,
+            "result": log.result,
+            "error": log.error,
+            "user_decision": log.user_decision,
+            "execution_time_ms": log.execution_time_ms,
+        }
+        for log in logs
+    ]
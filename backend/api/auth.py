@@ -8,7 +8,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from sqlalchemy import select, func
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.database import get_db
@@ -86,10 +86,9 @@ def _create_tokens(user: User) -> dict:
 @router.get("/status")
 async def auth_status(db: AsyncSession = Depends(get_db)) -> AuthStatusResponse:
     """Public: Check if users exist and if registration is enabled"""
-    result = await db.execute(select(func.count(User.id)))
-    user_count = result.scalar() or 0
+    has_users = await db.scalar(select(exists().select_from(User)))
     return AuthStatusResponse(
-        has_users=user_count > 0,
+        has_users=bool(has_users),
         registration_enabled=settings.registration_enabled,
     )
 
@@ -98,10 +97,9 @@ async def auth_status(db: AsyncSession = Depends(get_db)) -> AuthStatusResponse:
 async def register(data: RegisterRequest, db: AsyncSession = Depends(get_db)):
     """Register a new user. First user becomes admin."""
     # Check registration enabled
-    result = await db.execute(select(func.count(User.id)))
-    user_count = result.scalar() or 0
+    has_users = await db.scalar(select(exists().select_from(User)))
 
-    if user_count > 0 and not settings.registration_enabled:
+    if has_users and not settings.registration_enabled:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=t("auth.registration_disabled"),
@@ -122,15 +120,14 @@ async def register(data: RegisterRequest, db: AsyncSession = Depends(get_db)):
         )
 
     # Check email unique
-    existing = await db.execute(select(User).where(User.email == data.email))
-    if existing.scalar_one_or_none():
+    if await db.scalar(select(exists().where(User.email == data.email))):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=t("auth.email_exists"),
         )
 
     # Create user - first user is admin
-    role = "admin" if user_count == 0 else "user"
+    role = "user" if has_users else "admin"
     user = User(
         email=data.email,
         password_hash=get_password_hash(data.password),
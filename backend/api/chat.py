@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 import asyncio
 import json
 import logging
@@ -33,6 +33,61 @@ _approval_events: dict[str, tuple[asyncio.Event, dict]] = {}
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Bedenkzeit pro Approval-Dialog
+APPROVAL_TIMEOUT_SECONDS = 120.0
+
+
+def make_approval_waiter() -> Callable[[dict], Awaitable[Optional[PermissionScope]]]:
+    """
+    Build the on_approval_needed callback for one chat stream.
+
+    All requests of a batch are registered at once (each can be resolved at any
+    time), but the web UI shows them one dialog at a time. A request's timeout
+    therefore only starts once the request before it has been decided.
+    """
+    previous: dict = {"done": None}
+
+    async def on_approval_needed(request_data: dict) -> Optional[PermissionScope]:
+        """Callback: pause stream and wait for frontend approval via /tools/approve"""
+        approval_id = request_data.get("approval_id")
+        if not approval_id:
+            return None
+
+        # Create an event to wait on
+        event = asyncio.Event()
+        result_holder = {"decision": None}
+        _approval_events[approval_id] = (event, result_holder)
+
+        before = previous["done"]
+        done = asyncio.Event()
+        previous["done"] = done
+
+        try:
+            if before is not None:
+                # Dialog wird erst nach der vorherigen Entscheidung angezeigt
+                waiters = [
+                    asyncio.ensure_future(before.wait()),
+                    asyncio.ensure_future(event.wait()),
+                ]
+                try:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+
+            await asyncio.wait_for(event.wait(), timeout=APPROVAL_TIMEOUT_SECONDS)
+            decision = result_holder["decision"]
+            if decision is None or decision == "never":
+                return None
+            return PermissionScope(decision)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            done.set()
+            _approval_events.pop(approval_id, None)
+
+    return on_approval_needed
+
 
 async def load_settings_to_router(db: AsyncSession):
     """Load settings from database and update the LLM router"""
@@ -275,7 +330,9 @@ async def agent_message(
     # NOTE: mistral:7b-instruct breaks tool calling when system/markdown prompt is present.
     # Use plain text memory as initial assistant message to preserve tool calling.
     memory_manager = MemoryManager(db)
-    memory_block = await memory_manager.build_memory_prompt(plain=True)
+    memory_block = await memory_manager.build_memory_prompt(
+        plain=True, query=request.message
+    )
 
     messages = []
 
@@ -334,28 +391,7 @@ async def agent_message(
     # The streaming generator will use its own sessions
     await db.close()
 
-    async def on_approval_needed(request_data: dict) -> Optional[PermissionScope]:
-        """Callback: pause stream and wait for frontend approval via /tools/approve"""
-        approval_id = request_data.get("approval_id")
-        if not approval_id:
-            return None
-
-        # Create an event to wait on
-        event = asyncio.Event()
-        result_holder = {"decision": None}
-        _approval_events[approval_id] = (event, result_holder)
-
-        try:
-            # Wait for approval (timeout 120s)
-            await asyncio.wait_for(event.wait(), timeout=120.0)
-            decision = result_holder["decision"]
-            if decision is None or decision == "never":
-                return None
-            return PermissionScope(decision)
-        except asyncio.TimeoutError:
-            return None
-        finally:
-            _approval_events.pop(approval_id, None)
+    on_approval_needed = make_approval_waiter()
 
     async def generate():
         from db.database import async_session
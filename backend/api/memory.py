@@ -8,7 +8,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from db.database import get_db
-from agent.memory import MemoryManager
+from agent.memory import MemoryManager, invalidate_memory_prompt
 from db.models import User
 from core.dependencies import get_current_active_user
 
@@ -138,6 +138,7 @@ async def update_memory(
         memory.category = data.category
 
     await db.commit()
+    invalidate_memory_prompt()
 
     return {
         "id": memory.id,
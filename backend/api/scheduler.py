@@ -11,7 +11,7 @@ from typing import Optional
 from db.database import get_db
 from db.models import ScheduledTask, User
 from core.dependencies import get_current_active_user
-from agent.scheduler import task_scheduler, MAX_ACTIVE_TASKS
+from agent.scheduler import task_scheduler, cron_trigger, MAX_ACTIVE_TASKS
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -59,9 +59,7 @@ def _task_to_dict(task: ScheduledTask) -> dict:
 def _validate_cron(expression: str) -> bool:
     """Cron-Ausdruck validieren"""
     try:
-        from apscheduler.triggers.cron import CronTrigger
-
-        CronTrigger.from_crontab(expression)
+        cron_trigger(expression)
         return True
     except Exception:
         return False
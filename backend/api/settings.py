@@ -15,6 +15,7 @@ from core.dependencies import get_current_active_user, get_admin_user
 from core.config import settings as app_settings, LLMProvider
 from core.security import encrypt_value, decrypt_value
 from llm.router import llm_router
+from agent.scheduler import invalidate_settings_cache
 from core.i18n import t, set_language, get_lang_from_header
 
 # Keys that must be encrypted in the database
@@ -174,6 +175,7 @@ async def update_settings(
             db.add(setting)
 
     await db.commit()
+    invalidate_settings_cache()
     # Don't return raw values — only confirm which keys were changed
     return {"status": "updated", "changes": list(updates.keys())}
 
@@ -207,6 +209,7 @@ async def delete_api_key(
     if setting:
         await db.delete(setting)
         await db.commit()
+        invalidate_settings_cache()
         return {"status": "deleted", "key": key_name}
     return {"status": "not_found", "key": key_name}
 
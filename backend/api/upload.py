@@ -14,7 +14,11 @@ from typing import Optional
 from db.database import get_db
 from db.models import UploadedDocument, User
 from core.dependencies import get_current_active_user
-from agent.document_handler import is_allowed_file, extract_text, ALLOWED_EXTENSIONS
+from agent.document_handler import (
+    is_allowed_file,
+    extract_text_async,
+    ALLOWED_EXTENSIONS,
+)
 from core.security import sanitize_filename
 from core.i18n import t, set_language, get_lang_from_header
 
@@ -66,7 +70,7 @@ async def upload_document(
         f.write(content)
 
     # Text extrahieren
-    extracted = extract_text(str(file_path), file.content_type)
+    extracted = await extract_text_async(str(file_path), file.content_type)
 
     # In DB speichern
     doc = UploadedDocument(
@@ -11,7 +11,12 @@ from typing import Optional
 from db.database import get_db
 from db.models import Workflow, WorkflowRun, User
 from core.dependencies import get_current_active_user
-from agent.workflows import WorkflowEngine, workflow_to_dict, run_to_dict
+from agent.workflows import (
+    WorkflowEngine,
+    invalidate_trigger_cache,
+    workflow_to_dict,
+    run_to_dict,
+)
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 
@@ -95,6 +100,7 @@ async def create_workflow(
     )
     db.add(wf)
     await db.commit()
+    invalidate_trigger_cache()
     await db.refresh(wf)
     return workflow_to_dict(wf)
 
@@ -123,6 +129,7 @@ async def update_workflow(
         setattr(wf, key, value)
 
     await db.commit()
+    invalidate_trigger_cache()
     await db.refresh(wf)
     return workflow_to_dict(wf)
 
@@ -140,6 +147,7 @@ async def delete_workflow(
 
     await db.delete(wf)
     await db.commit()
+    invalidate_trigger_cache()
     return {"status": "deleted"}
 
 
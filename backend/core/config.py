@@ -30,6 +30,9 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./axon.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 1800  # seconds, only for server databases
 
     # LLM Provider
     llm_provider: LLMProvider = LLMProvider.OLLAMA
@@ -4,10 +4,14 @@ Axon by NeuroVexon - Security Utilities
 
 import base64
 import hashlib
+import ipaddress
 import logging
+import re
 import secrets
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import urlparse
 
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
@@ -118,6 +122,43 @@ def decrypt_value(encrypted: str) -> str:
         return ""
 
 
+# Pfade werden vor dem Vergleich normalisiert (Slashes, lowercase)
+_BLOCKED_PATH_PREFIXES = (
+    "/etc/",
+    "/var/",
+    "/root/",
+    "/home/",
+    "c:/windows/",
+    "c:/program files/",
+    "c:/users/",
+    "/proc/",
+    "/sys/",
+)
+_BLOCKED_PATH_PARTS = re.compile(
+    "|".join(
+        re.escape(part)
+        for part in (
+            "passwd",
+            "shadow",
+            ".ssh",
+            ".env",
+            "credentials",
+            "secrets",
+            ".git/config",
+            "id_rsa",
+            "id_ed25519",
+        )
+    )
+)
+
+_BLOCKED_HOSTNAMES = frozenset({"localhost"})
+
+# Verkettungs-Operatoren — laengere zuerst, damit "||" nicht als "|" gemeldet wird
+_SHELL_OPERATORS = re.compile(r"&&|\|\||;|\||`|\$\(|\$\{")
+
+_FILENAME_SEPARATORS = str.maketrans({"/": "_", "\\": "_"})
+
+
 def validate_path(path: str) -> bool:
     """
     Validate a file path for security.
@@ -127,42 +168,16 @@ def validate_path(path: str) -> bool:
     path = path.replace("\\", "/").lower()
 
     # Block absolute paths to sensitive locations
-    blocked_prefixes = [
-        "/etc/",
-        "/var/",
-        "/root/",
-        "/home/",
-        "c:/windows/",
-        "c:/program files/",
-        "c:/users/",
-        "/proc/",
-        "/sys/",
-    ]
-
-    for prefix in blocked_prefixes:
-        if path.startswith(prefix):
-            return False
+    if path.startswith(_BLOCKED_PATH_PREFIXES):
+        return False
 
     # Block path traversal
     if ".." in path:
         return False
 
     # Block sensitive files
-    blocked_files = [
-        "passwd",
-        "shadow",
-        ".ssh",
-        ".env",
-        "credentials",
-        "secrets",
-        ".git/config",
-        "id_rsa",
-        "id_ed25519",
-    ]
-
-    for blocked in blocked_files:
-        if blocked in path:
-            return False
+    if _BLOCKED_PATH_PARTS.search(path):
+        return False
 
     return True
 
@@ -172,47 +187,39 @@ def validate_url(url: str) -> bool:
     Validate a URL for security.
     Returns False if URL is suspicious.
     """
-    url_lower = url.lower()
-
-    # Block local/internal URLs
-    blocked_hosts = [
-        "localhost",
-        "127.0.0.1",
-        "0.0.0.0",
-        "169.254.",  # Link-local
-        "10.",  # Private
-        "172.16.",  # Private
-        "172.17.",
-        "172.18.",
-        "172.19.",
-        "172.20.",
-        "172.21.",
-        "172.22.",
-        "172.23.",
-        "172.24.",
-        "172.25.",
-        "172.26.",
-        "172.27.",
-        "172.28.",
-        "172.29.",
-        "172.30.",
-        "172.31.",
-        "192.168.",  # Private
-        "::1",  # IPv6 localhost
-        "fe80:",  # IPv6 link-local
-    ]
-
-    for blocked in blocked_hosts:
-        if blocked in url_lower:
-            return False
-
     # Block file:// protocol
-    if url_lower.startswith("file://"):
+    if url.lower().startswith("file://"):
+        return False
+
+    try:
+        host = urlparse(url).hostname
+    except ValueError:
+        return False
+    if not host:
+        return True
+
+    # Block local/internal hosts — only the hostname is checked, not path/query
+    host = host.rstrip(".")
+    if host in _BLOCKED_HOSTNAMES or host.endswith(".localhost"):
+        return False
+
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return True  # Hostname, keine IP
+
+    if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_unspecified:
         return False
 
     return True
 
 
+@lru_cache(maxsize=8)
+def _whitelist_bases(whitelist: tuple[str, ...]) -> frozenset[str]:
+    """First words of all whitelist entries, lowercased (built once per whitelist)"""
+    return frozenset(cmd.split()[0].lower() for cmd in whitelist if cmd.strip())
+
+
 def validate_shell_command(command: str) -> tuple[bool, str]:
     """
     Validate a shell command against the whitelist.
@@ -222,10 +229,9 @@ def validate_shell_command(command: str) -> tuple[bool, str]:
         return False, "Empty command"
 
     # Block command chaining operators
-    dangerous_operators = ["&&", "||", ";", "|", "`", "$(", "${"]
-    for op in dangerous_operators:
-        if op in command:
-            return False, f"Command chaining not allowed: '{op}'"
+    match = _SHELL_OPERATORS.search(command)
+    if match:
+        return False, f"Command chaining not allowed: '{match.group()}'"
 
     # Block redirects to sensitive locations
     if ">" in command and not command.strip().endswith(">"):
@@ -235,16 +241,8 @@ def validate_shell_command(command: str) -> tuple[bool, str]:
     parts = command.strip().split()
     base_cmd = parts[0].lower()
 
-    # Check if command or base command is in whitelist
-    whitelist = [cmd.lower() for cmd in settings.shell_whitelist]
-
-    # Check exact match
-    if command.lower() in whitelist:
-        return True, ""
-
-    # Check base command match (only first word)
-    whitelist_bases = [cmd.split()[0] for cmd in whitelist]
-    if base_cmd in whitelist_bases:
+    # Base command match (only first word) — also covers exact whitelist entries
+    if base_cmd in _whitelist_bases(tuple(settings.shell_whitelist)):
         return True, ""
 
     return (
@@ -258,11 +256,10 @@ def sanitize_filename(filename: str) -> str:
     Sanitize a filename to prevent path traversal.
     """
     # Remove path separators
-    filename = filename.replace("/", "_").replace("\\", "_")
+    filename = filename.translate(_FILENAME_SEPARATORS)
 
     # Remove leading dots (hidden files)
-    while filename.startswith("."):
-        filename = filename[1:]
+    filename = filename.lstrip(".")
 
     # Remove null bytes
     filename = filename.replace("\x00", "")
@@ -7,17 +7,44 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy import event
 from core.config import settings
 
+
+def _engine_options(url: str) -> dict:
+    """Pool settings for the shared engine.
+
+    Connections are kept open between requests so the orchestrator's audit
+    writes and memory tools don't pay for a new connection (and the SQLite
+    PRAGMAs below) each time. In-memory SQLite uses a single static connection
+    and takes no pool arguments.
+    """
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/").endswith(":"):
+            return {"connect_args": {"timeout": 30}}
+        return {
+            "connect_args": {"timeout": 30},  # Wait up to 30s for locks
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+        }
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
-    connect_args={"timeout": 30},  # Wait up to 30s for locks
+    **_engine_options(settings.database_url),
 )
 
 
 # Enable WAL mode for concurrent read/write support
 @event.listens_for(engine.sync_engine, "connect")
 def _set_sqlite_pragma(dbapi_connection, connection_record):
+    if engine.dialect.name != "sqlite":
+        return
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA busy_timeout=30000")
@@ -35,6 +62,11 @@ async def init_db():
         await conn.run_sync(Base.metadata.create_all)
         # Auto-add missing columns for SQLite (no ALTER COLUMN support)
         await conn.run_sync(_auto_migrate_columns)
+        await conn.run_sync(_create_missing_indexes)
+        # Full-text index for memory search on existing databases
+        from db.models import create_memory_fts
+
+        await conn.run_sync(create_memory_fts)
 
 
 def _auto_migrate_columns(conn):
@@ -60,6 +92,24 @@ def _auto_migrate_columns(conn):
                 )
 
 
+def _create_missing_indexes(conn):
+    """Create indexes added to the models after their table already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def get_pool_status() -> dict:
+    """Connection pool counters (for the debug endpoint)"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            status[name] = counter()
+    return status
+
+
 async def get_db() -> AsyncSession:
     """Dependency for getting database session"""
     async with async_session() as session:
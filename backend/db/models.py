@@ -3,6 +3,8 @@ Axon by NeuroVexon - Database Models
 """
 
 from sqlalchemy import (
+    event,
+    text,
     Column,
     String,
     Text,
@@ -11,14 +13,19 @@ from sqlalchemy import (
     Boolean,
     JSON,
     ForeignKey,
+    Index,
     LargeBinary,
 )
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import logging
 import uuid
 
 from .database import Base
 
+logger = logging.getLogger(__name__)
+
 
 def generate_uuid() -> str:
     return str(uuid.uuid4())
@@ -106,6 +113,21 @@ class AuditLog(Base):
 
     conversation = relationship("Conversation", back_populates="audit_logs")
 
+    # Audit-Liste/Export: ORDER BY timestamp DESC, id DESC (id als Tiebreaker
+    # fuer den Keyset-Cursor), optional nach Session, Event oder Tool gefiltert;
+    # Analytics filtern nach event_type + Zeitraum
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index(
+            "ix_audit_logs_conversation_timestamp_id",
+            "conversation_id",
+            "timestamp",
+            "id",
+        ),
+        Index("ix_audit_logs_event_type_timestamp_id", "event_type", "timestamp", "id"),
+        Index("ix_audit_logs_tool_name_timestamp_id", "tool_name", "timestamp", "id"),
+    )
+
 
 class Memory(Base):
     """Persistent Agent Memory — facts the AI remembers across conversations"""
@@ -123,6 +145,85 @@ class Memory(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # list_all / Memory-Prompt: ORDER BY updated_at DESC LIMIT n, optional
+    # nach Kategorie gefiltert — per Index ohne Sortierschritt
+    __table_args__ = (
+        Index("ix_memories_updated_at", "updated_at"),
+        Index("ix_memories_category_updated_at", "category", "updated_at"),
+    )
+
+
+# Trigram-Index fuer die Memory-Suche (SQLite FTS5), per Trigger synchron gehalten.
+# Trigramme beschleunigen Teilstring-Suche wie ILIKE '%q%' (ab 3 Zeichen).
+# Der Index ist ueber die implizite rowid von memories verknuepft (id ist eine
+# UUID). VACUUM darf diese rowids neu vergeben — daher wird der Index bei jedem
+# Start per 'rebuild' neu aufgebaut.
+MEMORY_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5("
+    "key, content, content='memories', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN "
+    "INSERT INTO memories_fts(rowid, key, content) "
+    "VALUES (new.rowid, new.key, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, key, content) "
+    "VALUES ('delete', old.rowid, old.key, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS memories_fts_au AFTER UPDATE OF key, content "
+    "ON memories BEGIN "
+    "INSERT INTO memories_fts(memories_fts, rowid, key, content) "
+    "VALUES ('delete', old.rowid, old.key, old.content); "
+    "INSERT INTO memories_fts(rowid, key, content) "
+    "VALUES (new.rowid, new.key, new.content); END",
+]
+
+
+MEMORY_FTS_TRIGGERS = ("memories_fts_ai", "memories_fts_ad", "memories_fts_au")
+
+
+def _drop_memory_fts(conn) -> None:
+    """Drop the FTS index together with its triggers"""
+    # Trigger ohne Tabelle wuerden jedes INSERT/UPDATE/DELETE auf memories brechen
+    for trigger in MEMORY_FTS_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    conn.execute(text("DROP TABLE IF EXISTS memories_fts"))
+
+
+def create_memory_fts(conn) -> None:
+    """Create or rebuild the memories FTS5 trigram index (SQLite only)"""
+    if conn.dialect.name != "sqlite":
+        return
+    try:
+        # Erst pruefen ob FTS5 mit Trigram-Tokenizer verfuegbar ist
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE temp.memories_fts_probe "
+                "USING fts5(x, tokenize='trigram')"
+            )
+        )
+        conn.execute(text("DROP TABLE temp.memories_fts_probe"))
+    except OperationalError as e:
+        # Bestehenden Index unangetastet lassen — Suche faellt sonst auf ILIKE zurueck
+        logger.warning(f"FTS5-Trigram nicht verfuegbar: {e}")
+        return
+
+    existing = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE name = 'memories_fts'")
+    ).first()
+    try:
+        if existing is not None and "trigram" not in existing[0]:
+            # Aelterer Wort-Index (unicode61) — durch Trigram-Index ersetzen
+            _drop_memory_fts(conn)
+        for stmt in MEMORY_FTS_DDL:
+            conn.execute(text(stmt))
+        conn.execute(text("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')"))
+    except OperationalError as e:
+        logger.warning(f"FTS5-Index konnte nicht angelegt werden: {e}")
+        _drop_memory_fts(conn)
+
+
+@event.listens_for(Memory.__table__, "after_create")
+def _memory_after_create(target, connection, **kw):
+    create_memory_fts(connection)
+
 
 class Skill(Base):
     """Registered Skills — Community-erweiterbare Fähigkeiten"""
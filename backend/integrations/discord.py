@@ -445,4 +445,14 @@ def _split_text(text: str, max_length: int = 1900) -> list[str]:
 
 
 if __name__ == "__main__":
+    # uvloop (kommt mit uvicorn[standard]) — der API-Server nutzt ihn bereits
+    try:
+        import asyncio
+
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     run_bot()
@@ -10,6 +10,9 @@ from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Prompt caching: tools + system prompt are the stable prefix of every request
+_CACHE_CONTROL = {"type": "ephemeral"}
+
 
 class ClaudeProvider(BaseLLMProvider):
     """Anthropic Claude API provider"""
@@ -57,8 +60,18 @@ class ClaudeProvider(BaseLLMProvider):
                         ),
                     }
                 )
+        if claude_tools:
+            # Cache breakpoint after the last tool covers the whole tool list
+            claude_tools[-1]["cache_control"] = _CACHE_CONTROL
         return claude_tools
 
+    @staticmethod
+    def _system_blocks(system_message: str) -> list[dict]:
+        """System prompt as a cacheable content block"""
+        return [
+            {"type": "text", "text": system_message, "cache_control": _CACHE_CONTROL}
+        ]
+
     async def chat(
         self,
         messages: list[ChatMessage],
@@ -80,7 +93,7 @@ class ClaudeProvider(BaseLLMProvider):
         kwargs = {"model": self.model, "max_tokens": 4096, "messages": chat_messages}
 
         if system_message:
-            kwargs["system"] = system_message
+            kwargs["system"] = self._system_blocks(system_message)
 
         if tools:
             kwargs["tools"] = self._convert_tools(tools)
@@ -125,7 +138,7 @@ class ClaudeProvider(BaseLLMProvider):
         kwargs = {"model": self.model, "max_tokens": 4096, "messages": chat_messages}
 
         if system_message:
-            kwargs["system"] = system_message
+            kwargs["system"] = self._system_blocks(system_message)
 
         if tools:
             kwargs["tools"] = self._convert_tools(tools)
@@ -6,6 +6,7 @@ Axon by NeuroVexon - Ollama LLM Provider
 
 import httpx
 import json
+import orjson
 import re
 from typing import AsyncGenerator, Optional
 import logging
@@ -15,6 +16,9 @@ from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Request-Bodies mit orjson serialisieren (Tool-Schemas gehen bei jedem Turn mit)
+_JSON_HEADERS = {"content-type": "application/json"}
+
 
 def _parse_tool_calls_from_text(
     text: str, available_tools: list[dict]
@@ -134,9 +138,13 @@ class OllamaProvider(BaseLLMProvider):
             if tools:
                 payload["tools"] = tools
 
-            response = await client.post(f"{self.base_url}/api/chat", json=payload)
+            response = await client.post(
+                f"{self.base_url}/api/chat",
+                content=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
+            )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
             # Parse tool calls if present
             tool_calls = None
@@ -180,16 +188,19 @@ class OllamaProvider(BaseLLMProvider):
                 payload["tools"] = tools
 
             async with client.stream(
-                "POST", f"{self.base_url}/api/chat", json=payload
+                "POST",
+                f"{self.base_url}/api/chat",
+                content=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
             ) as response:
                 response.raise_for_status()
                 async for line in response.aiter_lines():
                     if line:
                         try:
-                            data = json.loads(line)
+                            data = orjson.loads(line)
                             if "message" in data and "content" in data["message"]:
                                 yield data["message"]["content"]
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             continue
 
     async def health_check(self) -> bool:
@@ -58,6 +58,13 @@ async def lifespan(app: FastAPI):
         agent_mgr = AgentManager(db)
         await agent_mgr.ensure_defaults()
 
+    # Migrate float32 memory embeddings to the int8 format
+    from agent.memory import MemoryManager
+
+    async with async_session() as db:
+        if await MemoryManager(db).quantize_legacy_embeddings():
+            await db.commit()
+
     # Start task scheduler
     from agent.scheduler import task_scheduler
 
@@ -109,6 +116,14 @@ async def lifespan(app: FastAPI):
     from agent.scheduler import task_scheduler as ts
 
     ts.stop()
+
+    from agent.embeddings import embedding_provider
+
+    await embedding_provider.aclose()
+
+    from agent.tool_handlers import close_http_client
+
+    await close_http_client()
     logger.info("Shutting down Axon")
 
 
@@ -161,6 +176,16 @@ async def health():
     return {"status": "healthy", "version": settings.app_version}
 
 
+if settings.debug:
+
+    @app.get("/debug/pool")
+    async def debug_pool():
+        """DB connection pool usage (debug mode only)"""
+        from db.database import get_pool_status
+
+        return get_pool_status()
+
+
 if __name__ == "__main__":
     import uvicorn
 
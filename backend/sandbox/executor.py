@@ -30,6 +30,11 @@ SANDBOX_IMAGE = "axon-sandbox:latest"
 # Semaphore fuer max gleichzeitige Container
 _semaphore = asyncio.Semaphore(MAX_CONCURRENT)
 
+# Docker/Image-Checks cachen statt pro Aufruf `docker info` zu starten
+_CHECK_TTL_AVAILABLE = 300  # Sekunden
+_CHECK_TTL_UNAVAILABLE = 30
+_check_cache: dict[str, tuple[float, bool]] = {}
+
 
 class SandboxResult:
     """Ergebnis einer Sandbox-Ausfuehrung"""
@@ -66,6 +71,25 @@ class SandboxResult:
         return output[:MAX_OUTPUT_LENGTH]
 
 
+async def _cached_check(name: str, check) -> bool:
+    """Ergebnis eines Verfuegbarkeits-Checks, gecacht (negativ kuerzer als positiv)"""
+    entry = _check_cache.get(name)
+    if entry is not None:
+        checked_at, ok = entry
+        ttl = _CHECK_TTL_AVAILABLE if ok else _CHECK_TTL_UNAVAILABLE
+        if time.monotonic() - checked_at < ttl:
+            return ok
+
+    ok = await check()
+    _check_cache[name] = (time.monotonic(), ok)
+    return ok
+
+
+def reset_check_cache():
+    """Docker/Image-Status neu pruefen (z.B. nach Image-Build)"""
+    _check_cache.clear()
+
+
 async def _check_docker() -> bool:
     """Prueft ob Docker verfuegbar ist"""
     try:
@@ -118,6 +142,7 @@ async def build_sandbox_image() -> bool:
             stderr=asyncio.subprocess.PIPE,
         )
         _stdout, _stderr = await proc.wait(), None
+        reset_check_cache()
         return proc.returncode == 0
     except Exception as e:
         logger.error(f"Sandbox Image Build fehlgeschlagen: {e}")
@@ -141,7 +166,7 @@ async def execute_code(
         memory: Memory-Limit (z.B. "256m")
         cpus: CPU-Limit (z.B. "0.5")
     """
-    if not await _check_docker():
+    if not await _cached_check("docker", _check_docker):
         return SandboxResult(
             stdout="",
             stderr="Docker ist nicht verfuegbar. Code-Sandbox deaktiviert.",
@@ -149,7 +174,7 @@ async def execute_code(
             execution_time_ms=0,
         )
 
-    if not await _check_image_exists():
+    if not await _cached_check("image", _check_image_exists):
         return SandboxResult(
             stdout="",
             stderr=f"Sandbox Image '{SANDBOX_IMAGE}' nicht gefunden. Bitte mit 'docker build' erstellen.",
@@ -55,6 +55,7 @@ def mock_embedding():
     if HAS_EMBEDDINGS_MODULE:
         with patch("agent.memory.embedding_provider") as mock:
             mock.embed = AsyncMock(return_value=None)
+            mock.embed_batch = AsyncMock(side_effect=lambda texts: [None] * len(texts))
             mock.is_available = AsyncMock(return_value=False)
             yield mock
     else:
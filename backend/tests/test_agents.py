@@ -38,6 +38,32 @@ class TestAgentManagerDefaults:
         default = await manager.get_default_agent()
         assert default is not None
         assert default.name == "Assistent"
+
+    @pytest.mark.asyncio
+    async def test_default_agent_loaded_per_session(self, db, db_engine):
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+        manager = AgentManager(db)
+        await manager.ensure_defaults()
+        default = await manager.get_default_agent()
+
+        factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        async with factory() as other:
+            loaded = await AgentManager(other).get_default_agent()
+            assert loaded.id == default.id
+            assert loaded.name == "Assistent"
+            assert loaded in other
+            assert loaded is not default
+
+    @pytest.mark.asyncio
+    async def test_default_agent_reflects_update(self, db):
+        manager = AgentManager(db)
+        await manager.ensure_defaults()
+        default = await manager.get_default_agent()
+
+        await manager.update_agent(default.id, system_prompt="Neuer Prompt")
+        refreshed = await manager.get_default_agent()
+        assert refreshed.system_prompt == "Neuer Prompt"
         assert default.is_default is True
 
     @pytest.mark.asyncio
@@ -198,6 +224,37 @@ class TestAgentPermissions:
         assert AgentManager.check_risk_level(agent, "high") is True
         assert AgentManager.check_risk_level(agent, "critical") is False
 
+    def test_caps_follow_reassigned_fields(self):
+        """Cached caps are rebuilt when the permission fields change"""
+        agent = Agent(name="Test", allowed_tools=["web_search"], risk_level_max="low")
+        assert AgentManager.is_tool_allowed(agent, "file_read") is False
+        assert AgentManager.check_risk_level(agent, "high") is False
+
+        agent.allowed_tools = ["web_search", "file_read"]
+        agent.risk_level_max = "high"
+        assert AgentManager.is_tool_allowed(agent, "file_read") is True
+        assert AgentManager.check_risk_level(agent, "high") is True
+
+    def test_request_cache_memoizes_decisions(self):
+        agent = Agent(id="a1", name="Test", allowed_tools=["web_search"])
+        cache = {}
+        assert AgentManager.is_tool_allowed(agent, "web_search", cache=cache)
+        assert len(cache) == 1
+
+        # Same request: served from the cache, not recomputed
+        agent.allowed_tools = []
+        assert AgentManager.is_tool_allowed(agent, "web_search", cache=cache)
+
+    @pytest.mark.asyncio
+    async def test_update_agent_invalidates_request_cache(self, db):
+        manager = AgentManager(db)
+        agent = await manager.create_agent(name="Cache", allowed_tools=["web_search"])
+        cache = {}
+        assert AgentManager.is_tool_allowed(agent, "web_search", cache=cache)
+
+        await manager.update_agent(agent.id, allowed_tools=["file_read"])
+        assert not AgentManager.is_tool_allowed(agent, "web_search", cache=cache)
+
 
 class TestDefaultAgentConfig:
     """Tests that default agents have correct configurations"""
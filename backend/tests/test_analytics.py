@@ -0,0 +1,120 @@
+"""
+Axon by NeuroVexon - Analytics Tests
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.analytics import get_overview, get_timeline, get_tool_stats
+from db.models import AuditLog, Conversation, Message
+
+
+class TestOverview:
+    """Tests for the dashboard overview counters"""
+
+    @pytest.mark.asyncio
+    async def test_empty_database(self, db):
+        overview = await get_overview(current_user=None, db=db)
+
+        assert overview == {
+            "conversations": 0,
+            "messages": 0,
+            "agents": 0,
+            "tool_calls": 0,
+            "approval_rate": 0,
+            "active_tasks": 0,
+            "workflows": 0,
+            "active_skills": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_counts(self, db):
+        conv = Conversation()
+        db.add(conv)
+        await db.flush()
+        db.add(Message(conversation_id=conv.id, role="user", content="Hallo"))
+        for event in (
+            "tool_requested",
+            "tool_requested",
+            "tool_approved",
+            "tool_executed",
+            "tool_failed",
+        ):
+            db.add(AuditLog(conversation_id=conv.id, event_type=event))
+        await db.flush()
+
+        overview = await get_overview(current_user=None, db=db)
+
+        assert overview["conversations"] == 1
+        assert overview["messages"] == 1
+        assert overview["tool_calls"] == 1
+        assert overview["approval_rate"] == 50.0
+
+
+class TestToolStats:
+    """Tests for per-tool usage and error rates"""
+
+    @pytest.mark.asyncio
+    async def test_usage_and_failures(self, db):
+        events = [
+            ("web_search", "tool_executed", 100),
+            ("web_search", "tool_executed", 200),
+            ("web_search", "tool_failed", None),
+            ("file_read", "tool_executed", 10),
+            ("shell_execute", "tool_failed", None),
+            ("file_read", "tool_requested", None),
+        ]
+        for tool, event, time_ms in events:
+            db.add(
+                AuditLog(
+                    conversation_id="c",
+                    event_type=event,
+                    tool_name=tool,
+                    execution_time_ms=time_ms,
+                )
+            )
+        await db.flush()
+
+        stats = await get_tool_stats(current_user=None, db=db)
+
+        assert stats["tools"] == [
+            {
+                "tool": "web_search",
+                "count": 2,
+                "avg_time_ms": 150.0,
+                "failures": 1,
+                "error_rate": 33.3,
+            },
+            {
+                "tool": "file_read",
+                "count": 1,
+                "avg_time_ms": 10.0,
+                "failures": 0,
+                "error_rate": 0.0,
+            },
+        ]
+
+
+class TestTimeline:
+    """Tests for the per-day timeline"""
+
+    @pytest.mark.asyncio
+    async def test_counts_per_day(self, db):
+        db.add(Conversation())
+        db.add(AuditLog(conversation_id="c", event_type="tool_executed"))
+        db.add(AuditLog(conversation_id="c", event_type="tool_executed"))
+        db.add(AuditLog(conversation_id="c", event_type="tool_failed"))
+        await db.flush()
+
+        timeline = (await get_timeline(days=3, current_user=None, db=db))["timeline"]
+
+        assert len(timeline) == 3
+        assert timeline[-1]["conversations"] == 1
+        assert timeline[-1]["tool_calls"] == 2
+        assert all(
+            day["conversations"] == day["tool_calls"] == 0 for day in timeline[:-1]
+        )
@@ -0,0 +1,252 @@
+"""
+Axon by NeuroVexon - Audit Export Tests
+"""
+
+import csv
+import io
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api import audit
+from db.models import AuditLog
+
+
+class TestCsvExport:
+    """Tests for the streamed CSV export"""
+
+    @pytest.mark.asyncio
+    async def test_streams_all_rows_in_chunks(self, db_engine, monkeypatch):
+        session_factory = async_sessionmaker(
+            db_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with session_factory() as db:
+            db.add_all(
+                AuditLog(
+                    conversation_id="sess",
+                    event_type="tool_executed",
+                    tool_name=f"tool_{i}",
+                    tool_params={"n": i},
+                    execution_time_ms=i,
+                )
+                for i in range(5)
+            )
+            await db.commit()
+
+        monkeypatch.setattr(audit, "async_session", session_factory)
+        monkeypatch.setattr(audit, "EXPORT_CHUNK_ROWS", 2)
+
+        response = await audit.export_audit_logs(
+            format="csv", session_id="sess", current_user=None, db=None
+        )
+        chunks = [chunk async for chunk in response.body_iterator]
+
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        assert len(chunks) == 3
+        assert rows[0][:3] == ["id", "session_id", "timestamp"]
+        assert sorted(row[4] for row in rows[1:]) == [f"tool_{i}" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_row_format(self, db_engine, monkeypatch):
+        session_factory = async_sessionmaker(
+            db_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with session_factory() as db:
+            db.add(
+                AuditLog(
+                    conversation_id="sess",
+                    event_type="tool_executed",
+                    tool_name="web_fetch",
+                    tool_params={"url": "https://example.com"},
+                    result="ä" * 800,
+                )
+            )
+            await db.commit()
+
+        monkeypatch.setattr(audit, "async_session", session_factory)
+
+        response = await audit.export_audit_logs(
+            format="csv", session_id=None, current_user=None, db=None
+        )
+        body = "".join([chunk async for chunk in response.body_iterator])
+
+        row = list(csv.reader(io.StringIO(body)))[1]
+        assert row[5] == "{'url': 'https://example.com'}"
+        assert row[6] == "ä" * 500
+        assert row[7:] == ["", "", ""]
+
+
+class TestAuditStats:
+    """Tests for the aggregated audit statistics"""
+
+    @pytest.mark.asyncio
+    async def test_stats(self, db):
+        for event, tool, time_ms in (
+            ("tool_requested", "web_search", None),
+            ("tool_executed", "web_search", 100),
+            ("tool_executed", "file_read", 51),
+            ("permission_granted", None, None),
+        ):
+            db.add(
+                AuditLog(
+                    conversation_id="sess",
+                    event_type=event,
+                    tool_name=tool,
+                    execution_time_ms=time_ms,
+                )
+            )
+        await db.flush()
+
+        stats = await audit.get_audit_stats(current_user=None, db=db)
+
+        assert stats == {
+            "total": 4,
+            "by_event_type": {
+                "tool_requested": 1,
+                "tool_executed": 2,
+                "permission_granted": 1,
+            },
+            "by_tool": {"web_search": 2, "file_read": 1},
+            "avg_execution_time_ms": 75.5,
+        }
+
+    @pytest.mark.asyncio
+    async def test_session_filter(self, db):
+        for session, tool, time_ms in (
+            ("sess", "web_search", 100),
+            ("other", "file_read", 10),
+            ("other", "file_read", 20),
+        ):
+            db.add(
+                AuditLog(
+                    conversation_id=session,
+                    event_type="tool_executed",
+                    tool_name=tool,
+                    execution_time_ms=time_ms,
+                )
+            )
+        await db.flush()
+
+        stats = await audit.get_audit_stats(session_id="sess", current_user=None, db=db)
+
+        assert stats == {
+            "total": 1,
+            "by_event_type": {"tool_executed": 1},
+            "by_tool": {"web_search": 1},
+            "avg_execution_time_ms": 100,
+        }
+
+    @pytest.mark.asyncio
+    async def test_empty(self, db):
+        stats = await audit.get_audit_stats(current_user=None, db=db)
+
+        assert stats == {
+            "total": 0,
+            "by_event_type": {},
+            "by_tool": {},
+            "avg_execution_time_ms": None,
+        }
+
+
+class TestListAuditLogs:
+    """Tests for the audit log listing"""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_limit(self, db):
+        for i, event in enumerate(
+            ["tool_executed", "tool_failed", "tool_executed", "tool_executed"]
+        ):
+            db.add(
+                AuditLog(
+                    conversation_id="sess" if i < 3 else "other",
+                    event_type=event,
+                    tool_name=f"tool_{i}",
+                )
+            )
+        await db.flush()
+
+        logs = await audit.list_audit_logs(
+            event_type="tool_executed", limit=2, current_user=None, db=db
+        )
+        assert len(logs) == 2
+        assert {log["event_type"] for log in logs} == {"tool_executed"}
+
+        logs = await audit.list_audit_logs(
+            session_id="sess",
+            event_type="tool_executed",
+            limit=10,
+            offset=1,
+            current_user=None,
+            db=db,
+        )
+        assert len(logs) == 1
+        assert logs[0]["session_id"] == "sess"
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, db):
+        from datetime import datetime, timedelta
+
+        start = datetime(2026, 1, 1)
+        # tool_1..tool_3 share a timestamp (one orchestrator batch)
+        for i, minute in enumerate([0, 1, 1, 1, 2]):
+            db.add(
+                AuditLog(
+                    conversation_id="sess",
+                    event_type="tool_executed",
+                    tool_name=f"tool_{i}",
+                    timestamp=start + timedelta(minutes=minute),
+                )
+            )
+        await db.flush()
+
+        seen = []
+        before_ts = before_id = None
+        while True:
+            page = await audit.list_audit_logs(
+                limit=2,
+                before_ts=before_ts,
+                before_id=before_id,
+                current_user=None,
+                db=db,
+            )
+            if not page:
+                break
+            seen.extend(page)
+            before_ts = datetime.fromisoformat(page[-1]["timestamp"])
+            before_id = page[-1]["id"]
+
+        assert len(seen) == 5
+        assert sorted(log["tool_name"] for log in seen) == [
+            f"tool_{i}" for i in range(5)
+        ]
+        assert seen[0]["tool_name"] == "tool_4"
+        assert seen[-1]["tool_name"] == "tool_0"
+        timestamps = [log["timestamp"] for log in seen]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_before_ts_without_id(self, db):
+        from datetime import datetime, timedelta
+
+        start = datetime(2026, 1, 1)
+        for i in range(3):
+            db.add(
+                AuditLog(
+                    conversation_id="sess",
+                    event_type="tool_executed",
+                    tool_name=f"tool_{i}",
+                    timestamp=start + timedelta(minutes=i),
+                )
+            )
+        await db.flush()
+
+        logs = await audit.list_audit_logs(
+            before_ts=start + timedelta(minutes=2), current_user=None, db=db
+        )
+
+        assert [log["tool_name"] for log in logs] == ["tool_1", "tool_0"]
@@ -0,0 +1,105 @@
+"""
+Axon by NeuroVexon - Document Handler Tests
+
+Tests for extract_text size limits (text, CSV, JSON).
+"""
+
+import json
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import document_handler
+from agent.document_handler import (
+    extract_text,
+    extract_text_async,
+    is_allowed_file,
+    MAX_TEXT_LENGTH,
+)
+
+
+class TestIsAllowedFile:
+    """Extension check is case-insensitive and rejects unknown types"""
+
+    def test_allowed_extensions(self):
+        assert is_allowed_file("bericht.PDF") is True
+        assert is_allowed_file("daten.csv") is True
+        assert is_allowed_file("archiv.tar.yaml") is True
+
+    def test_rejected_extensions(self):
+        assert is_allowed_file("setup.exe") is False
+        assert is_allowed_file("README") is False
+        assert is_allowed_file(".pdf") is False
+
+    def test_image_returns_placeholder(self, tmp_path):
+        path = tmp_path / "foto.JPG"
+        path.write_bytes(b"\xff\xd8")
+        assert extract_text(str(path)) == "[Bild: foto.JPG]"
+
+
+class TestExtractText:
+    """Extraction must stay within MAX_TEXT_LENGTH regardless of file size"""
+
+    def test_text_file_is_capped(self, tmp_path):
+        path = tmp_path / "big.txt"
+        path.write_text("a" * (MAX_TEXT_LENGTH * 10), encoding="utf-8")
+
+        text = extract_text(str(path))
+        assert len(text) == MAX_TEXT_LENGTH
+
+    def test_small_text_file_unchanged(self, tmp_path):
+        path = tmp_path / "notes.md"
+        path.write_text("Hallo Welt", encoding="utf-8")
+
+        assert extract_text(str(path)) == "Hallo Welt"
+
+    def test_csv_stops_at_budget(self, tmp_path):
+        path = tmp_path / "wide.csv"
+        row = ",".join(["x" * 500] * 10)
+        path.write_text("\n".join([row] * 50), encoding="utf-8")
+
+        text = extract_text(str(path))
+        assert len(text) <= MAX_TEXT_LENGTH
+
+    def test_json_is_pretty_printed(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps({"name": "Axon"}), encoding="utf-8")
+
+        assert extract_text(str(path)) == '{\n  "name": "Axon"\n}'
+
+    def test_oversized_json_is_not_parsed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(document_handler, "MAX_JSON_SIZE", 100)
+        path = tmp_path / "huge.json"
+        path.write_text(json.dumps({"items": list(range(1000))}), encoding="utf-8")
+
+        text = extract_text(str(path))
+        assert text.startswith("[JSON zu gross")
+        assert len(text) <= MAX_TEXT_LENGTH
+
+    def test_pdf_stops_after_budget(self, tmp_path):
+        fitz = pytest.importorskip("fitz")
+        path = tmp_path / "long.pdf"
+        with fitz.open() as doc:
+            for i in range(200):
+                page = doc.new_page()
+                page.insert_text((72, 72), f"Seite {i} " + "lorem ipsum " * 8)
+            doc.save(str(path))
+
+        text = extract_text(str(path))
+        assert text.startswith("Seite 0")
+        assert len(text) == MAX_TEXT_LENGTH
+        assert "Seite 199" not in text
+
+
+class TestExtractTextAsync:
+    """extract_text_async runs the same extraction off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_matches_sync_result(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("Axon", encoding="utf-8")
+
+        assert await extract_text_async(str(path)) == extract_text(str(path))
@@ -4,10 +4,16 @@ Axon by NeuroVexon - Embedding & Cosine Similarity Tests
 Tests for cosine_similarity and EmbeddingProvider behavior.
 """
 
+import httpx
+import numpy as np
 import pytest
 
 try:
-    from agent.embeddings import cosine_similarity, EmbeddingProvider
+    from agent.embeddings import (
+        cosine_similarity,
+        cosine_similarities,
+        EmbeddingProvider,
+    )
 
     HAS_EMBEDDINGS = True
 except ImportError:
@@ -56,6 +62,12 @@ class TestCosineSimilarity:
         result = cosine_similarity(a, b)
         assert result == 0.0
 
+    def test_normalized_inputs_use_plain_dot(self):
+        a = np.array([0.6, 0.8], dtype=np.float32)
+        b = np.array([1.0, 0.0], dtype=np.float32)
+        assert abs(cosine_similarity(a, b, normalized=True) - 0.6) < 1e-6
+        assert abs(cosine_similarity(a, b) - 0.6) < 1e-6
+
     def test_high_dimensional(self):
         """Test with typical embedding dimensions"""
         a = [float(i) / 768 for i in range(768)]
@@ -70,6 +82,32 @@ class TestCosineSimilarity:
         assert result < 0  # Opposite direction
 
 
+class TestCosineSimilarities:
+    """Tests for batched cosine similarity against a matrix"""
+
+    def test_matches_scalar_version(self):
+        query = [1.0, 2.0, 3.0]
+        rows = [[1.0, 2.0, 3.0], [-1.0, 0.5, 2.0], [3.0, 0.0, -1.0]]
+        matrix = np.array(rows, dtype=np.float32)
+
+        scores = cosine_similarities(query, matrix)
+
+        assert scores.shape == (3,)
+        for score, row in zip(scores, rows):
+            assert abs(score - cosine_similarity(query, row)) < 1e-5
+
+    def test_zero_row_scores_zero(self):
+        matrix = np.array([[0.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+        scores = cosine_similarities([1.0, 0.0], matrix)
+        assert scores[0] == 0.0
+        assert abs(scores[1] - 1.0) < 1e-5
+
+    def test_zero_query_scores_zero(self):
+        matrix = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+        scores = cosine_similarities([0.0, 0.0], matrix)
+        assert not scores.any()
+
+
 class TestEmbeddingProvider:
     """Tests for EmbeddingProvider"""
 
@@ -114,3 +152,80 @@ class TestEmbeddingProvider:
         results = await provider.embed_batch(["text1", "text2", "text3"])
         assert len(results) == 3
         assert all(r is None for r in results)
+
+    @pytest.mark.asyncio
+    async def test_http_client_is_reused(self):
+        provider = EmbeddingProvider()
+        client = provider._get_client()
+        assert provider._get_client() is client
+
+        await provider.aclose()
+        assert client.is_closed
+        assert provider._client is None
+
+    @staticmethod
+    def _provider_with_transport(handler) -> "EmbeddingProvider":
+        provider = EmbeddingProvider()
+        provider._available = True
+        provider._checked_at = float("inf")
+        provider._client = httpx.AsyncClient(
+            base_url="http://ollama.test", transport=httpx.MockTransport(handler)
+        )
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_embed_caches_repeated_text(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"embeddings": [[0.1, 0.2]]})
+
+        provider = self._provider_with_transport(handler)
+
+        first = await provider.embed("Wie heisst der Server?")
+        second = await provider.embed("Wie heisst der Server?")
+        await provider.embed("Andere Frage")
+
+        assert first == second == [0.1, 0.2]
+        assert len(calls) == 2
+        await provider.aclose()
+
+    @pytest.mark.asyncio
+    async def test_embed_batch_splits_into_sub_batches(self):
+        import json
+
+        sizes = []
+
+        def handler(request):
+            texts = json.loads(request.content)["input"]
+            sizes.append(len(texts))
+            return httpx.Response(
+                200, json={"embeddings": [[float(t.split()[-1])] for t in texts]}
+            )
+
+        provider = self._provider_with_transport(handler)
+        texts = [f"Text {i}" for i in range(40)]
+        result = await provider.embed_batch(texts)
+
+        assert sorted(sizes) == [8, 16, 16]
+        assert result == [[float(i)] for i in range(40)]  # order preserved
+        await provider.aclose()
+
+    @pytest.mark.asyncio
+    async def test_reset_cache_clears_embeddings(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"embeddings": [[0.1, 0.2]]})
+
+        provider = self._provider_with_transport(handler)
+        await provider.embed("Frage")
+        provider.reset_cache()
+        provider._available = True
+        provider._checked_at = float("inf")
+        await provider.embed("Frage")
+
+        assert len(calls) == 2
+        await provider.aclose()
@@ -4,6 +4,7 @@ Axon by NeuroVexon - Memory Manager Tests
 Tests for MemoryManager: CRUD operations, search, prompt building, serialization.
 """
 
+import numpy as np
 import pytest
 
 from agent.memory import MemoryManager, MAX_MEMORY_CONTENT_LENGTH
@@ -30,23 +31,42 @@ class TestEmbeddingSerialization:
 
         assert len(deserialized) == len(original)
         for a, b in zip(original, deserialized):
-            assert abs(a - b) < 1e-6
+            assert abs(a - b) < 0.5 / 127  # int8 quantization step
 
     def test_empty_list(self):
         serialized = _serialize_embedding([])
         deserialized = _deserialize_embedding(serialized)
-        assert deserialized == []
+        assert len(deserialized) == 0
 
     def test_serialized_size(self):
         embedding = [0.0] * 768  # Typical embedding dimension
         serialized = _serialize_embedding(embedding)
-        assert len(serialized) == 768 * 4  # 4 bytes per float32
+        assert len(serialized) == 768 + 8  # 1 byte per int8 + header
 
     def test_negative_values(self):
         original = [-1.0, -0.5, 0.0, 0.5, 1.0]
         result = _deserialize_embedding(_serialize_embedding(original))
         for a, b in zip(original, result):
-            assert abs(a - b) < 1e-6
+            assert abs(a - b) < 1.0 / 127
+
+    def test_legacy_float32_still_readable(self):
+        """Existing rows were written as raw float32 — must stay readable"""
+        import struct
+
+        original = [0.25, -1.5, 3.0]
+        legacy = struct.pack(f"{len(original)}f", *original)
+
+        assert list(_deserialize_embedding(legacy)) == original
+
+    def test_cosine_preserved_after_quantization(self):
+        rng = np.random.default_rng(0)
+        a, b = rng.normal(size=768), rng.normal(size=768)
+        qa = _deserialize_embedding(_serialize_embedding(a))
+        qb = _deserialize_embedding(_serialize_embedding(b))
+
+        exact = a @ b / (np.linalg.norm(a) * np.linalg.norm(b))
+        approx = qa @ qb / (np.linalg.norm(qa) * np.linalg.norm(qb))
+        assert abs(exact - approx) < 0.01
 
 
 class TestMemoryManagerCRUD:
@@ -72,6 +92,44 @@ class TestMemoryManagerCRUD:
         assert mem1.id == mem2.id
         assert mem2.content == "Bob"
 
+    @pytest.mark.asyncio
+    async def test_add_memory_upsert_keeps_category(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Firma", "NeuroVexon", category="work")
+        mem = await manager.add("Firma", "NeuroVexon UG")
+
+        assert mem.category == "work"
+        assert mem.content == "NeuroVexon UG"
+        assert len(await manager.list_all()) == 1
+
+    @pytest.mark.asyncio
+    async def test_add_many(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Firma", "NeuroVexon", category="work")
+
+        count = await manager.add_many(
+            [
+                {"key": "Name", "content": "Alice"},
+                {"key": "Firma", "content": "NeuroVexon UG"},
+                {"key": "Stadt", "content": "Berlin", "category": "privat"},
+                {"key": "Name", "content": "Bob"},
+                {"key": "Leer", "content": "  "},
+            ]
+        )
+
+        assert count == 3
+        mock_embedding.embed_batch.assert_awaited_once()
+        memories = {m.key: m for m in await manager.list_all()}
+        assert set(memories) == {"Name", "Firma", "Stadt"}
+        assert memories["Name"].content == "Bob"
+        assert memories["Firma"].content == "NeuroVexon UG"
+        assert memories["Firma"].category == "work"
+        assert memories["Stadt"].category == "privat"
+
+    @pytest.mark.asyncio
+    async def test_add_many_empty(self, db, mock_embedding):
+        assert await MemoryManager(db).add_many([]) == 0
+
     @pytest.mark.asyncio
     async def test_add_memory_truncates_content(self, db, mock_embedding):
         manager = MemoryManager(db)
@@ -80,6 +138,15 @@ class TestMemoryManagerCRUD:
 
         assert len(mem.content) <= MAX_MEMORY_CONTENT_LENGTH
 
+    @pytest.mark.asyncio
+    async def test_add_memory_truncates_at_word_boundary(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        words = " ".join(["Wort"] * 200)  # 999 chars
+        mem = await manager.add("Text", words)
+
+        assert len(mem.content) <= MAX_MEMORY_CONTENT_LENGTH
+        assert mem.content.endswith("Wort")
+
     @pytest.mark.asyncio
     async def test_add_memory_truncates_key(self, db, mock_embedding):
         manager = MemoryManager(db)
@@ -141,6 +208,14 @@ class TestMemoryManagerCRUD:
         limited = await manager.list_all(limit=3)
         assert len(limited) == 3
 
+    @pytest.mark.asyncio
+    async def test_list_all_light(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Sprache", "Deutsch", category="Praeferenz")
+
+        rows = await manager.list_all_light()
+        assert rows == [("Sprache", "Deutsch", "Praeferenz")]
+
     @pytest.mark.asyncio
     async def test_remove_by_id(self, db, mock_embedding):
         manager = MemoryManager(db)
@@ -169,6 +244,11 @@ class TestMemoryManagerCRUD:
         found = await manager.get("Loeschbar")
         assert found is None
 
+    @pytest.mark.asyncio
+    async def test_remove_by_key_nonexistent(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        assert await manager.remove_by_key("gibt-es-nicht") is False
+
     @pytest.mark.asyncio
     async def test_clear_all(self, db, mock_embedding):
         manager = MemoryManager(db)
@@ -223,6 +303,224 @@ class TestMemorySearch:
         assert len(results) >= 1
 
 
+class TestFulltextSearch:
+    """Tests for the FTS5 trigram index behind the text search"""
+
+    @pytest.mark.asyncio
+    async def test_substring_match_uses_index(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Domain", "neurovexon.com")
+        await manager.add("Server", "Hetzner in Deutschland")
+
+        results = await manager._fulltext_search("etzn", 10)
+        assert [m.key for m in results] == ["Server"]
+        results = await manager._fulltext_search("VEXON.C", 10)
+        assert [m.key for m in results] == ["Domain"]
+
+    @pytest.mark.asyncio
+    async def test_index_follows_upsert_and_delete(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Server", "Hetzner")
+        await manager.add("Server", "Netcup")
+
+        assert await manager._fulltext_search("Hetzner", 10) == []
+        assert len(await manager._fulltext_search("Netcup", 10)) == 1
+
+        await manager.remove_by_key("Server")
+        assert await manager._fulltext_search("Netcup", 10) == []
+
+    @pytest.mark.asyncio
+    async def test_short_query_falls_back_to_ilike(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Sprache", "Go")
+
+        assert await manager._fulltext_search("go", 10) is None
+        results = await manager.search("go")
+        assert [m.key for m in results] == ["Sprache"]
+
+    @staticmethod
+    def _install_legacy_index(conn):
+        from sqlalchemy import text
+        from db.models import MEMORY_FTS_TRIGGERS
+
+        for trigger in MEMORY_FTS_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER {trigger}"))
+        conn.execute(text("DROP TABLE memories_fts"))
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE memories_fts USING fts5("
+                "key, content, content='memories', content_rowid='rowid')"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TRIGGER memories_fts_ai AFTER INSERT ON memories BEGIN "
+                "INSERT INTO memories_fts(rowid, key, content) "
+                "VALUES (new.rowid, new.key, new.content); END"
+            )
+        )
+
+    @staticmethod
+    def _fts_objects(conn):
+        from sqlalchemy import text
+
+        return conn.execute(
+            text(
+                "SELECT type, name, sql FROM sqlite_master "
+                "WHERE name LIKE 'memories_fts%' AND type IN ('table', 'trigger')"
+            )
+        ).all()
+
+    @pytest.mark.asyncio
+    async def test_replaces_legacy_word_index(self, db_engine):
+        from db.models import create_memory_fts
+
+        async with db_engine.begin() as conn:
+            await conn.run_sync(self._install_legacy_index)
+            await conn.run_sync(create_memory_fts)
+            objects = await conn.run_sync(self._fts_objects)
+
+        table_sql = [sql for kind, name, sql in objects if name == "memories_fts"]
+        assert "trigram" in table_sql[0]
+        assert {name for kind, name, _ in objects if kind == "trigger"} == {
+            "memories_fts_ai",
+            "memories_fts_ad",
+            "memories_fts_au",
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_create_leaves_memories_writable(
+        self, db_engine, mock_embedding, monkeypatch
+    ):
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+        from db import models
+
+        monkeypatch.setattr(
+            models,
+            "MEMORY_FTS_DDL",
+            [
+                "CREATE VIRTUAL TABLE memories_fts USING fts5(key, tokenize='nope')",
+                *models.MEMORY_FTS_DDL[1:],
+            ],
+        )
+        async with db_engine.begin() as conn:
+            await conn.run_sync(self._install_legacy_index)
+            await conn.run_sync(models.create_memory_fts)
+            assert await conn.run_sync(self._fts_objects) == []
+
+        factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        async with factory() as session:
+            manager = MemoryManager(session)
+            await manager.add("Server", "Hetzner")
+            assert [m.key for m in await manager.search("Hetzner")] == ["Server"]
+
+
+class TestSemanticSearch:
+    """Tests for embedding-based ranking"""
+
+    @staticmethod
+    def _fake_embed(text: str) -> list[float]:
+        vectors = {
+            "Python": [1.0, 0.0, 0.0],
+            "Hetzner": [0.0, 1.0, 0.0],
+        }
+        for word, vec in vectors.items():
+            if word in text:
+                return vec
+        return [0.0, 0.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_ranks_by_similarity(self, db, mock_embedding):
+        mock_embedding.embed.side_effect = self._fake_embed
+        manager = MemoryManager(db)
+        await manager.add("Sprache", "Python 3.11")
+        await manager.add("Server", "Hetzner")
+        await manager.add("Sonstiges", "Etwas anderes")
+
+        results = await manager.search("Python")
+        assert [m.key for m in results] == ["Sprache"]
+
+    @pytest.mark.asyncio
+    async def test_respects_limit(self, db, mock_embedding):
+        mock_embedding.embed.side_effect = self._fake_embed
+        manager = MemoryManager(db)
+        for i in range(5):
+            await manager.add(f"Python-{i}", "Python")
+
+        results = await manager.search("Python", limit=2)
+        assert len(results) == 2
+
+    @pytest.mark.asyncio
+    async def test_embedding_matrix_cached_until_write(self, db, mock_embedding):
+        from unittest.mock import patch
+        from agent import memory
+
+        mock_embedding.embed.side_effect = self._fake_embed
+        manager = MemoryManager(db)
+        await manager.add("Sprache", "Python 3.11")
+
+        with patch.object(
+            memory, "_stack_embeddings", wraps=memory._stack_embeddings
+        ) as stack:
+            await manager.search("Python")
+            await manager.search("Python")
+            assert stack.call_count == 1
+
+            await manager.add("Server", "Hetzner")
+            results = await manager.search("Hetzner")
+            assert stack.call_count == 2
+        assert [m.key for m in results] == ["Server"]
+
+    @pytest.mark.asyncio
+    async def test_ignores_embeddings_of_other_dimension(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        mock_embedding.embed.return_value = [1.0, 0.0]  # old 2-dim model
+        await manager.add("Alt", "Python 2")
+
+        mock_embedding.embed.side_effect = self._fake_embed
+        await manager.add("Neu", "Python 3")
+
+        results = await manager.search("Python")
+        assert [m.key for m in results] == ["Neu"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_float32_rows_are_ranked_and_migrated(
+        self, db, mock_embedding
+    ):
+        mock_embedding.embed.side_effect = self._fake_embed
+        manager = MemoryManager(db)
+        legacy = await manager.add("Sprache", "Python 3.11")
+        legacy.embedding = np.asarray([1.0, 0.0, 0.0], dtype=np.float32).tobytes()
+        await manager.add("Server", "Hetzner")
+        await db.flush()
+
+        results = await manager.search("Python")
+        assert [m.key for m in results] == ["Sprache"]
+
+        assert await manager.quantize_legacy_embeddings() == 1
+        assert await manager.quantize_legacy_embeddings() == 0
+        results = await manager.search("Python")
+        assert [m.key for m in results] == ["Sprache"]
+
+    @pytest.mark.asyncio
+    async def test_lazy_embeddings_use_one_batch_call(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        # Stored while the embedding model was unavailable
+        await manager.add("Sprache", "Python 3.11")
+        await manager.add("Server", "Hetzner")
+
+        mock_embedding.embed.side_effect = self._fake_embed
+        mock_embedding.embed_batch.side_effect = lambda texts: [
+            self._fake_embed(t) for t in texts
+        ]
+
+        results = await manager.search("Hetzner")
+
+        assert [m.key for m in results] == ["Server"]
+        mock_embedding.embed_batch.assert_awaited_once()
+        assert len(mock_embedding.embed_batch.await_args.args[0]) == 2
+
+
 class TestMemoryPrompt:
     """Tests for memory prompt building"""
 
@@ -252,3 +550,115 @@ class TestMemoryPrompt:
         assert "Bekannte Fakten:" in prompt
         assert "Server: Hetzner" in prompt
         assert "**" not in prompt  # No markdown
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_sorted_by_key(self, db, mock_embedding):
+        manager = MemoryManager(db)
+        await manager.add("Zeitzone", "Europe/Berlin")
+        await manager.add("Auto", "Tesla")
+
+        prompt = await manager.build_memory_prompt(plain=True)
+        assert prompt == "Bekannte Fakten: Auto: Tesla. Zeitzone: Europe/Berlin."
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_prefers_memories_matching_query(
+        self, db, mock_embedding
+    ):
+        from datetime import datetime, timedelta
+        from sqlalchemy import update
+        from agent.memory import MAX_MEMORIES_IN_PROMPT
+        from db.models import Memory
+
+        manager = MemoryManager(db)
+        await manager.add("Lieblingsfarbe", "Blau")
+        await db.execute(
+            update(Memory)
+            .where(Memory.key == "Lieblingsfarbe")
+            .values(updated_at=datetime.utcnow() - timedelta(days=30))
+        )
+        await manager.add_many(
+            [
+                {"key": f"Fakt {i:02d}", "content": f"Wert {i}"}
+                for i in range(MAX_MEMORIES_IN_PROMPT)
+            ]
+        )
+
+        recent = await manager.build_memory_prompt(plain=True)
+        assert "Lieblingsfarbe" not in recent
+
+        prompt = await manager.build_memory_prompt(plain=True, query="Lieblingsfarbe")
+        assert "Lieblingsfarbe: Blau" in prompt
+        assert prompt.count(": Wert") == MAX_MEMORIES_IN_PROMPT - 1
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_with_query_does_not_embed(self, db, mock_embedding):
+        from agent.memory import MAX_MEMORIES_IN_PROMPT
+
+        manager = MemoryManager(db)
+        await manager.add_many(
+            [
+                {"key": f"Fakt {i:02d}", "content": f"Wert {i}"}
+                for i in range(MAX_MEMORIES_IN_PROMPT + 1)
+            ]
+        )
+        mock_embedding.embed.return_value = [1.0, 0.0, 0.0]
+        mock_embedding.embed_batch.reset_mock()
+
+        prompt = await manager.build_memory_prompt(plain=True, query="Fakt 03")
+
+        assert "Fakt 03: Wert 3" in prompt
+        mock_embedding.embed_batch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_respects_token_budget(self, db, mock_embedding):
+        from agent.memory import MAX_MEMORY_PROMPT_TOKENS
+
+        manager = MemoryManager(db)
+        await manager.add_many(
+            [{"key": f"Fakt {i:02d}", "content": "x" * 400} for i in range(30)]
+        )
+
+        prompt = await manager.build_memory_prompt(plain=True)
+        assert 0 < prompt.count("Fakt") < 30
+        assert len(prompt) <= MAX_MEMORY_PROMPT_TOKENS * 4 + 100
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_cached_until_write(self, db, mock_embedding):
+        from unittest.mock import patch
+
+        manager = MemoryManager(db)
+        await manager.add("Server", "Hetzner")
+        first = await manager.build_memory_prompt(plain=True)
+
+        with patch.object(
+            manager, "list_all_light", wraps=manager.list_all_light
+        ) as spy:
+            assert await manager.build_memory_prompt(plain=True) == first
+            spy.assert_not_called()
+
+        await manager.add("Sprache", "Deutsch")
+        prompt = await manager.build_memory_prompt(plain=True)
+        assert "Sprache: Deutsch" in prompt
+
+        await manager.remove_by_key("Sprache")
+        assert await manager.build_memory_prompt(plain=True) == first
+
+    @pytest.mark.asyncio
+    async def test_build_prompt_sees_writes_from_other_processes(
+        self, db, mock_embedding
+    ):
+        from sqlalchemy import text
+
+        manager = MemoryManager(db)
+        await manager.add("Server", "Hetzner")
+        await manager.build_memory_prompt(plain=True)
+
+        # Write without MemoryManager, e.g. from the separate Discord process
+        await db.execute(
+            text(
+                "INSERT INTO memories (id, key, content, source, updated_at) "
+                "VALUES ('x1', 'Stadt', 'Berlin', 'user', '2999-01-01 00:00:00')"
+            )
+        )
+        prompt = await manager.build_memory_prompt(plain=True)
+        assert "Stadt: Berlin" in prompt
@@ -169,6 +169,27 @@ class TestMemoryModel:
         if hasattr(mem, "embedding"):
             assert mem.embedding is None
 
+    @pytest.mark.asyncio
+    async def test_recent_memories_use_index(self, db):
+        """ORDER BY updated_at DESC LIMIT n is served by an index, no sort step"""
+        from sqlalchemy import text
+
+        for sql, index in [
+            (
+                "SELECT key FROM memories ORDER BY updated_at DESC LIMIT 30",
+                "ix_memories_updated_at",
+            ),
+            (
+                "SELECT key FROM memories WHERE category = 'Technik' "
+                "ORDER BY updated_at DESC LIMIT 30",
+                "ix_memories_category_updated_at",
+            ),
+        ]:
+            rows = (await db.execute(text("EXPLAIN QUERY PLAN " + sql))).all()
+            plan = " ".join(row[-1] for row in rows)
+            assert index in plan
+            assert "TEMP B-TREE" not in plan
+
 
 class TestAgentModel:
     """Tests for Agent model"""
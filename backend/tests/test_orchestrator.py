@@ -6,6 +6,7 @@ blocked tools, max iterations, error handling, event types.
 All LLM calls are mocked — no Ollama/API dependency needed.
 """
 
+import asyncio
 import pytest
 import os
 import sys
@@ -382,6 +383,9 @@ class TestOrchestratorApprovalFlow:
         assert "tool_rejected" in types
         # Tool should NOT execute
         assert "tool_result" not in types
+        # Decided approvals don't stay pending
+        request = next(e for e in events if e["type"] == "tool_request")
+        assert test_permissions.get_pending_approval(request["approval_id"]) is None
 
     @pytest.mark.asyncio
     async def test_tool_request_has_approval_id(
@@ -486,6 +490,116 @@ class TestOrchestratorApprovalFlow:
         assert "tool_result" in types
         on_approval.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_approvals_are_requested_together(
+        self, db, test_registry, test_permissions
+    ):
+        """All approval requests of one response are pending at the same time"""
+        llm = MockLLMProvider(
+            [
+                LLMResponse(
+                    content=None,
+                    tool_calls=[
+                        make_tool_call("file_read", {"path": "/tmp/a"}),
+                        make_tool_call("shell_execute", {"command": "ls"}),
+                    ],
+                ),
+                LLMResponse(content="OK.", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+
+        waiting = []
+        both_pending = asyncio.Event()
+
+        async def on_approval(request):
+            waiting.append(request["tool"])
+            if len(waiting) == 2:
+                both_pending.set()
+            await asyncio.wait_for(both_pending.wait(), timeout=1.0)
+            return None if request["tool"] == "shell_execute" else PermissionScope.ONCE
+
+        with patch(
+            "agent.orchestrator.execute_tool", new_callable=AsyncMock
+        ) as mock_exec:
+            mock_exec.return_value = "inhalt"
+            events = await collect_events(
+                orch,
+                "sess-batch",
+                [ChatMessage(role="user", content="Lies und liste")],
+                on_approval=on_approval,
+            )
+
+        assert sorted(waiting) == ["file_read", "shell_execute"]
+        types = [(e["type"], e.get("tool")) for e in events]
+        assert types[:2] == [
+            ("tool_request", "file_read"),
+            ("tool_request", "shell_execute"),
+        ]
+        assert ("tool_rejected", "shell_execute") in types
+        assert ("tool_result", "file_read") in types
+        mock_exec.assert_awaited_once()
+        request_ids = {e["approval_id"] for e in events if e["type"] == "tool_request"}
+        assert {
+            e["approval_id"]
+            for e in events
+            if e["type"] in ("tool_rejected", "tool_result")
+        } == request_ids
+
+    @pytest.mark.asyncio
+    async def test_queued_approval_timeout_starts_after_previous_decision(
+        self, db, test_registry, test_permissions, monkeypatch
+    ):
+        """The second dialog gets its full timeout after the first is decided"""
+        from api import chat
+
+        monkeypatch.setattr(chat, "APPROVAL_TIMEOUT_SECONDS", 0.3)
+        llm = MockLLMProvider(
+            [
+                LLMResponse(
+                    content=None,
+                    tool_calls=[
+                        make_tool_call("shell_execute", {"command": "ls"}),
+                        make_tool_call("shell_execute", {"command": "pwd"}),
+                    ],
+                ),
+                LLMResponse(content="OK.", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+        approval_ids = []
+
+        async def decide_one_by_one():
+            while len(approval_ids) < 2:
+                await asyncio.sleep(0.01)
+            # Second decision lands after the first one's timeout would have expired
+            for approval_id in approval_ids:
+                await asyncio.sleep(0.2)
+                assert chat.resolve_approval(approval_id, "once")
+
+        decider = asyncio.create_task(decide_one_by_one())
+        events = []
+        with patch(
+            "agent.orchestrator.execute_tool", new_callable=AsyncMock
+        ) as mock_exec:
+            mock_exec.return_value = "ok"
+            async for event in orch.process_message(
+                session_id="sess-queue",
+                messages=[ChatMessage(role="user", content="ls und pwd")],
+                on_approval_needed=chat.make_approval_waiter(),
+            ):
+                if event["type"] == "tool_request":
+                    approval_ids.append(event["approval_id"])
+                events.append(event)
+        await decider
+
+        types = [e["type"] for e in events]
+        assert "tool_rejected" not in types
+        assert types.count("tool_result") == 2
+        assert mock_exec.await_count == 2
+        results = [e["approval_id"] for e in events if e["type"] == "tool_result"]
+        assert results == approval_ids
+
 
 # ============================================================
 # Unknown / Blocked Tools
@@ -582,6 +696,23 @@ class TestOrchestratorAgentPermissions:
         assert "tool_result" not in types
         assert "tool_request" not in types
 
+    @pytest.mark.asyncio
+    async def test_llm_only_sees_allowed_tools(
+        self, db, test_registry, test_permissions, mock_agent_recherche
+    ):
+        llm = MockLLMProvider([])
+        llm.chat = AsyncMock(return_value=LLMResponse(content="OK", tool_calls=None))
+        orch = AgentOrchestrator(
+            llm, db, test_registry, test_permissions, agent=mock_agent_recherche
+        )
+
+        await collect_events(
+            orch, "sess-filter", [ChatMessage(role="user", content="Hi")]
+        )
+
+        names = [t["function"]["name"] for t in llm.chat.call_args[1]["tools"]]
+        assert names == ["file_read", "web_search"]
+
     @pytest.mark.asyncio
     async def test_agent_auto_approved_tool(
         self, db, test_registry, test_permissions, mock_agent_recherche
@@ -749,6 +880,41 @@ class TestOrchestratorIterations:
         tool_results = [e for e in events if e["type"] == "tool_result"]
         assert len(tool_results) == 3
 
+    @pytest.mark.asyncio
+    async def test_last_iteration_offers_no_tools(
+        self, db, test_registry, test_permissions
+    ):
+        """The final round asks for an answer instead of more tool calls"""
+        llm = MockLLMProvider([])
+        llm.chat = AsyncMock(
+            side_effect=[
+                LLMResponse(
+                    content=None,
+                    tool_calls=[make_tool_call("web_search", {"query": "x"})],
+                ),
+                LLMResponse(content="Zusammenfassung.", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+
+        with patch(
+            "agent.orchestrator.execute_tool", new_callable=AsyncMock
+        ) as mock_exec:
+            mock_exec.return_value = "ok"
+            events = []
+            async for event in orch.process_message(
+                session_id="sess-last-iter",
+                messages=[ChatMessage(role="user", content="Suche")],
+                on_approval_needed=AsyncMock(return_value=PermissionScope.ONCE),
+                max_tool_iterations=2,
+            ):
+                events.append(event)
+
+        tools_per_call = [call[1]["tools"] for call in llm.chat.call_args_list]
+        assert tools_per_call[0] is not None
+        assert tools_per_call[1] is None
+        assert [e["type"] for e in events][-2:] == ["text", "done"]
+
     @pytest.mark.asyncio
     async def test_multiple_tool_calls_in_one_response(
         self, db, test_registry, test_permissions
@@ -780,6 +946,112 @@ class TestOrchestratorIterations:
         tool_results = [e for e in events if e["type"] == "tool_result"]
         assert len(tool_results) == 2
 
+    @pytest.mark.asyncio
+    async def test_auto_approved_calls_run_concurrently(
+        self, db, test_registry, test_permissions
+    ):
+        """Independent auto-approved calls overlap; results keep call order"""
+        llm = MockLLMProvider(
+            [
+                LLMResponse(
+                    content=None,
+                    tool_calls=[
+                        make_tool_call("web_search", {"query": "eins"}),
+                        ToolCall(
+                            id="call_2", name="web_search", parameters={"query": "zwei"}
+                        ),
+                    ],
+                ),
+                LLMResponse(content="Fertig!", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+
+        running = 0
+        peak = 0
+
+        async def slow_tool(name, params, db_session=None, commit=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            # the first call finishes last
+            await asyncio.sleep(0.05 if params["query"] == "eins" else 0.01)
+            running -= 1
+            return params["query"]
+
+        with patch("agent.orchestrator.execute_tool", side_effect=slow_tool):
+            events = await collect_events(
+                orch, "sess-par", [ChatMessage(role="user", content="Such zweimal")]
+            )
+
+        assert peak == 2
+        results = [e["result"] for e in events if e["type"] == "tool_result"]
+        assert results == ["eins", "zwei"]
+
+    @pytest.mark.asyncio
+    async def test_memory_tools_do_not_share_session_concurrently(
+        self, db, test_registry, test_permissions
+    ):
+        """Memory tools use the orchestrator's DB session and run one at a time"""
+        llm = MockLLMProvider(
+            [
+                LLMResponse(
+                    content=None,
+                    tool_calls=[
+                        make_tool_call("memory_save", {"key": "a"}),
+                        ToolCall(
+                            id="call_2", name="memory_save", parameters={"key": "b"}
+                        ),
+                    ],
+                ),
+                LLMResponse(content="Fertig!", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+
+        running = 0
+        peak = 0
+
+        async def memory_tool(name, params, db_session=None, commit=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        with patch("agent.orchestrator.execute_tool", side_effect=memory_tool):
+            events = await collect_events(
+                orch, "sess-mem", [ChatMessage(role="user", content="Merk dir")]
+            )
+
+        assert peak == 1
+        assert len([e for e in events if e["type"] == "tool_result"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_caller_history_not_modified(
+        self, db, test_registry, test_permissions
+    ):
+        llm = MockLLMProvider(
+            [
+                LLMResponse(
+                    content=None,
+                    tool_calls=[make_tool_call("web_search", {"query": "x"})],
+                ),
+                LLMResponse(content="Fertig.", tool_calls=None),
+            ]
+        )
+        orch = AgentOrchestrator(llm, db, test_registry, test_permissions)
+        history = [ChatMessage(role="user", content="Suche")]
+
+        with patch(
+            "agent.orchestrator.execute_tool", new_callable=AsyncMock
+        ) as mock_exec:
+            mock_exec.return_value = "ok"
+            await collect_events(orch, "sess-copy", history)
+
+        assert len(history) == 1
+
     @pytest.mark.asyncio
     async def test_partial_text_with_tool_calls(
         self, db, test_registry, test_permissions
@@ -891,6 +1163,57 @@ class TestOrchestratorToolErrors:
 # ============================================================
 
 
+class TestAuditLoggerBatch:
+    """AuditLogger.batch() writes buffered entries in one commit on exit"""
+
+    @pytest.mark.asyncio
+    async def test_entries_written_on_exit(self, db):
+        from sqlalchemy import select, func
+        from agent.audit_logger import AuditLogger
+        from db.models import AuditLog, Conversation
+
+        conv = Conversation()
+        db.add(conv)
+        await db.commit()
+
+        audit = AuditLogger(db)
+        async with audit.batch():
+            await audit.log_tool_request(conv.id, "web_search", {"query": "x"})
+            async with audit.batch():  # nested batch joins the outer one
+                await audit.log_tool_execution(
+                    conv.id, "web_search", {"query": "x"}, "ok", 5
+                )
+            count = await db.scalar(select(func.count()).select_from(AuditLog))
+            assert count == 0
+
+        count = await db.scalar(select(func.count()).select_from(AuditLog))
+        assert count == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_inside_batch(self, db):
+        from sqlalchemy import select, func
+        from agent.audit_logger import AuditLogger
+        from db.models import AuditLog, Conversation
+
+        conv = Conversation()
+        db.add(conv)
+        await db.commit()
+
+        audit = AuditLogger(db)
+        async with audit.batch():
+            await audit.log_tool_request(conv.id, "file_read", {"path": "/tmp/a"})
+            await audit.flush()
+            count = await db.scalar(select(func.count()).select_from(AuditLog))
+            assert count == 1
+
+            await audit.log_tool_approval(
+                conv.id, "file_read", {"path": "/tmp/a"}, "once"
+            )
+
+        count = await db.scalar(select(func.count()).select_from(AuditLog))
+        assert count == 2
+
+
 class TestOrchestratorAuditLogging:
     """Tests that the orchestrator logs events to audit trail"""
 
@@ -1017,3 +1340,43 @@ class TestOrchestratorAuditLogging:
                 mock_log.assert_called_once()
                 call_args = mock_log.call_args[0]
                 assert "Disk error" in call_args[3]
+
+
+class TestResultPreview:
+    """_preview matches str(result)[:limit] without rendering everything"""
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            "x" * 2000,
+            [
+                {"title": f"Treffer {i}", "url": f"https://example.com/{i}"}
+                for i in range(500)
+            ],
+            {f"key{i}": list(range(5)) for i in range(500)},
+            [],
+            {},
+            b"\x00bytes" * 200,
+            bytearray(b"kurz"),
+            42,
+            None,
+        ],
+    )
+    def test_same_prefix_as_str(self, result):
+        from agent.orchestrator import _preview
+
+        for limit in (0, 10, 500):
+            assert _preview(result, limit) == str(result)[:limit]
+
+    def test_large_list_is_not_fully_rendered(self):
+        from agent.orchestrator import _preview
+
+        class Item:
+            rendered = 0
+
+            def __repr__(self):
+                Item.rendered += 1
+                return "x" * 100
+
+        _preview([Item() for _ in range(1000)])
+        assert Item.rendered < 10
@@ -98,6 +98,17 @@ class TestValidateUrl:
     def test_zero_ip_blocked(self):
         assert validate_url("http://0.0.0.0/admin") is False
 
+    def test_only_hostname_checked(self):
+        # IP-like text in path/query is not a host
+        assert validate_url("https://example.com/v10.2/docs") is True
+        assert validate_url("https://example.com/?ip=192.168.1.1") is True
+
+    def test_loopback_and_userinfo_variants_blocked(self):
+        assert validate_url("http://127.0.0.2/") is False
+        assert validate_url("http://LOCALHOST./admin") is False
+        assert validate_url("http://user@10.1.2.3/") is False
+        assert validate_url("http://[::ffff:127.0.0.1]/") is False
+
 
 class TestValidateShellCommand:
     """Tests for shell command validation — must prevent injection"""
@@ -156,6 +167,14 @@ class TestValidateShellCommand:
         is_valid, error = validate_shell_command("   ")
         assert is_valid is False
 
+    def test_whitelist_changes_picked_up(self, monkeypatch):
+        from core.config import settings
+
+        assert validate_shell_command("uptime")[0] is False
+        monkeypatch.setattr(settings, "shell_whitelist", ["Uptime -p", "ls"])
+        assert validate_shell_command("uptime")[0] is True
+        assert validate_shell_command("pwd")[0] is False
+
 
 class TestSanitizeFilename:
     """Tests for filename sanitization"""
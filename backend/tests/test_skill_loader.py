@@ -0,0 +1,120 @@
+"""
+Axon by NeuroVexon - Skill Loader Tests
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import skill_loader
+from agent.skill_loader import SkillLoader, validate_skill_module
+
+SKILL_TEMPLATE = """
+SKILL_NAME = "{name}"
+SKILL_DESCRIPTION = "Test skill {name}"
+SKILL_VERSION = "1.0.0"
+
+
+def execute(params):
+    return "{name}"
+"""
+
+
+def write_skill(directory, name, body=None):
+    path = directory / f"{name}.py"
+    path.write_text(body if body is not None else SKILL_TEMPLATE.format(name=name))
+    return path
+
+
+@pytest.fixture
+def skills_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_loader, "SKILLS_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestValidateSkillModule:
+    """Tests for validate_skill_module"""
+
+    def test_reads_metadata_without_executing(self, tmp_path):
+        marker = tmp_path / "executed"
+        path = write_skill(
+            tmp_path,
+            "alpha",
+            SKILL_TEMPLATE.format(name="alpha")
+            + f"\nopen({str(marker)!r}, 'w').close()\n"
+            + "SKILL_PARAMETERS = {'text': {'type': 'string'}}\n",
+        )
+
+        valid, error, metadata = validate_skill_module(str(path))
+
+        assert valid is True, error
+        assert metadata["name"] == "alpha"
+        assert metadata["display_name"] == "alpha"
+        assert metadata["parameters"] == {"text": {"type": "string"}}
+        assert not marker.exists()
+
+    def test_missing_execute_function(self, tmp_path):
+        body = SKILL_TEMPLATE.format(name="alpha").split("def execute")[0]
+        path = write_skill(tmp_path, "alpha", body + "execute = print\n")
+
+        valid, error, _ = validate_skill_module(str(path))
+
+        assert valid is False
+        assert "execute" in error
+
+    def test_non_literal_name_rejected(self, tmp_path):
+        body = SKILL_TEMPLATE.format(name="alpha").replace(
+            'SKILL_NAME = "alpha"', 'SKILL_NAME = "al" + str(1)'
+        )
+        valid, error, _ = validate_skill_module(str(write_skill(tmp_path, "a", body)))
+
+        assert valid is False
+        assert "SKILL_NAME" in error
+
+    def test_syntax_error(self, tmp_path):
+        valid, error, _ = validate_skill_module(
+            str(write_skill(tmp_path, "alpha", "def execute(:\n"))
+        )
+        assert valid is False
+        assert "Fehler beim Laden" in error
+
+
+class TestScanSkillsDir:
+    """Tests for SkillLoader.scan_skills_dir"""
+
+    @pytest.mark.asyncio
+    async def test_registers_new_skills(self, db, skills_dir):
+        write_skill(skills_dir, "alpha")
+        write_skill(skills_dir, "beta")
+        write_skill(skills_dir, "_private")
+        write_skill(skills_dir, "broken", "SKILL_NAME = 'broken'\n")
+
+        skills = await SkillLoader(db).scan_skills_dir()
+
+        assert sorted(s["name"] for s in skills) == ["alpha", "beta"]
+        assert all(s["id"] and not s["approved"] for s in skills)
+
+    @pytest.mark.asyncio
+    async def test_changed_skill_revokes_approval(self, db, skills_dir):
+        path = write_skill(skills_dir, "alpha")
+        write_skill(skills_dir, "beta")
+        loader = SkillLoader(db)
+        first = {s["name"]: s for s in await loader.scan_skills_dir()}
+
+        from db.models import Skill
+
+        for skill_id in (first["alpha"]["id"], first["beta"]["id"]):
+            skill = await db.get(Skill, skill_id)
+            skill.approved = True
+            skill.enabled = True
+        await db.flush()
+
+        path.write_text(path.read_text() + "\n# changed\n")
+        second = {s["name"]: s for s in await loader.scan_skills_dir()}
+
+        assert second["alpha"]["id"] == first["alpha"]["id"]
+        assert second["alpha"]["approved"] is False
+        assert second["beta"]["approved"] is True
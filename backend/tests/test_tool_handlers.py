@@ -70,10 +70,9 @@ class TestExecuteTool:
         mock_session = MagicMock()
         params = {"key": "test", "content": "value"}
         # Should inject _db_session into params
-        with patch(
-            "agent.tool_handlers.handle_memory_save", new_callable=AsyncMock
-        ) as mock:
-            mock.return_value = "saved"
+        mock = AsyncMock(return_value="saved")
+        # Dispatch goes through the module-level handler table
+        with patch.dict("agent.tool_handlers._HANDLERS", {"memory_save": mock}):
             await execute_tool("memory_save", params, db_session=mock_session)
             call_params = mock.call_args[0][0]
             assert "_db_session" in call_params
@@ -93,6 +92,15 @@ class TestHandleFileRead:
             result = await handle_file_read({"path": temp_file})
         assert result == "Hello Axon Test"
 
+    @pytest.mark.asyncio
+    async def test_file_too_large(self, temp_file):
+        with (
+            patch("agent.tool_handlers.validate_path", return_value=True),
+            patch("agent.tool_handlers.settings.max_file_size_mb", 0),
+        ):
+            with pytest.raises(ToolExecutionError, match="^File too large"):
+                await handle_file_read({"path": temp_file})
+
     @pytest.mark.asyncio
     async def test_missing_path_raises(self):
         with pytest.raises(ToolExecutionError, match="Missing 'path'"):
@@ -167,6 +175,16 @@ class TestHandleFileWrite:
             with open(os.path.join(temp_dir, "check.txt")) as f:
                 assert f.read() == "Axon schreibt"
 
+    @pytest.mark.asyncio
+    async def test_outputs_dir_recreated_after_removal(self, temp_dir):
+        outputs = os.path.join(temp_dir, "outputs")
+        with patch("agent.tool_handlers.settings") as mock_settings:
+            mock_settings.outputs_dir = outputs
+            await handle_file_write({"filename": "a.txt", "content": "a"})
+            shutil.rmtree(outputs)
+            await handle_file_write({"filename": "b.txt", "content": "b"})
+            assert os.listdir(outputs) == ["b.txt"]
+
     @pytest.mark.asyncio
     async def test_missing_filename_raises(self):
         with pytest.raises(ToolExecutionError, match="Missing"):
@@ -226,6 +244,36 @@ class TestHandleFileList:
         assert file_entry["type"] == "file"
         assert dir_entry["type"] == "dir"
 
+    @pytest.mark.asyncio
+    async def test_recursive_list_names_and_limit(self, temp_dir):
+        Path(temp_dir, "sub", "deeper").mkdir(parents=True)
+        Path(temp_dir, "sub", "deeper", "x.txt").write_text("abc")
+        for i in range(150):
+            Path(temp_dir, "sub", f"f{i}.txt").touch()
+
+        with patch("agent.tool_handlers.validate_path", return_value=True):
+            result = await handle_file_list({"path": temp_dir, "recursive": True})
+
+        assert len(result) == 100
+        assert result[0] == {"name": "sub", "type": "dir", "size": 0}
+
+        with patch("agent.tool_handlers.validate_path", return_value=True):
+            result = await handle_file_list(
+                {"path": os.path.join(temp_dir, "sub", "deeper"), "recursive": True}
+            )
+        assert result == [{"name": "x.txt", "type": "file", "size": 3}]
+
+        Path(temp_dir, "nest", "a").mkdir(parents=True)
+        Path(temp_dir, "nest", "a", "b.txt").write_text("hi")
+        with patch("agent.tool_handlers.validate_path", return_value=True):
+            result = await handle_file_list(
+                {"path": os.path.join(temp_dir, "nest"), "recursive": True}
+            )
+        assert result == [
+            {"name": "a", "type": "dir", "size": 0},
+            {"name": os.path.join("a", "b.txt"), "type": "file", "size": 2},
+        ]
+
     @pytest.mark.asyncio
     async def test_list_etc_blocked(self):
         with pytest.raises(ToolExecutionError, match="Access denied"):
@@ -285,6 +333,121 @@ class TestHandleWebFetch:
         with pytest.raises(ToolExecutionError, match="Access denied"):
             await handle_web_fetch({"url": "http://172.17.0.1:5432"})
 
+    @pytest.mark.asyncio
+    async def test_large_response_truncated(self, monkeypatch):
+        import httpx
+        from agent import tool_handlers
+
+        body = ("ä" * 30000).encode("latin-1")
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                content=body,
+                headers={"content-type": "text/plain; charset=latin-1"},
+            )
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(tool_handlers, "_http_client", client)
+
+        result = await handle_web_fetch({"url": "https://example.com/big"})
+        await client.aclose()
+
+        assert result == "ä" * tool_handlers.WEB_FETCH_MAX_CHARS
+
+    @pytest.mark.asyncio
+    async def test_repeated_get_served_from_cache(self, monkeypatch):
+        import httpx
+        from collections import OrderedDict
+        from agent import tool_handlers
+
+        requests = []
+
+        def handler(request):
+            requests.append(request.url.path)
+            headers = (
+                {"cache-control": "no-store"} if "private" in request.url.path else {}
+            )
+            return httpx.Response(200, text=f"page {len(requests)}", headers=headers)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(tool_handlers, "_http_client", client)
+        monkeypatch.setattr(tool_handlers, "_fetch_cache", OrderedDict())
+
+        first = await handle_web_fetch({"url": "https://example.com/a"})
+        second = await handle_web_fetch({"url": "https://example.com/a"})
+        await handle_web_fetch({"url": "https://example.com/a", "method": "POST"})
+        await handle_web_fetch({"url": "https://example.com/private"})
+        await handle_web_fetch({"url": "https://example.com/private"})
+        await client.aclose()
+
+        assert first == second == "page 1"
+        assert requests == ["/a", "/a", "/private", "/private"]
+
+    @pytest.mark.asyncio
+    async def test_cookies_not_shared_between_requests(self, monkeypatch):
+        import functools
+        import httpx
+        from collections import OrderedDict
+        from agent import tool_handlers
+
+        sent_cookies = []
+
+        def handler(request):
+            sent_cookies.append(request.headers.get("cookie"))
+            return httpx.Response(
+                200, text="ok", headers={"set-cookie": "sid=userA-secret; Path=/"}
+            )
+
+        monkeypatch.setattr(
+            httpx,
+            "AsyncClient",
+            functools.partial(
+                httpx.AsyncClient, transport=httpx.MockTransport(handler)
+            ),
+        )
+        monkeypatch.setattr(tool_handlers, "_http_client", None)
+        monkeypatch.setattr(tool_handlers, "_fetch_cache", OrderedDict())
+
+        await handle_web_fetch({"url": "https://example.com/login", "method": "POST"})
+        await handle_web_fetch({"url": "https://example.com/me", "method": "POST"})
+        await tool_handlers.close_http_client()
+
+        assert sent_cookies == [None, None]
+
+
+# ============================================================
+# web_search — DuckDuckGo client per worker thread
+# ============================================================
+
+
+class TestWebSearchClient:
+    """Tests for the DDGS client used by web_search"""
+
+    @pytest.mark.asyncio
+    async def test_searches_in_parallel_threads(self, monkeypatch):
+        import asyncio
+        import threading
+        from agent import tool_handlers
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        class FakeDDGS:
+            def text(self, query, max_results):
+                barrier.wait()  # blocks unless both searches run concurrently
+                return [{"title": query, "client": id(self)}]
+
+        monkeypatch.setattr(tool_handlers, "DDGS", FakeDDGS)
+        monkeypatch.setattr(tool_handlers, "_ddgs_local", threading.local())
+
+        results = await asyncio.gather(
+            asyncio.to_thread(tool_handlers._ddgs_text, "a", 5),
+            asyncio.to_thread(tool_handlers._ddgs_text, "b", 5),
+        )
+
+        assert [r[0]["title"] for r in results] == ["a", "b"]
+        assert results[0][0]["client"] != results[1][0]["client"]
+
 
 # ============================================================
 # shell_execute — Command Injection Prevention
@@ -353,6 +516,43 @@ class TestHandleShellExecute:
         assert isinstance(result, str)
         assert len(result) > 0
 
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX argv handling")
+    async def test_quotes_and_globs_without_shell(self, tmp_path, monkeypatch):
+        (tmp_path / "a.txt").write_text("")
+        (tmp_path / "b.txt").write_text("")
+        monkeypatch.chdir(tmp_path)
+
+        result = await handle_shell_execute({"command": "echo 'x  y' *.txt *.none"})
+        assert result.strip() == "x  y a.txt b.txt *.none"
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX argv handling")
+    async def test_quoted_globs_stay_literal(self, tmp_path, monkeypatch):
+        (tmp_path / "a.txt").write_text("")
+        (tmp_path / "b.txt").write_text("")
+        monkeypatch.chdir(tmp_path)
+
+        result = await handle_shell_execute(
+            {"command": "echo '*.txt' \"?.txt\" \\*.txt [ab].txt"}
+        )
+        assert result.strip() == "*.txt ?.txt *.txt a.txt b.txt"
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX argv handling")
+    async def test_unbalanced_quotes_rejected(self):
+        with pytest.raises(ToolExecutionError, match="Invalid command"):
+            await handle_shell_execute({"command": "echo 'unterminated"})
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX argv handling")
+    async def test_long_output_truncated(self, tmp_path, monkeypatch):
+        (tmp_path / "big.txt").write_text("ä" * 20000)
+        monkeypatch.chdir(tmp_path)
+
+        result = await handle_shell_execute({"command": "cat big.txt"})
+        assert result == "ä" * 5000
+
 
 # ============================================================
 # memory_save / memory_search / memory_delete
@@ -384,6 +584,27 @@ class TestHandleMemoryTools:
             )
         assert isinstance(result, str)
 
+    @pytest.mark.asyncio
+    async def test_memory_save_commit_deferred_to_caller(self, db, mock_embedding):
+        from agent.memory import MemoryManager
+
+        with (
+            patch("agent.tool_handlers.t", return_value="Saved"),
+            patch.object(db, "commit", new_callable=AsyncMock) as commit,
+        ):
+            await execute_tool(
+                "memory_save",
+                {"key": "Spaeter", "content": "committen"},
+                db_session=db,
+                commit=False,
+            )
+            commit.assert_not_awaited()
+
+            await execute_tool("memory_save", {"key": "Jetzt"}, db_session=db)
+            commit.assert_awaited_once()
+
+        assert (await MemoryManager(db).get("Spaeter")).content == "committen"
+
     @pytest.mark.asyncio
     async def test_memory_search_missing_query(self):
         with pytest.raises(ToolExecutionError, match="Missing 'query'"):
@@ -9,7 +9,7 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agent.tool_registry import ToolRegistry, RiskLevel
+from agent.tool_registry import ToolRegistry, ToolDefinition, RiskLevel
 from agent.permission_manager import PermissionManager, PermissionScope
 
 
@@ -55,6 +55,54 @@ class TestToolRegistry:
             assert "description" in tool["function"]
             assert "parameters" in tool["function"]
 
+    def test_tool_definition_is_immutable(self):
+        tool = ToolRegistry().get("file_read")
+        with pytest.raises(AttributeError):
+            tool.risk_level = RiskLevel.LOW
+
+    def test_llm_schema_precomputed(self):
+        tool = ToolDefinition(
+            name="t",
+            description="d",
+            description_de="d",
+            parameters={
+                "a": {"type": "integer", "description": "A", "required": True},
+                "b": {"default": 1},
+            },
+            risk_level=RiskLevel.LOW,
+        )
+        assert tool.llm_schema == {
+            "type": "object",
+            "properties": {
+                "a": {"type": "integer", "description": "A"},
+                "b": {"type": "string", "description": ""},
+            },
+            "required": ["a"],
+        }
+
+    def test_tools_for_llm_sorted_by_name(self):
+        """Stable order keeps the provider's prompt-prefix cache valid"""
+        names = [t["function"]["name"] for t in ToolRegistry().get_tools_for_llm()]
+        assert names == sorted(names)
+
+    def test_tools_for_llm_cached_until_register(self):
+        registry = ToolRegistry()
+        first = registry.get_tools_for_llm()
+        assert registry.get_tools_for_llm() is first
+
+        registry.register(
+            ToolDefinition(
+                name="zz_custom",
+                description="Custom tool",
+                description_de="Eigenes Tool",
+                parameters={},
+                risk_level=RiskLevel.LOW,
+            )
+        )
+        tools = registry.get_tools_for_llm()
+        assert tools is not first
+        assert tools[-1]["function"]["name"] == "zz_custom"
+
 
 class TestPermissionManager:
     """Tests for PermissionManager"""
@@ -126,6 +174,76 @@ class TestPermissionManager:
         # Verify permission is gone
         assert manager.check_permission("session-1", "file_read", {}) is False
 
+    def test_exact_and_tool_keys_do_not_collide(self):
+        manager = PermissionManager()
+        manager.grant_permission("session-1", "file_read", {}, PermissionScope.ONCE)
+
+        # An exact grant for empty params is not a session-wide tool grant
+        assert manager.check_permission("session-1", "file_read", {}) is True
+        assert (
+            manager.check_permission("session-1", "file_read", {"path": "x"}) is False
+        )
+        assert manager.get_session_permissions("session-1") == ["file_read({})"]
+
+    def test_exact_keys_distinguish_value_types(self):
+        manager = PermissionManager()
+        manager.grant_permission(
+            "session-1", "file_list", {"recursive": 1}, PermissionScope.ONCE
+        )
+
+        assert manager.check_permission("session-1", "file_list", {"recursive": 1})
+        for other in (True, 1.0, "1"):
+            assert not manager.check_permission(
+                "session-1", "file_list", {"recursive": other}
+            )
+
+    def test_bulk_check(self):
+        manager = PermissionManager()
+        manager.grant_permission("session-1", "file_read", {}, PermissionScope.SESSION)
+        manager.grant_permission(
+            "session-1", "shell_execute", {"command": "ls"}, PermissionScope.NEVER
+        )
+
+        assert manager.check_permissions_bulk(
+            "session-1",
+            [
+                ("file_read", {"path": "a"}),
+                ("file_write", {"path": "a"}),
+                ("shell_execute", {"command": "ls"}),
+            ],
+        ) == [True, False, False]
+        assert manager.check_permissions_bulk("session-2", []) == []
+
+    def test_approval_request_lifecycle(self):
+        manager = PermissionManager()
+        approval_id = manager.create_approval_request(
+            "session-1", "file_read", {"path": "/x"}, "Read a file", "medium"
+        )
+
+        pending = manager.get_pending_approval(approval_id)
+        assert len(approval_id) == 8
+        assert pending.tool == "file_read"
+        assert pending.params == {"path": "/x"}
+
+        assert manager.resolve_approval(approval_id) is pending
+        assert manager.get_pending_approval(approval_id) is None
+
+    def test_unhashable_params(self):
+        manager = PermissionManager()
+        params = {"recipients": ["a@example.com"], "options": {"cc": None}}
+
+        manager.grant_permission(
+            "session-1", "email_send", params, PermissionScope.ONCE
+        )
+
+        assert manager.check_permission("session-1", "email_send", params) is True
+        assert (
+            manager.check_permission(
+                "session-1", "email_send", {**params, "recipients": ["b@example.com"]}
+            )
+            is False
+        )
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,5 +1,5 @@
 import { createContext, useState, useCallback, type ReactNode } from 'react'
-import type { Message, ToolApprovalRequest } from '../types'
+import type { Message, ToolApprovalRequest, ToolInfo } from '../types'
 import { api } from '../services/api'
 import { useTranslation } from 'react-i18next'
 
@@ -24,14 +24,31 @@ interface ChatProviderProps {
   agentId: string | null
 }
 
+// Several requests for the same tool can be pending at once — tool messages
+// are matched by their approval_id, never by tool name
+function updateToolMessage(
+  messages: Message[],
+  approvalId: string | undefined,
+  update: (msg: Message & { toolInfo: ToolInfo }) => Message,
+): Message[] {
+  if (!approvalId) return messages
+  return messages.map(msg =>
+    msg.role === 'tool' && msg.toolInfo?.approvalId === approvalId
+      ? update(msg as Message & { toolInfo: ToolInfo })
+      : msg
+  )
+}
+
 export function ChatProvider({ children, onSessionChange, agentId }: ChatProviderProps) {
   const { t } = useTranslation()
   const [messages, setMessages] = useState<Message[]>([])
   const [isLoading, setIsLoading] = useState(false)
   const [isStreaming, setIsStreaming] = useState(false)
-  const [pendingApproval, setPendingApproval] = useState<
-    (ToolApprovalRequest & { approval_id?: string }) | null
-  >(null)
+  // The agent may ask for several approvals at once — shown one after another
+  const [approvalQueue, setApprovalQueue] = useState<
+    (ToolApprovalRequest & { approval_id?: string })[]
+  >([])
+  const pendingApproval = approvalQueue[0] ?? null
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(null)
 
   const sendMessage = useCallback(async (content: string) => {
@@ -68,81 +85,51 @@ export function ChatProvider({ children, onSessionChange, agentId }: ChatProvide
 
             case 'tool_request':
               setMessages(prev => [...prev, {
-                id: `tool-${Date.now()}-${event.tool}`,
+                id: `tool-${event.approval_id ?? `${Date.now()}-${event.tool}`}`,
                 role: 'tool' as const,
                 content: '',
                 timestamp: new Date(),
                 toolInfo: {
                   name: event.tool || '',
                   status: 'pending' as const,
+                  approvalId: event.approval_id,
                 },
               }])
-              setPendingApproval({
+              setApprovalQueue(prev => [...prev, {
                 tool: event.tool || '',
                 params: event.params || {},
                 description: event.description || t('useChat.toolDefault', { tool: event.tool }),
                 risk_level: (event.risk_level as 'low' | 'medium' | 'high' | 'critical') || 'medium',
                 approval_id: event.approval_id,
-              })
+              }])
               break
 
             case 'tool_result':
-              setMessages(prev => prev.map(msg => {
-                if (msg.role === 'tool' && msg.toolInfo?.name === event.tool && msg.toolInfo?.status === 'pending') {
-                  return {
-                    ...msg,
-                    content: typeof event.result === 'string' ? event.result : JSON.stringify(event.result),
-                    toolInfo: {
-                      ...msg.toolInfo,
-                      status: 'executed' as const,
-                      result: typeof event.result === 'string' ? event.result : JSON.stringify(event.result),
-                      executionTimeMs: event.execution_time_ms,
-                    },
-                  }
-                }
-                return msg
-              }))
+              setMessages(prev => updateToolMessage(prev, event.approval_id, msg => ({
+                ...msg,
+                content: typeof event.result === 'string' ? event.result : JSON.stringify(event.result),
+                toolInfo: {
+                  ...msg.toolInfo,
+                  status: 'executed' as const,
+                  result: typeof event.result === 'string' ? event.result : JSON.stringify(event.result),
+                  executionTimeMs: event.execution_time_ms,
+                },
+              })))
               break
 
             case 'tool_rejected':
-              setMessages(prev => prev.map(msg => {
-                if (msg.role === 'tool' && msg.toolInfo?.name === event.tool && msg.toolInfo?.status === 'pending') {
-                  return {
-                    ...msg,
-                    toolInfo: { ...msg.toolInfo, status: 'rejected' as const },
-                  }
-                }
-                return msg
-              }))
-              break
-
             case 'tool_blocked':
-              setMessages(prev => prev.map(msg => {
-                if (msg.role === 'tool' && msg.toolInfo?.name === event.tool && msg.toolInfo?.status === 'pending') {
-                  return {
-                    ...msg,
-                    toolInfo: { ...msg.toolInfo, status: 'rejected' as const },
-                  }
-                }
-                return msg
-              }))
+              setMessages(prev => updateToolMessage(prev, event.approval_id, msg => ({
+                ...msg,
+                toolInfo: { ...msg.toolInfo, status: 'rejected' as const },
+              })))
               break
 
             case 'tool_error':
-              setMessages(prev => prev.map(msg => {
-                if (msg.role === 'tool' && msg.toolInfo?.name === event.tool) {
-                  return {
-                    ...msg,
-                    toolInfo: {
-                      ...msg.toolInfo,
-                      name: msg.toolInfo?.name || event.tool || '',
-                      status: 'failed' as const,
-                      error: event.error,
-                    },
-                  }
-                }
-                return msg
-              }))
+              setMessages(prev => updateToolMessage(prev, event.approval_id, msg => ({
+                ...msg,
+                toolInfo: { ...msg.toolInfo, status: 'failed' as const, error: event.error },
+              })))
               break
 
             case 'error':
@@ -186,25 +173,20 @@ export function ChatProvider({ children, onSessionChange, agentId }: ChatProvide
     try {
       await api.approveAgentTool(pendingApproval.approval_id, scope)
 
-      setMessages(prev => prev.map(msg => {
-        if (msg.role === 'tool' && msg.toolInfo?.name === pendingApproval.tool && msg.toolInfo?.status === 'pending') {
-          return {
-            ...msg,
-            toolInfo: { ...msg.toolInfo, status: 'approved' as const },
-          }
-        }
-        return msg
-      }))
+      setMessages(prev => updateToolMessage(prev, pendingApproval.approval_id, msg => ({
+        ...msg,
+        toolInfo: { ...msg.toolInfo, status: 'approved' as const },
+      })))
     } catch (error) {
       console.error('Failed to approve tool:', error)
     }
 
-    setPendingApproval(null)
+    setApprovalQueue(prev => prev.slice(1))
   }, [pendingApproval])
 
   const rejectToolCall = useCallback(async () => {
     if (!pendingApproval?.approval_id) {
-      setPendingApproval(null)
+      setApprovalQueue(prev => prev.slice(1))
       return
     }
 
@@ -214,17 +196,12 @@ export function ChatProvider({ children, onSessionChange, agentId }: ChatProvide
       console.error('Failed to reject tool:', error)
     }
 
-    setMessages(prev => prev.map(msg => {
-      if (msg.role === 'tool' && msg.toolInfo?.name === pendingApproval.tool && msg.toolInfo?.status === 'pending') {
-        return {
-          ...msg,
-          toolInfo: { ...msg.toolInfo, status: 'rejected' as const },
-        }
-      }
-      return msg
-    }))
+    setMessages(prev => updateToolMessage(prev, pendingApproval.approval_id, msg => ({
+      ...msg,
+      toolInfo: { ...msg.toolInfo, status: 'rejected' as const },
+    })))
 
-    setPendingApproval(null)
+    setApprovalQueue(prev => prev.slice(1))
   }, [pendingApproval])
 
   const loadConversation = useCallback(async (conversationId: string) => {
@@ -255,7 +232,7 @@ export function ChatProvider({ children, onSessionChange, agentId }: ChatProvide
   const clearChat = useCallback(() => {
     setMessages([])
     setCurrentSessionId(null)
-    setPendingApproval(null)
+    setApprovalQueue([])
   }, [])
 
   return (
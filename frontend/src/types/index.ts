@@ -45,6 +45,7 @@ export interface ToolInfo {
   result?: string
   error?: string
   executionTimeMs?: number
+  approvalId?: string
 }
 
 export interface Conversation {